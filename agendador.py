@@ -0,0 +1,46 @@
+import heapq
+from datetime import datetime
+
+
+class AgendadorExpiracoes:
+    """
+    Min-heap de reservas ordenado por `data_expiracao`.
+
+    `vencidas()` retira apenas as reservas cujo prazo já passou, em O(k log n),
+    em vez de varrer todos os animais. Reservas que deixaram de valer antes de
+    vencer (adoção, cancelamento, nova reserva) são descartadas quando chegam
+    ao topo do heap.
+    """
+    def __init__(self):
+        self._heap = [] # Entradas: (data_expiracao, ordem_de_agendamento, reserva)
+        self._agendadas = 0
+
+    def agendar(self, reserva):
+        heapq.heappush(self._heap, (reserva.data_expiracao, self._agendadas, reserva))
+        self._agendadas += 1
+
+    @staticmethod
+    def _ainda_vale(reserva):
+        return reserva.status == "ATIVA" and reserva.animal.reserva_ativa is reserva
+
+    def _descartar_obsoletas_do_topo(self):
+        while self._heap and not self._ainda_vale(self._heap[0][2]):
+            heapq.heappop(self._heap)
+
+    def vencidas(self, agora: datetime = None):
+        """Retira e retorna as reservas ativas que já expiraram, da mais antiga para a mais nova."""
+        agora = agora or datetime.now()
+        resultado = []
+        while self._heap and self._heap[0][0] <= agora:
+            reserva = heapq.heappop(self._heap)[2]
+            if self._ainda_vale(reserva):
+                resultado.append(reserva)
+        return resultado
+
+    def proxima(self):
+        """Reserva ativa com o vencimento mais próximo (ou None)."""
+        self._descartar_obsoletas_do_topo()
+        return self._heap[0][2] if self._heap else None
+
+    def __len__(self):
+        return len(self._heap)
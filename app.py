@@ -1,4 +1,9 @@
-from logic import SistemaAdocao
+from logic import SistemaAdocao, carregar_configuracoes
+from repository import criar_repositorio
+from catalogo import CatalogoAnimais
+from lote import executar_lote
+from models import MotivoDevolucao, Relatorios
+import argparse
 import os
 
 def limpar_tela():
@@ -14,11 +19,13 @@ def exibir_menu():
     print("6. Reservar Animal (48h)")
     print("7. Gerenciar Status (Devolução/Quarentena)")
     print("8. Cuidados (Vacina/Treino)")
+    print("9. Recomendações de Compatibilidade")
     print("0. Sair e Salvar")
     return input("Escolha uma opção: ")
 
 def main():
     sistema = SistemaAdocao()
+    sistema.iniciar_verificacao_periodica()
 
     while True:
         opcao = exibir_menu()
@@ -139,6 +146,7 @@ def main():
             print("\n--- Gerenciamento de Status ---")
             print("1. Registrar Devolução (ADOTADO -> DEVOLVIDO/QUARENTENA)")
             print("2. Alterar Status Manualmente (QUARENTENA/INADOTAVEL/DISPONIVEL)")
+            print("3. Liberar Quarentena (todos QUARENTENA -> DISPONIVEL)")
             sub_opcao = input("Escolha: ")
 
             if sub_opcao == "1":
@@ -150,10 +158,14 @@ def main():
                         print(f"{i}. {a.nome} (ID: {a.id})")
                     try:
                         idx = int(input("ID da lista acima: "))
-                        motivo = input("Motivo da devolução: ")
-                        sucesso, msg = sistema.processar_devolucao(idx, motivo)
+                        motivos = list(MotivoDevolucao)
+                        for i, m in enumerate(motivos):
+                            print(f"{i}. {m.value}")
+                        motivo = motivos[int(input("Motivo da devolução: "))]
+                        descricao = input("Detalhes (opcional): ")
+                        sucesso, msg = sistema.processar_devolucao(idx, motivo, descricao)
                         print(msg)
-                    except ValueError:
+                    except (ValueError, IndexError):
                         print("❌ Entrada inválida.")
 
             elif sub_opcao == "2":
@@ -173,6 +185,14 @@ def main():
                 except ValueError:
                     print("❌ Entrada inválida.")
 
+            elif sub_opcao == "3":
+                em_quarentena = sistema.listar_animais_por_status("QUARENTENA")
+                if not em_quarentena:
+                    print("Nenhum animal em quarentena.")
+                elif input(f"Liberar {len(em_quarentena)} animal(is)? (S/N): ").strip().upper() == 'S':
+                    sucesso, msg = sistema.mudar_status_em_lote(em_quarentena, "DISPONIVEL")
+                    print(msg)
+
         elif opcao == "8":
             print("\n--- Cuidados e Eventos ---")
             animais = sistema.listar_animais()
@@ -201,6 +221,38 @@ def main():
             except ValueError:
                 print("Entrada inválida.")
 
+        elif opcao == "9":
+            print("\n--- Recomendações ---")
+            print("1. Melhores animais para um adotante")
+            print("2. Melhores adotantes para um animal")
+            sub_opcao = input("Escolha: ")
+
+            try:
+                if sub_opcao == "1":
+                    for i, a in enumerate(sistema.adotantes):
+                        print(f"{i}. {a.nome}")
+                    adotante = sistema.buscar_adotante(int(input("ID do Adotante: ")))
+                    if not adotante:
+                        print("❌ Adotante inválido.")
+                        continue
+                    recomendados = sistema.recomendar_animais(adotante)
+                elif sub_opcao == "2":
+                    todos = sistema.animais
+                    for i, a in enumerate(todos):
+                        print(f"{i}. {a.nome} [{a.status}]")
+                    recomendados = sistema.recomendar_adotantes(todos[int(input("ID do Animal: "))])
+                else:
+                    print("Opção inválida.")
+                    continue
+            except (ValueError, IndexError):
+                print("❌ Entrada inválida.")
+                continue
+
+            if not recomendados:
+                print("   (Nenhuma combinação elegível)")
+            for item, score in recomendados:
+                print(f"   - {item.nome}: {score}/100")
+
         elif opcao == "0":
             print("\n📊 --- Relatório Final do Sistema ---")
             
@@ -231,6 +283,7 @@ def main():
                 print(f"   - {motivo}: {qtd}")
 
             print("\n💾 Salvando dados...")
+            sistema.parar_verificacao_periodica()
             sistema.salvar_dados()
             print("👋 Até logo!")
             break
@@ -238,5 +291,67 @@ def main():
         else:
             print("Opção inválida.")
 
+def migrar(origem, destino):
+    """Converte a base entre backends (json <-> sqlite) usando o settings.json para caminhos/opções."""
+    if origem == destino:
+        print("❌ Origem e destino são o mesmo backend.")
+        return
+
+    persistencia = carregar_configuracoes().get('persistencia', {})
+    sistema_origem = SistemaAdocao(repo=criar_repositorio(persistencia, backend=origem))
+    sistema_origem.migrar_para(criar_repositorio(persistencia, backend=destino))
+    print(f"✅ Migrados {len(sistema_origem.animais)} animais, {len(sistema_origem.adotantes)} adotantes "
+          f"e {len(sistema_origem.adocoes)} adoções de {origem} para {destino}.")
+
+def relatorios_catalogo():
+    """Relatórios de adoção lidos do catálogo mapeado em memória, sem carregar o SistemaAdocao."""
+    persistencia = carregar_configuracoes().get('persistencia', {})
+    if persistencia.get('backend', 'json') != "json":
+        print("❌ O catálogo de relatórios só existe no backend json.")
+        return
+    repo = criar_repositorio(persistencia)
+    if not os.path.exists(repo.arquivo_catalogo):
+        print("❌ Catálogo não encontrado. Ative 'catalogo_relatorios' no settings.json e salve a base.")
+        return
+
+    with CatalogoAnimais(repo.arquivo_catalogo) as catalogo:
+        if catalogo.geracao != repo.geracao:
+            print(f"⚠️ Catálogo da geração {catalogo.geracao}; a base está na geração {repo.geracao}.")
+        print(f"\n--- 📊 Relatórios ({len(catalogo.animais)} animais, {len(catalogo.adocoes)} adoções) ---")
+        print(f"Tempo médio até a adoção: {Relatorios.tempo_medio_adocao(catalogo.adocoes):.1f} dias")
+        print("Adoções por tipo:")
+        for tipo, taxa in Relatorios.taxa_adocoes_por_tipo(catalogo.adocoes).items():
+            print(f"  {tipo}: {taxa}")
+
+def lote(arquivo, formato=None, detalhado=False):
+    """Aplica um arquivo de comandos (JSON Lines ou CSV) sem o menu e salva uma vez no fim."""
+    if not os.path.exists(arquivo):
+        print(f"❌ Arquivo não encontrado: {arquivo}")
+        return
+    sistema = SistemaAdocao()
+    resultado = executar_lote(sistema, arquivo, formato, detalhado)
+    print(resultado.resumo())
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sistema PooPet")
+    subcomandos = parser.add_subparsers(dest="comando")
+    cmd_migrar = subcomandos.add_parser("migrar", help="Converte a base de dados entre backends")
+    cmd_migrar.add_argument("--de", dest="origem", choices=["json", "sqlite"], required=True)
+    cmd_migrar.add_argument("--para", dest="destino", choices=["json", "sqlite"], required=True)
+    subcomandos.add_parser("relatorios", help="Relatórios de adoção a partir do catálogo somente leitura")
+    cmd_lote = subcomandos.add_parser("lote", help="Aplica um arquivo de comandos (JSON Lines ou CSV) sem o menu")
+    cmd_lote.add_argument("arquivo")
+    cmd_lote.add_argument("--formato", choices=["jsonl", "csv"], help="Padrão: pela extensão do arquivo")
+    cmd_lote.add_argument("--detalhado", action="store_true", help="Mostra o resultado de cada comando")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.comando == "migrar":
+        migrar(args.origem, args.destino)
+    elif args.comando == "relatorios":
+        relatorios_catalogo()
+    elif args.comando == "lote":
+        lote(args.arquivo, args.formato, args.detalhado)
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""
+Benchmark de memória das entidades do domínio.
+
+Mede, com tracemalloc, quantos bytes cada entidade ocupa em média quando
+criada em massa (como numa base grande carregada em memória).
+
+Uso: python bench_memoria.py [quantidade]
+"""
+import sys
+import tracemalloc
+from datetime import datetime
+
+from models import Cachorro, Gato, Adotante, Evento, Reserva, Adocao
+
+
+def medir(nome, fabrica, quantidade):
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    objetos = [fabrica(i) for i in range(quantidade)]
+    total = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    # Desconta a própria lista que segura os objetos
+    total -= sys.getsizeof(objetos)
+    print(f"{nome:<28} {total / quantidade:>10.1f} bytes/entidade")
+    return objetos
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    print(f"Entidades por medição: {quantidade}\n")
+
+    temperamento = ["Calmo"] # Lista compartilhada: mede só a entidade, não os dados de entrada
+    adotante = Adotante(1, "Ana", 30, "Casa", 100.0, False, True, False)
+
+    medir("Evento", lambda i: Evento("Vacinação", "Recebeu vacina: V10"), quantidade)
+    medir("Gato (sem histórico)", lambda i: Gato(i, "SRD", "Mia", "F", 12, "P", temperamento, True), quantidade)
+    medir("Cachorro (sem histórico)", lambda i: Cachorro(i, "SRD", "Rex", "M", 12, "M", temperamento, True), quantidade)
+
+    def cachorro_com_eventos(i):
+        animal = Cachorro(i, "SRD", "Rex", "M", 12, "M", temperamento, True)
+        animal.adicionar_evento("Entrada", "Animal cadastrado no sistema.")
+        animal.vacinar("V10")
+        animal.treinar()
+        return animal
+    medir("Cachorro (3 eventos)", cachorro_com_eventos, quantidade)
+
+    medir("Adotante", lambda i: Adotante(i, "Ana", 30, "Casa", 100.0, False, True, False), quantidade)
+
+    gato = Gato(0, "SRD", "Mia", "F", 12, "P", temperamento, True)
+    agora = datetime.now()
+    medir("Reserva", lambda i: Reserva(gato, adotante, agora, agora), quantidade)
+    medir("Adocao", lambda i: Adocao(gato, adotante, 50.0), quantidade)
+
+
+if __name__ == "__main__":
+    main()
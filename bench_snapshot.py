@@ -0,0 +1,76 @@
+"""
+Benchmark de inicialização: JSON x snapshot binário.
+
+Gera uma base sintética numa pasta temporária, salva com o snapshot binário
+ativado (o que grava os dois formatos na mesma geração) e mede quanto tempo o
+SistemaAdocao leva para carregar a partir de cada um.
+
+Uso: python bench_snapshot.py [quantidade_de_animais]
+"""
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+
+from logic import SistemaAdocao
+from models import Cachorro, Gato, Adotante, Adocao, StatusAnimal
+from repository import Repositorio
+
+
+def gerar_base(quantidade):
+    aleatorio = random.Random(42)
+    racas = ["SRD", "Poodle", "Labrador", "Siamês", "Persa", "Vira-lata", "Pinscher"]
+    temperamentos = [["Calmo"], ["Agitado", "Fofo"], ["Dócil", "Amoroso"], ["Independente"], []]
+    status = list(StatusAnimal)
+
+    animais = []
+    for i in range(quantidade):
+        classe = Cachorro if i % 2 else Gato
+        animal = classe(i + 1, aleatorio.choice(racas), f"Bicho {i % 20000}", aleatorio.choice("MF"),
+                        aleatorio.randint(1, 200), aleatorio.choice("PMG"), aleatorio.choice(temperamentos), True)
+        animal._status = aleatorio.choice(status)
+        animais.append(animal)
+
+    adotantes = [Adotante(i + 1, f"Pessoa {i}", aleatorio.randint(18, 90), aleatorio.choice(["Casa", "Apartamento"]),
+                          float(aleatorio.randint(20, 300)), aleatorio.random() < 0.5,
+                          aleatorio.random() < 0.5, aleatorio.random() < 0.5)
+                 for i in range(max(1, quantidade // 10))]
+    adocoes = [Adocao(animal, aleatorio.choice(adotantes), 50.0)
+               for animal in animais if animal._status is StatusAnimal.ADOTADO]
+    return animais, adotantes, adocoes
+
+
+def medir_carga(pasta, binario):
+    gc.collect() # Libera o SistemaAdocao da medição anterior (ciclos via observador) antes de cronometrar
+    inicio = time.perf_counter()
+    sistema = SistemaAdocao(repo=Repositorio(pasta=pasta, snapshot_binario=binario))
+    return time.perf_counter() - inicio, len(sistema.animais)
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    print(f"Gerando {quantidade} animais...")
+    animais, adotantes, adocoes = gerar_base(quantidade)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        Repositorio(pasta=pasta, snapshot_binario=True).salvar_dados(animais, adocoes, adotantes)
+        del animais, adotantes, adocoes
+
+        tamanho_json = sum(os.path.getsize(os.path.join(pasta, nome)) for nome in
+                           ("database_animais.json", "database_adotantes.json", "database_adocoes.json"))
+        tamanho_binario = os.path.getsize(os.path.join(pasta, "database_snapshot.bin"))
+        print(f"Tamanho: JSON {tamanho_json / 2**20:.1f} MiB | binário {tamanho_binario / 2**20:.1f} MiB\n")
+
+        tempo_json, n_json = medir_carga(pasta, binario=False)
+        tempo_binario, n_binario = medir_carga(pasta, binario=True)
+        assert n_json == n_binario == quantidade
+
+        print(f"{'Carga do JSON':<28} {tempo_json:>8.2f} s")
+        print(f"{'Carga do snapshot binário':<28} {tempo_binario:>8.2f} s")
+        print(f"{'Aceleração':<28} {tempo_json / tempo_binario:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Catálogo somente leitura de animais e adoções, para processos de relatório.
+
+O Repositorio grava database_catalogo.bin a cada geração (opção
+`persistencia.catalogo_relatorios`); os processos de relatório o abrem com
+`mmap` e leem os campos direto das páginas do arquivo, sem desserializar nada
+e sem montar o SistemaAdocao. Vários processos abrindo o mesmo arquivo
+compartilham uma única cópia no page cache do sistema operacional.
+
+Layout (little-endian):
+
+    cabeçalho  mágico "POOPETCT", versão, contagens, geração e offsets das seções
+    strings    quantidade, offsets (uint32, n+1) e o texto UTF-8 concatenado
+    animais    registros de tamanho fixo (REGISTRO_ANIMAL)
+    adoções    registros de tamanho fixo (REGISTRO_ADOCAO), com a posição do
+               animal no catálogo
+
+As visões (`VisaoAnimal`, `VisaoAdocao`) têm os mesmos atributos que
+Relatorios usa nos objetos do domínio, então `Relatorios.tempo_medio_adocao`
+e `Relatorios.taxa_adocoes_por_tipo` rodam sobre elas sem alteração.
+"""
+import mmap
+import struct
+from datetime import date
+
+MAGICO = b"POOPETCT"
+VERSAO = 1
+CABECALHO = struct.Struct("<8sHHIIQQQQ") # mágico, versão, reservado, animais, adoções, geração, offsets (strings, animais, adoções)
+
+# id, especie, raca, nome, sexo, idade_meses, porte, status, data_entrada (ordinal), máscara de temperamento
+REGISTRO_ANIMAL = struct.Struct("<qiiiiqiiiB3x")
+# posição do animal no catálogo, id do adotante, data da adoção (ordinal), taxa
+REGISTRO_ADOCAO = struct.Struct("<iqid")
+
+NULO = -1
+INTEIRO_NULO = -(1 << 63)
+
+
+def _campos(estrutura, nomes):
+    """Mapeia cada campo do registro para (Struct de um valor, deslocamento dentro do registro)."""
+    campos, deslocamento = {}, 0
+    for nome, tipo in zip(nomes, estrutura.format.lstrip("<").replace("3x", "")):
+        unico = struct.Struct("<" + tipo)
+        campos[nome] = (unico, deslocamento)
+        deslocamento += unico.size
+    return campos
+
+
+_CAMPOS_ANIMAL = _campos(REGISTRO_ANIMAL, ("id", "especie", "raca", "nome", "sexo", "idade_meses",
+                                           "porte", "status", "data_entrada", "mascara"))
+_CAMPOS_ADOCAO = _campos(REGISTRO_ADOCAO, ("animal", "adotante_id", "data_adocao", "taxa"))
+
+
+# --- Escrita ---
+def serializar(animais, adocoes, geracao: int) -> bytes:
+    """Monta o catálogo em memória. Levanta ValueError se algo não couber no formato."""
+    indices, textos = {}, []
+
+    def texto(valor):
+        if valor is None:
+            return NULO
+        indice = indices.get(valor)
+        if indice is None:
+            if not isinstance(valor, str):
+                raise ValueError(f"Texto não suportado no catálogo: {valor!r}")
+            indice = indices[valor] = len(textos)
+            textos.append(valor)
+        return indice
+
+    posicoes = {} # id(animal) -> posição no catálogo
+    registros_animais = []
+    try:
+        for posicao, animal in enumerate(animais):
+            posicoes[id(animal)] = posicao
+            registros_animais.append(REGISTRO_ANIMAL.pack(
+                animal.id, texto(animal.especie), texto(animal.raca), texto(animal.nome), texto(animal.sexo),
+                INTEIRO_NULO if animal.idade_meses is None else animal.idade_meses, texto(animal.porte),
+                texto(animal.status), animal.data_entrada.toordinal(), animal.mascara_temperamento))
+        registros_adocoes = [
+            REGISTRO_ADOCAO.pack(posicoes.get(id(adocao.animal), NULO), adocao.adotante.id,
+                                 adocao.data_adocao.toordinal(), adocao.taxa)
+            for adocao in adocoes
+        ]
+    except struct.error as e:
+        raise ValueError(f"Valor fora do formato do catálogo: {e}")
+
+    codificados = [t.encode('utf-8') for t in textos]
+    offsets, total = [0], 0
+    for c in codificados:
+        total += len(c)
+        offsets.append(total)
+    secao_strings = struct.pack(f"<I{len(offsets)}I", len(textos), *offsets) + b"".join(codificados)
+
+    inicio_strings = CABECALHO.size
+    inicio_animais = inicio_strings + len(secao_strings)
+    inicio_adocoes = inicio_animais + REGISTRO_ANIMAL.size * len(registros_animais)
+    cabecalho = CABECALHO.pack(MAGICO, VERSAO, 0, len(registros_animais), len(registros_adocoes), geracao,
+                               inicio_strings, inicio_animais, inicio_adocoes)
+    return b"".join([cabecalho, secao_strings] + registros_animais + registros_adocoes)
+
+
+# --- Leitura (visões sobre o mmap) ---
+class VisaoAnimal:
+    """Animal do catálogo: cada atributo é lido do registro no momento do acesso."""
+    __slots__ = ('_catalogo', '_inicio', 'posicao')
+
+    def __init__(self, catalogo, posicao):
+        self._catalogo = catalogo
+        self.posicao = posicao
+        self._inicio = catalogo._inicio_animais + posicao * REGISTRO_ANIMAL.size
+
+    def _ler(self, campo):
+        estrutura, deslocamento = _CAMPOS_ANIMAL[campo]
+        return estrutura.unpack_from(self._catalogo._mapa, self._inicio + deslocamento)[0]
+
+    id = property(lambda self: self._ler("id"))
+    especie = property(lambda self: self._catalogo.texto(self._ler("especie")))
+    raca = property(lambda self: self._catalogo.texto(self._ler("raca")))
+    nome = property(lambda self: self._catalogo.texto(self._ler("nome")))
+    sexo = property(lambda self: self._catalogo.texto(self._ler("sexo")))
+    porte = property(lambda self: self._catalogo.texto(self._ler("porte")))
+    status = property(lambda self: self._catalogo.texto(self._ler("status")))
+    mascara_temperamento = property(lambda self: self._ler("mascara"))
+
+    @property
+    def idade_meses(self):
+        valor = self._ler("idade_meses")
+        return None if valor == INTEIRO_NULO else valor
+
+    @property
+    def data_entrada(self):
+        return date.fromordinal(self._ler("data_entrada"))
+
+
+class VisaoAdocao:
+    """Adoção do catálogo; `animal` é a VisaoAnimal correspondente (ou None)."""
+    __slots__ = ('_catalogo', '_inicio')
+
+    def __init__(self, catalogo, posicao):
+        self._catalogo = catalogo
+        self._inicio = catalogo._inicio_adocoes + posicao * REGISTRO_ADOCAO.size
+
+    def _ler(self, campo):
+        estrutura, deslocamento = _CAMPOS_ADOCAO[campo]
+        return estrutura.unpack_from(self._catalogo._mapa, self._inicio + deslocamento)[0]
+
+    adotante_id = property(lambda self: self._ler("adotante_id"))
+    taxa = property(lambda self: self._ler("taxa"))
+
+    @property
+    def animal(self):
+        posicao = self._ler("animal")
+        return None if posicao == NULO else VisaoAnimal(self._catalogo, posicao)
+
+    @property
+    def data_adocao(self):
+        return date.fromordinal(self._ler("data_adocao"))
+
+
+class _Registros:
+    """Sequência somente leitura de visões (len, índice e iteração)."""
+    __slots__ = ('_catalogo', '_quantidade', '_visao')
+
+    def __init__(self, catalogo, quantidade, visao):
+        self._catalogo = catalogo
+        self._quantidade = quantidade
+        self._visao = visao
+
+    def __len__(self):
+        return self._quantidade
+
+    def __getitem__(self, posicao):
+        if posicao < 0:
+            posicao += self._quantidade
+        if not 0 <= posicao < self._quantidade:
+            raise IndexError("Posição fora do catálogo.")
+        return self._visao(self._catalogo, posicao)
+
+    def __iter__(self):
+        for posicao in range(self._quantidade):
+            yield self._visao(self._catalogo, posicao)
+
+
+class CatalogoAnimais:
+    """
+    Abre database_catalogo.bin via mmap (somente leitura).
+
+        with CatalogoAnimais(caminho) as catalogo:
+            Relatorios.tempo_medio_adocao(catalogo.adocoes)
+    """
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        with open(caminho, 'rb') as f:
+            # O mapeamento continua válido depois de fechar o arquivo (e mesmo se ele for substituído)
+            self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magico, versao, _, n_animais, n_adocoes, self.geracao, inicio_strings, \
+                self._inicio_animais, self._inicio_adocoes = CABECALHO.unpack_from(self._mapa)
+        except struct.error:
+            self.fechar()
+            raise ValueError("Catálogo truncado.")
+        if magico != MAGICO or versao != VERSAO:
+            self.fechar()
+            raise ValueError("Catálogo de outro formato ou versão.")
+        if self._inicio_adocoes + n_adocoes * REGISTRO_ADOCAO.size > len(self._mapa):
+            self.fechar()
+            raise ValueError("Catálogo truncado.")
+
+        (n_strings,) = struct.unpack_from("<I", self._mapa, inicio_strings)
+        self._offsets_strings = inicio_strings + 4
+        self._inicio_texto = self._offsets_strings + 4 * (n_strings + 1)
+        self._textos = {} # Cache por índice: espécie, porte e status se repetem em quase todo registro
+
+        self.animais = _Registros(self, n_animais, VisaoAnimal)
+        self.adocoes = _Registros(self, n_adocoes, VisaoAdocao)
+
+    def texto(self, indice):
+        if indice == NULO:
+            return None
+        valor = self._textos.get(indice)
+        if valor is None:
+            inicio, fim = struct.unpack_from("<II", self._mapa, self._offsets_strings + 4 * indice)
+            base = self._inicio_texto
+            valor = self._mapa[base + inicio:base + fim].decode('utf-8')
+            if len(self._textos) < 4096:
+                self._textos[indice] = valor
+        return valor
+
+    def fechar(self):
+        self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
@@ -0,0 +1,257 @@
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError: # NumPy é opcional: sem ele o SistemaAdocao continua no cálculo escalar
+    np = None
+
+# Temperamentos que pesam quando o adotante tem crianças
+TEMPERAMENTOS_RUINS = frozenset(["agitado", "arisco", "bravo", "raivoso", "agressivo", "nervoso", "independente", "assustado"])
+TEMPERAMENTOS_BONS = frozenset(["dócil", "calmo", "amoroso", "carinhoso", "fofo", "paciente"])
+
+# Bits da máscara de temperamento
+TEMPERAMENTO_RUIM = 1
+TEMPERAMENTO_BOM = 2
+
+
+def mascara_temperamento(temperamento) -> int:
+    """Resume a lista de temperamentos em bits (RUIM/BOM), ignorando maiúsculas."""
+    mascara = 0
+    for t in temperamento:
+        t = t.lower()
+        if t in TEMPERAMENTOS_RUINS:
+            mascara |= TEMPERAMENTO_RUIM
+        elif t in TEMPERAMENTOS_BONS:
+            mascara |= TEMPERAMENTO_BOM
+    return mascara
+
+
+class PontuadorCompatibilidade:
+    """
+    Versão "compilada" de `calcular_compatibilidade` para um par (animal, adotante).
+
+    Os pesos do settings.json viram atributos uma única vez; a moradia já vem
+    normalizada no Adotante e o temperamento já vem resumido em bits no Animal,
+    então o laço interno não aloca listas nem strings. Deve ser recriado quando
+    as configurações forem recarregadas.
+    """
+    def __init__(self, config: dict):
+        pesos = config.get('pesos_compatibilidade', {})
+        self.peso_casa = pesos.get('moradia_casa', 10)
+        self.peso_apto_pequeno = pesos.get('moradia_apto_pequeno', -10)
+        self.peso_experiencia = pesos.get('experiencia', 10)
+
+    def pontuar(self, animal, adotante):
+        """Calcula score de 0 a 100 (mesmas regras e mesma ordem de soma do cálculo original)."""
+        score = 50 # Base inicial
+
+        # 1. Regra de Moradia vs Porte
+        moradia = adotante.moradia_normalizada
+        if moradia == 'casa':
+            score += self.peso_casa
+        elif moradia == 'apartamento' and adotante.area_util < 50:
+            if animal.porte == 'G':
+                score -= 20 # Penalidade forte para animal grande em apto pequeno
+            else:
+                score += self.peso_apto_pequeno
+
+        # 2. Regra de Experiência
+        if adotante.experiencia_pets:
+            score += self.peso_experiencia
+
+        # 3. Regra de Crianças vs Temperamento
+        if adotante.possui_criancas:
+            mascara = animal.mascara_temperamento
+            if mascara & TEMPERAMENTO_RUIM:
+                score -= 30 # Penalidade alta
+            elif mascara & TEMPERAMENTO_BOM:
+                score += 15 # Bônus
+
+        # 4. Idoso vs idade do animal
+        if adotante.idade > 60:
+            if animal.idade_meses < 24:
+                score -= 15 # Idoso com filhote pode ser difícil
+            elif animal.idade_meses > 60:
+                score += 15 # Idoso com animal adulto/idoso é match perfeito
+
+        # Normaliza para 0-100
+        return max(0, min(100, score))
+
+
+class CacheCompatibilidade:
+    """
+    LRU limitado de scores, por (id do animal, id do adotante, versão das configurações).
+
+    Reserva, fila de espera, adoção e recomendações pontuam os mesmos pares
+    várias vezes; aqui cada par é calculado uma vez enquanto nada muda. Cada
+    entrada guarda os dois objetos e a `_versao_perfil` de cada um: se o
+    adotante mudar idade, moradia, área, experiência ou crianças, ou o animal
+    mudar porte, temperamento ou idade, a versão sobe e a entrada deixa de
+    valer (conta em `invalidadas` e é recalculada). É a mesma versão que o
+    IndiceRecomendacao confere para trocar entradas de balde. Guardar os
+    objetos também evita que dois registros com o mesmo id compartilhem score.
+
+    Ao recarregar as configurações, `limpar` esvazia o cache e troca o
+    pontuador e a versão. `estatisticas()` expõe acertos e falhas para
+    dimensionar `capacidade`; capacidade 0 desliga o cache.
+    """
+    def __init__(self, pontuar, capacidade: int = 100_000, versao_config: int = 0):
+        self._pontuar = pontuar
+        self.capacidade = capacidade
+        self.versao_config = versao_config
+        self._entradas = OrderedDict() # chave -> (animal, adotante, versão do animal, versão do adotante, score)
+        self.acertos = 0
+        self.falhas = 0
+        self.invalidadas = 0
+
+    def pontuar(self, animal, adotante):
+        if not self.capacidade:
+            return self._pontuar(animal, adotante)
+        chave = (animal.id, adotante.id, self.versao_config)
+        entrada = self._entradas.get(chave)
+        if entrada is not None:
+            if (entrada[0] is animal and entrada[1] is adotante and entrada[2] == animal._versao_perfil
+                    and entrada[3] == adotante._versao_perfil):
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return entrada[4]
+            self.invalidadas += 1
+
+        self.falhas += 1
+        score = self._pontuar(animal, adotante)
+        self._entradas[chave] = (animal, adotante, animal._versao_perfil, adotante._versao_perfil, score)
+        self._entradas.move_to_end(chave)
+        if len(self._entradas) > self.capacidade:
+            self._entradas.popitem(last=False)
+        return score
+
+    def limpar(self, pontuar=None, versao_config: int = None):
+        """Esvazia o cache; com `pontuar`/`versao_config`, passa a usar o novo pontuador (configurações recarregadas)."""
+        self._entradas.clear()
+        if pontuar is not None:
+            self._pontuar = pontuar
+        if versao_config is not None:
+            self.versao_config = versao_config
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def estatisticas(self) -> dict:
+        consultas = self.acertos + self.falhas
+        return {"entradas": len(self._entradas), "capacidade": self.capacidade, "acertos": self.acertos,
+                "falhas": self.falhas, "invalidadas": self.invalidadas,
+                "taxa_acerto": self.acertos / consultas if consultas else 0.0}
+
+
+class MotorCompatibilidade:
+    """
+    Calcula a matriz de compatibilidade (animais x adotantes) de uma vez com NumPy.
+
+    Animais e adotantes são codificados em vetores de características (moradia,
+    área, experiência, crianças, idade acima de 60, idade do animal em meses,
+    porte e máscara de temperamento) e a pontuação é montada por broadcasting,
+    com as mesmas regras e pesos do `PontuadorCompatibilidade`. O resultado é
+    idêntico ao cálculo escalar, par a par.
+
+    Para não estourar memória, `blocos()`/`medias()` processam os animais em
+    fatias de no máximo `max_elementos` células da matriz por vez.
+    """
+    def __init__(self, config: dict, max_elementos: int = 2_000_000):
+        if np is None:
+            raise ImportError("MotorCompatibilidade requer NumPy (pip install numpy).")
+        pesos = config.get('pesos_compatibilidade', {})
+        self.peso_casa = pesos.get('moradia_casa', 10)
+        self.peso_apto_pequeno = pesos.get('moradia_apto_pequeno', -10)
+        self.peso_experiencia = pesos.get('experiencia', 10)
+        self.max_elementos = max_elementos
+
+        # Pesos inteiros (o caso do settings.json) mantêm a aritmética exata em int64
+        pesos_usados = (self.peso_casa, self.peso_apto_pequeno, self.peso_experiencia)
+        self.dtype = np.int64 if all(isinstance(p, int) for p in pesos_usados) else np.float64
+
+    @staticmethod
+    def disponivel() -> bool:
+        return np is not None
+
+    # --- Codificação ---
+    def codificar_adotantes(self, adotantes):
+        """Retorna (base com moradia casa, apto_pequeno, termo de experiência, criancas, idoso)."""
+        n = len(adotantes)
+        casa = np.zeros(n, dtype=bool)
+        apto_pequeno = np.zeros(n, dtype=bool)
+        experiencia = np.zeros(n, dtype=bool)
+        criancas = np.zeros(n, dtype=bool)
+        idoso = np.zeros(n, dtype=bool)
+        for i, ad in enumerate(adotantes):
+            moradia = ad.moradia_normalizada
+            casa[i] = moradia == 'casa'
+            apto_pequeno[i] = moradia == 'apartamento' and ad.area_util < 50
+            experiencia[i] = ad.experiencia_pets
+            criancas[i] = ad.possui_criancas
+            idoso[i] = ad.idade > 60
+
+        base = np.full(n, 50, dtype=self.dtype)
+        base += casa * self.dtype(self.peso_casa)
+        termo_experiencia = experiencia * self.dtype(self.peso_experiencia)
+        return base, apto_pequeno, termo_experiencia, criancas, idoso
+
+    def codificar_animais(self, animais):
+        """Retorna os termos por animal: (penalidade em apto pequeno, termo de crianças, termo de idoso)."""
+        n = len(animais)
+        grande = np.zeros(n, dtype=bool)
+        temperamento = np.zeros(n, dtype=np.int8)
+        idade_meses = np.zeros(n, dtype=np.int64)
+        for i, animal in enumerate(animais):
+            grande[i] = animal.porte == 'G'
+            temperamento[i] = animal.mascara_temperamento
+            idade_meses[i] = animal.idade_meses
+
+        termo_apto = np.where(grande, self.dtype(-20), self.dtype(self.peso_apto_pequeno))
+        # Temperamento ruim tem precedência sobre bom (mesmo if/elif do cálculo escalar)
+        termo_criancas = np.where(temperamento & TEMPERAMENTO_RUIM, -30,
+                                  np.where(temperamento & TEMPERAMENTO_BOM, 15, 0)).astype(self.dtype)
+        termo_idoso = np.where(idade_meses < 24, -15, np.where(idade_meses > 60, 15, 0)).astype(self.dtype)
+        return termo_apto, termo_criancas, termo_idoso
+
+    # --- Cálculo ---
+    @staticmethod
+    def _pontuar(cod_animais, cod_adotantes):
+        termo_apto, termo_criancas, termo_idoso = cod_animais
+        base, apto_pequeno, termo_experiencia, criancas, idoso = cod_adotantes
+        # Soma na mesma ordem das regras escalares (importa para pesos float)
+        matriz = base[None, :] + apto_pequeno[None, :] * termo_apto[:, None]
+        matriz = matriz + termo_experiencia[None, :]
+        matriz = matriz + criancas[None, :] * termo_criancas[:, None]
+        matriz = matriz + idoso[None, :] * termo_idoso[:, None]
+        return np.clip(matriz, 0, 100)
+
+    def matriz(self, animais, adotantes):
+        """Matriz completa (len(animais) x len(adotantes)). Para populações grandes prefira `blocos()`."""
+        return self._pontuar(self.codificar_animais(animais), self.codificar_adotantes(adotantes))
+
+    def blocos(self, animais, adotantes):
+        """Gera (inicio, bloco) com fatias de linhas da matriz, respeitando `max_elementos`."""
+        cod_adotantes = self.codificar_adotantes(adotantes)
+        cod_animais = self.codificar_animais(animais)
+        passo = max(1, self.max_elementos // max(1, len(adotantes)))
+        for inicio in range(0, len(animais), passo):
+            fatia = tuple(termo[inicio:inicio + passo] for termo in cod_animais)
+            yield inicio, self._pontuar(fatia, cod_adotantes)
+
+    def iterar_medias(self, animais, adotantes):
+        """Gera a compatibilidade média de cada animal, na ordem de `animais`, bloco a bloco."""
+        if not adotantes:
+            for _ in animais:
+                yield 0
+            return
+        for inicio, bloco in self.blocos(animais, adotantes):
+            if self.dtype is np.int64:
+                somas = bloco.sum(axis=1)
+            else:
+                # cumsum acumula da esquerda para a direita, como o sum() do Python (sum() do NumPy é pairwise)
+                somas = np.cumsum(bloco, axis=1)[:, -1]
+            yield from (somas / len(adotantes)).tolist()
+
+    def medias(self, animais, adotantes):
+        """Compatibilidade média de cada animal com todos os adotantes (memória limitada por bloco)."""
+        return np.fromiter(self.iterar_medias(animais, adotantes), dtype=np.float64, count=len(animais))
@@ -0,0 +1,130 @@
+"""
+Triagem de elegibilidade de adotantes, sem E/S de console.
+
+`RegrasElegibilidade` compila as regras de `Adotante.verificar_elegibilidade`
+com os limites do settings.json:
+
+    idade_minima_adotante              idade mínima do adotante (18)
+    elegibilidade.moradia_porte_grande moradia exigida para porte grande ("casa")
+    elegibilidade.area_minima_porte_grande  área útil mínima para porte grande (80 m²)
+
+`motivos()` devolve códigos (`MotivoInelegibilidade`) em vez de imprimir, e
+`mascara()` tria muitos adotantes contra muitos animais de uma vez: as regras
+só dependem do adotante e de o animal ser de porte grande, então cada adotante
+é avaliado uma vez para "qualquer porte" e uma vez para "porte grande" (com
+NumPy, vetorizado) e a linha da máscara sai dessas duas respostas.
+"""
+from enum import Enum
+
+try:
+    import numpy as np
+except ImportError: # NumPy é opcional: sem ele a máscara é montada com listas
+    np = None
+
+PORTE_GRANDE = "G"
+
+
+class MotivoInelegibilidade(Enum):
+    MENOR_IDADE = "MENOR_IDADE"
+    CRIANCAS_SEM_EXPERIENCIA = "CRIANCAS_SEM_EXPERIENCIA"
+    MORADIA_PORTE_GRANDE = "MORADIA_PORTE_GRANDE"
+    AREA_PORTE_GRANDE = "AREA_PORTE_GRANDE"
+
+    @property
+    def depende_do_animal(self) -> bool:
+        return self in (MotivoInelegibilidade.MORADIA_PORTE_GRANDE, MotivoInelegibilidade.AREA_PORTE_GRANDE)
+
+
+class RegrasElegibilidade:
+    """
+    Regras de elegibilidade com os limites do settings.json. Deve ser recriada
+    quando as configurações forem recarregadas.
+    """
+    def __init__(self, config: dict = None):
+        config = config or {}
+        opcoes = config.get('elegibilidade', {})
+        self.idade_minima = config.get('idade_minima_adotante', 18)
+        self.moradia_porte_grande = opcoes.get('moradia_porte_grande', "casa").lower()
+        self.area_minima_porte_grande = opcoes.get('area_minima_porte_grande', 80)
+
+    # --- Um adotante ---
+    def motivos(self, adotante, animal=None) -> list:
+        """Códigos de todas as regras que o adotante não cumpre (lista vazia = elegível)."""
+        motivos = []
+        # Regra 1: Idade Mínima
+        if adotante.idade < self.idade_minima:
+            motivos.append(MotivoInelegibilidade.MENOR_IDADE)
+        # Regra 2: Crianças vs Experiência
+        if adotante.possui_criancas and not adotante.experiencia_pets:
+            motivos.append(MotivoInelegibilidade.CRIANCAS_SEM_EXPERIENCIA)
+        # Regra 3: Porte vs Moradia
+        if animal is not None and animal.porte == PORTE_GRANDE:
+            if adotante.moradia_normalizada != self.moradia_porte_grande:
+                motivos.append(MotivoInelegibilidade.MORADIA_PORTE_GRANDE)
+            elif adotante.area_util < self.area_minima_porte_grande:
+                motivos.append(MotivoInelegibilidade.AREA_PORTE_GRANDE)
+        return motivos
+
+    def elegivel(self, adotante, animal=None) -> bool:
+        return not self.motivos(adotante, animal)
+
+    def mensagem(self, motivo: MotivoInelegibilidade, adotante) -> str:
+        """Texto para o usuário (o mesmo que `verificar_elegibilidade` imprime)."""
+        if motivo is MotivoInelegibilidade.MENOR_IDADE:
+            return f"Adotante menor de idade ({adotante.idade} anos)."
+        if motivo is MotivoInelegibilidade.CRIANCAS_SEM_EXPERIENCIA:
+            return "Possui crianças mas não tem experiência com pets."
+        if motivo is MotivoInelegibilidade.MORADIA_PORTE_GRANDE:
+            return f"Animais de grande porte exigem moradia em {self.moradia_porte_grande.capitalize()}."
+        return "Área útil insuficiente para animal de grande porte."
+
+    # --- Em lote ---
+    def _colunas(self, adotantes):
+        """(elegível para qualquer porte, elegível também para porte grande), por adotante."""
+        base, grande = [], []
+        idade_minima, moradia, area_minima = self.idade_minima, self.moradia_porte_grande, self.area_minima_porte_grande
+        for ad in adotantes:
+            ok = ad.idade >= idade_minima and not (ad.possui_criancas and not ad.experiencia_pets)
+            base.append(ok)
+            grande.append(ok and ad.moradia_normalizada == moradia and ad.area_util >= area_minima)
+        return base, grande
+
+    def mascara(self, adotantes, animais):
+        """
+        Elegibilidade de cada adotante para cada animal: `m[i][j]` é True se
+        adotantes[i] pode adotar animais[j]. Com NumPy devolve um array bool
+        (adotantes x animais); sem ele, uma lista de tuplas (as linhas iguais
+        são o mesmo objeto).
+        """
+        adotantes, animais = list(adotantes), list(animais)
+        if np is not None:
+            return self._mascara_numpy(adotantes, animais)
+
+        grandes = [animal.porte == PORTE_GRANDE for animal in animais]
+        nenhum = (False,) * len(animais)
+        todos = (True,) * len(animais)
+        sem_grandes = tuple(not g for g in grandes)
+        return [(todos if pode_grande else sem_grandes) if pode else nenhum
+                for pode, pode_grande in zip(*self._colunas(adotantes))]
+
+    def _mascara_numpy(self, adotantes, animais):
+        n = len(adotantes)
+        idade = np.fromiter((ad.idade for ad in adotantes), dtype=np.float64, count=n)
+        area = np.fromiter((ad.area_util for ad in adotantes), dtype=np.float64, count=n)
+        criancas = np.fromiter((ad.possui_criancas for ad in adotantes), dtype=bool, count=n)
+        experiencia = np.fromiter((ad.experiencia_pets for ad in adotantes), dtype=bool, count=n)
+        moradia = np.fromiter((ad.moradia_normalizada == self.moradia_porte_grande for ad in adotantes),
+                              dtype=bool, count=n)
+        grande = np.fromiter((animal.porte == PORTE_GRANDE for animal in animais), dtype=bool, count=len(animais))
+
+        pode = (idade >= self.idade_minima) & ~(criancas & ~experiencia)
+        pode_grande = pode & moradia & (area >= self.area_minima_porte_grande)
+        return np.where(grande[None, :], pode_grande[:, None], pode[:, None])
+
+    def motivos_em_lote(self, adotantes, animal=None) -> list:
+        """`motivos()` de cada adotante contra o mesmo animal (ou nenhum), na ordem de `adotantes`."""
+        return [self.motivos(adotante, animal) for adotante in adotantes]
+
+
+# Limites padrão (sem settings.json), usados por Adotante.verificar_elegibilidade sem regras explícitas
+REGRAS_PADRAO = RegrasElegibilidade()
@@ -0,0 +1,170 @@
+"""
+Registro central de eventos dos animais, para consultas da base inteira por período.
+
+O histórico de cada animal (`Animal.historico`) continua sendo a fonte salva;
+aqui os eventos de todos os animais ficam em colunas compactas (`array`):
+
+    tempos      int64, microssegundos desde 1970-01-01 (horário local, sem fuso)
+    tipos       código do tipo ("Vacinação", "Entrada", ...), internado
+    descricoes  código da descrição na tabela de textos (descrições se repetem muito)
+    animais     id do animal
+
+Um índice de tempo geral e um por tipo guardam (tempo, linha) em ordem, então
+"todas as vacinações do mês passado" é uma busca binária nas duas pontas da
+faixa: O(log n + k). Eventos chegam quase sempre em ordem; um evento antigo
+(histórico carregado depois, devolução retroativa) só marca o índice para ser
+reordenado uma vez na próxima consulta.
+
+Na montagem, históricos que ainda estão só no repositório entram pelo formato
+salvo (`adicionar_salvo`), lidos em sequência do arquivo/banco: nenhuma lista
+de `Evento` é criada e os animais continuam com o histórico adiado.
+"""
+import bisect
+from array import array
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+EPOCA = datetime(1970, 1, 1)
+MICROSSEGUNDO = timedelta(microseconds=1)
+
+EventoRegistrado = namedtuple("EventoRegistrado", ["animal_id", "tipo", "descricao", "data"])
+
+
+def para_epoca(data) -> int:
+    """datetime (ou date, à meia-noite) -> microssegundos desde EPOCA."""
+    if not isinstance(data, datetime):
+        data = datetime.combine(data, datetime.min.time())
+    elif data.tzinfo is not None:
+        data = data.astimezone().replace(tzinfo=None)
+    return (data - EPOCA) // MICROSSEGUNDO
+
+
+def de_epoca(valor: int) -> datetime:
+    return EPOCA + timedelta(microseconds=valor)
+
+
+class _TabelaTextos:
+    """Strings internadas: cada texto distinto é guardado uma vez e referenciado pelo código."""
+    __slots__ = ('textos', '_codigos')
+
+    def __init__(self):
+        self.textos = []
+        self._codigos = {}
+
+    def codigo(self, texto, criar=True):
+        codigo = self._codigos.get(texto)
+        if codigo is None and criar:
+            codigo = self._codigos[texto] = len(self.textos)
+            self.textos.append(texto)
+        return codigo
+
+
+class _IndiceTempo:
+    """Linhas em ordem de (tempo, linha), em duas colunas paralelas."""
+    __slots__ = ('tempos', 'linhas', '_ordenado')
+
+    def __init__(self):
+        self.tempos = array('q')
+        self.linhas = array('q')
+        self._ordenado = True
+
+    def adicionar(self, tempo, linha):
+        if self.tempos and tempo < self.tempos[-1]:
+            self._ordenado = False
+        self.tempos.append(tempo)
+        self.linhas.append(linha)
+
+    def _ordenar(self):
+        pares = sorted(zip(self.tempos, self.linhas))
+        self.tempos = array('q', (tempo for tempo, _ in pares))
+        self.linhas = array('q', (linha for _, linha in pares))
+        self._ordenado = True
+
+    def faixa(self, inicio, fim):
+        """(i, j) das posições com inicio <= tempo < fim (None = sem limite)."""
+        if not self._ordenado:
+            self._ordenar()
+        i = 0 if inicio is None else bisect.bisect_left(self.tempos, inicio)
+        j = len(self.tempos) if fim is None else bisect.bisect_left(self.tempos, fim)
+        return i, max(i, j)
+
+
+class RegistroEventos:
+    """
+    Eventos de todos os animais em colunas, com índice de tempo geral e por tipo.
+
+        registro.adicionar(animal.id, evento)
+        registro.consultar(inicio=date(2026, 9, 1), fim=date(2026, 10, 1), tipo="Vacinação")
+    """
+    def __init__(self):
+        self._tempos = array('q')
+        self._tipos = array('I')
+        self._descricoes = array('I')
+        self._animais = array('q')
+        self._nomes_tipos = _TabelaTextos()
+        self._textos = _TabelaTextos()
+        self._por_tempo = _IndiceTempo()
+        self._por_tipo = {} # código do tipo -> _IndiceTempo
+
+    def __len__(self):
+        return len(self._tempos)
+
+    def adicionar(self, animal_id: int, evento):
+        """Acrescenta um `Evento` (tipo, descricao, data) do animal dado."""
+        self._adicionar(animal_id, evento.tipo, evento.descricao, para_epoca(evento.data))
+
+    def adicionar_salvo(self, animal_id: int, dados: dict):
+        """Acrescenta um evento no formato salvo ({"tipo", "descricao", "data" ISO}), sem criar o `Evento`."""
+        try:
+            data = datetime.fromisoformat(dados['data'])
+        except (KeyError, TypeError, ValueError):
+            data = datetime.now() # Mesma regra de Evento.from_dict
+        self._adicionar(animal_id, dados.get('tipo', ''), dados.get('descricao', ''), para_epoca(data))
+
+    def _adicionar(self, animal_id, tipo, descricao, tempo):
+        linha = len(self._tempos)
+        tipo = self._nomes_tipos.codigo(tipo)
+        self._tempos.append(tempo)
+        self._tipos.append(tipo)
+        self._descricoes.append(self._textos.codigo(descricao))
+        self._animais.append(animal_id)
+        self._por_tempo.adicionar(tempo, linha)
+        indice = self._por_tipo.get(tipo)
+        if indice is None:
+            indice = self._por_tipo[tipo] = _IndiceTempo()
+        indice.adicionar(tempo, linha)
+
+    @property
+    def tipos(self):
+        """Tipos de evento já vistos, na ordem em que apareceram."""
+        return list(self._nomes_tipos.textos)
+
+    def _faixa(self, inicio, fim, tipo):
+        if tipo is None:
+            indice = self._por_tempo
+        else:
+            codigo = self._nomes_tipos.codigo(tipo, criar=False)
+            indice = self._por_tipo.get(codigo) if codigo is not None else None
+            if indice is None:
+                return None, 0, 0
+        i, j = indice.faixa(None if inicio is None else para_epoca(inicio),
+                            None if fim is None else para_epoca(fim))
+        return indice, i, j
+
+    def contar(self, inicio=None, fim=None, tipo: str = None) -> int:
+        """Quantos eventos (do tipo, se dado) com inicio <= data < fim, em O(log n)."""
+        _, i, j = self._faixa(inicio, fim, tipo)
+        return j - i
+
+    def consultar(self, inicio=None, fim=None, tipo: str = None):
+        """
+        Eventos com inicio <= data < fim (datetime ou date; None = sem limite),
+        do tipo dado ou de todos, em ordem cronológica: lista de EventoRegistrado.
+        """
+        indice, i, j = self._faixa(inicio, fim, tipo)
+        if indice is None:
+            return []
+        tipos, textos = self._nomes_tipos.textos, self._textos.textos
+        return [EventoRegistrado(self._animais[linha], tipos[self._tipos[linha]], textos[self._descricoes[linha]],
+                                 de_epoca(self._tempos[linha]))
+                for linha in indice.linhas[i:j]]
@@ -1,186 +1,682 @@
-from models import Cachorro, Gato, Adotante, TaxaPadrao, TaxaIdoso, TaxaFilhote, TaxaEspecial, Relatorios, Adocao, StatusAnimal, RepositorioError
-from repository import Repositorio
+from models import Animal, Cachorro, Gato, Adotante, TaxaPadrao, TaxaIdoso, TaxaFilhote, TaxaEspecial, Relatorios, AgregadosRelatorio, Adocao, Devolucao, MotivoDevolucao, Evento, Reserva, StatusAnimal, RepositorioError
+from repository import criar_repositorio
+from agendador import AgendadorExpiracoes
+from recomendacao import IndiceRecomendacao
+from elegibilidade import RegrasElegibilidade
+from eventos import RegistroEventos
+from compatibilidade import CacheCompatibilidade, MotorCompatibilidade, PontuadorCompatibilidade
+import relatorios_paralelos
+import bisect
+import gc
 import json
 import os
-from datetime import datetime
+import threading
+from collections import defaultdict
+from datetime import date, datetime
+
+def carregar_configuracoes():
+    """Lê o arquivo settings.json"""
+    try:
+        caminho = os.path.join(os.path.dirname(__file__), 'settings.json')
+        with open(caminho, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
 
 class SistemaAdocao:
-    def __init__(self):
-        self.repo = Repositorio()
+    def __init__(self, repo=None):
         self.animais = []
         self.adotantes = []
         self.adocoes = []
+        self.devolucoes = []
+        # Índices O(1): por id e, para registros legados (que só guardam nomes), por nome
+        self._animais_por_id = {}
+        self._adotantes_por_id = {}
+        self._animais_por_nome = defaultdict(list)
+        self._adotantes_por_nome = defaultdict(list)
+        # Índice secundário por status: posições (em self.animais) em ordem crescente,
+        # para listar/indexar preservando a mesma ordem que a varredura da lista daria
+        self._posicoes_por_status = defaultdict(list)
+        self._posicao_animal = {} # id(objeto) -> posição em self.animais (Animal não é hashable)
+        self._posicao_adotante = {} # id(objeto) -> posição em self.adotantes
+        self._ultima_adocao = {} # id do animal -> adoção mais recente (quem devolve é esse adotante)
+        # Devoluções: posições em self.devolucoes por código de motivo e por id do animal
+        self._devolucoes_por_motivo = defaultdict(list)
+        self._devolucoes_por_animal = defaultdict(list)
+        # Próximo id de cada coleção: só avança (nunca reaproveita um id), persistido com os dados
+        self._proximos_ids = {"animal": 1, "adotante": 1}
+        # Baldes de animais disponíveis/adotantes para as recomendações (montados na primeira consulta)
+        self._recomendacao = None
+        # Eventos de todos os animais em colunas, para consultas por período (montado na primeira consulta)
+        self._eventos = None
         self.config = self._carregar_configuracoes()
-        
+        self.pontuador = PontuadorCompatibilidade(self.config) # Regras pré-compiladas a partir do settings.json
+        self.elegibilidade = RegrasElegibilidade(self.config) # Limites de idade/moradia/área do settings.json
+        self._versao_config = 0
+        self.cache_compatibilidade = CacheCompatibilidade(
+            self.pontuador.pontuar, self.config.get('cache_compatibilidade', {}).get('capacidade', 100_000))
+
+        # Permite injetar outro backend (ex: na migração JSON <-> SQLite)
+        self.repo = repo or criar_repositorio(self.config.get('persistencia', {}))
+        self._reproduzindo_journal = False
+        # Totais dos relatórios mantidos a cada adoção/devolução (None = ainda não calculados)
+        self._agregados = None
+        self._devolucoes_migradas = None # Devoluções criadas a partir do histórico de uma base antiga
+        self._devolucoes_pendentes = () # Do arquivo, ainda não registradas durante a carga
+
+        # Expiração de reservas: heap por data de vencimento + verificação periódica opcional
+        self.agendador = AgendadorExpiracoes()
+        self._trava = threading.RLock() # Serializa a verificação em segundo plano com as ações do menu
+        self._log_expiracoes = []
+        self._parar_verificacao = None
+
             # Carrega dados existentes
         try:
-            self._carregar_do_arquivo()
+            # Trava compartilhada: nenhum outro processo troca os arquivos no meio da leitura
+            with self.repo.trava(compartilhada=True):
+                self._carregar_do_arquivo()
+            # Grava a coleção migrada já: a migração lê todos os históricos e não deve se repetir a cada carga
+            if self._devolucoes_migradas is not None:
+                self.repo.gravar_devolucoes(self._devolucoes_migradas)
+                self._devolucoes_migradas = None
+            # Journal muito longo deixa a inicialização lenta: absorve no snapshot
+            if self.repo.precisa_compactar:
+                self.repo.compactar(self.animais, self.adocoes, self.adotantes, self.devolucoes, self._agregados,
+                                    self._proximos_ids)
         except RepositorioError as e:
             print(f"⚠️ Erro crítico ao carregar dados: {e}")
 
     def _carregar_configuracoes(self):
-        """Lê o arquivo settings.json"""
-        try:
-            caminho = os.path.join(os.path.dirname(__file__), 'settings.json')
-            with open(caminho, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
+        return carregar_configuracoes()
+
+    def recarregar_configuracoes(self):
+        """Relê o settings.json e recompila o que depende dele."""
+        self.config = self._carregar_configuracoes()
+        self.pontuador = PontuadorCompatibilidade(self.config)
+        self.elegibilidade = RegrasElegibilidade(self.config)
+        self._recomendacao = None # Baldes dependem dos limites de elegibilidade: remontados na próxima consulta
+        # Pesos podem ter mudado: nenhum score guardado vale mais
+        self._versao_config += 1
+        self.cache_compatibilidade.capacidade = self.config.get('cache_compatibilidade', {}).get('capacidade', 100_000)
+        self.cache_compatibilidade.limpar(self.pontuador.pontuar, self._versao_config)
 
     def calcular_compatibilidade(self, animal, adotante):
         """Calcula score de 0 a 100 baseado nas configurações."""
-        score = 50 # Base inicial
-        pesos = self.config.get('pesos_compatibilidade', {})
-        
-        # 1. Regra de Moradia vs Porte
-        if adotante.moradia.lower() == 'casa':
-            score += pesos.get('moradia_casa', 10)
-        elif adotante.moradia.lower() == 'apartamento':
-            if adotante.area_util < 50 and animal.porte == 'G':
-                score -= 20 # Penalidade forte para animal grande em apto pequeno
-            elif adotante.area_util < 50:
-                score += pesos.get('moradia_apto_pequeno', -10)
-            
-        # 2. Regra de Experiência
-        if adotante.experiencia_pets:
-            score += pesos.get('experiencia', 10)
-            
-        # 3. Regra de Crianças vs Temperamento
-        if adotante.possui_criancas:
-            
-            temperamentos_ruins = ["agitado", "arisco", "bravo", "raivoso", "agressivo", "nervoso", "independente", "assustado"]
-            # Lista de temperamentos ideais
-            temperamentos_bons = ["dócil", "calmo", "amoroso", "carinhoso", "fofo", "paciente"]
-            
-            temps_animal = [t.lower() for t in animal.temperamento]
-            
-            if any(t in temperamentos_ruins for t in temps_animal):
-                score -= 30 # Penalidade alta
-            elif any(t in temperamentos_bons for t in temps_animal):
-                score += 15 # Bônus
+        return self.cache_compatibilidade.pontuar(animal, adotante)
 
-    
-        if adotante.idade > 60:
-            if animal.idade_meses < 24:
-                score -= 15 # Idoso com filhote pode ser difícil
-            elif animal.idade_meses > 60:
-                score += 15 # Idoso com animal adulto/idoso é match perfeito
+    def _animal_de_dict(self, item):
+        """Converte um registro salvo em Cachorro/Gato. Retorna None se estiver corrompido."""
+        raca = item.get('raca', 'SRD')
+        sexo = item.get('sexo', 'M')
+        idade = item.get('idade_meses', 0)
+        porte = item.get('porte', 'M')
+        temperamento = item.get('temperamento', [])
 
-        # Normaliza para 0-100
-        return max(0, min(100, score))
+        if 'especie' not in item:
+            print(f"⚠️ Item corrompido ignorado (sem espécie): {item}")
+            return None
+
+        if item['especie'] == "Cachorro":
+            # Assumindo True para sociavel_com_gatos se não existir
+            animal = Cachorro(item['id'], raca, item['nome'], sexo, idade, porte, temperamento, True)
+        else:
+            # Assumindo True para usa_caixa_areia se não existir
+            animal = Gato(item['id'], raca, item['nome'], sexo, idade, porte, temperamento, True)
+
+        # Restaura o status salvo
+        if item.get('status', "DISPONIVEL") != "DISPONIVEL":
+            try:
+                animal._status = StatusAnimal(item['status']) # Define Enum diretamente
+            except ValueError:
+                animal._status = StatusAnimal.DISPONIVEL
+
+        # Registros antigos não guardavam a entrada: fica a data da carga, como antes
+        if item.get('data_entrada'):
+            try:
+                animal.data_entrada = date.fromisoformat(item['data_entrada'])
+            except (TypeError, ValueError):
+                pass
+
+        if 'historico' in item:
+            # Registro legado (histórico embutido) ou vindo do journal
+            animal.historico = [Evento.from_dict(e) for e in item['historico']]
+        else:
+            # Histórico guardado à parte: só é lido quando alguém usar
+            animal.adiar_historico(self.repo)
+        return animal
+
+    def _restaurar_reserva_e_fila(self, animal, item):
+        """Reconstrói reserva ativa e fila de espera (apenas backends que persistem essas informações)."""
+        dados_reserva = item.get('reserva')
+        if dados_reserva:
+            adotante = self.buscar_adotante_por_id(dados_reserva['adotante_id'])
+            if adotante:
+                try:
+                    reserva = Reserva(animal, adotante,
+                                      self._ler_data_reserva(dados_reserva['data_reserva']),
+                                      self._ler_data_reserva(dados_reserva['data_expiracao']))
+                    reserva.status = dados_reserva.get('status', "ATIVA")
+                    self._agendar_reserva(animal, reserva)
+                except (TypeError, ValueError):
+                    pass
+
+        for candidato in item.get('fila_espera', []):
+            adotante = self.buscar_adotante_por_id(candidato['adotante_id'])
+            if adotante:
+                try:
+                    data_entrada = datetime.fromisoformat(candidato['data_entrada'])
+                except (TypeError, ValueError):
+                    data_entrada = None
+                animal.fila_espera.adicionar(adotante, candidato['score'], data_entrada)
+
+    @staticmethod
+    def _ler_data_reserva(texto):
+        # Reservas antigas guardavam só a data (sem hora)
+        if 'T' in texto:
+            return datetime.fromisoformat(texto)
+        return date.fromisoformat(texto)
+
+    def buscar_adotante_por_id(self, id_adotante):
+        return self._adotantes_por_id.get(id_adotante)
+
+    def _adotante_de_dict(self, item):
+        try:
+            return Adotante(
+                item['id'], item['nome'], item['idade'], item['moradia'],
+                item['area_util'], item['outros_animais'],
+                item['experiencia_pets'], item['possui_criancas']
+            )
+        except KeyError:
+            print(f"⚠️ Adotante corrompido ignorado: {item}")
+            return None
+
+    def _adocao_de_dict(self, item):
+        # Registros novos guardam os ids; os legados só têm os nomes
+        animal_obj = self.buscar_animal_por_id(item.get('animal_id'))
+        if not animal_obj:
+            homonimos = self._animais_por_nome.get(item['animal'])
+            animal_obj = homonimos[0] if homonimos else None
+        if not animal_obj:
+            return None
+
+        adotante_obj = self.buscar_adotante_por_id(item.get('adotante_id'))
+        if not adotante_obj:
+            homonimos = self._adotantes_por_nome.get(item['adotante'])
+            adotante_obj = homonimos[0] if homonimos else None
+
+        # Se não achar, cria um temporário (legado)
+        if not adotante_obj:
+            adotante_obj = Adotante(0, item['adotante'], 0, "", 0, False, False, False)
+
+        adocao = Adocao(animal_obj, adotante_obj, item['taxa'])
+        # Converte string ISO para date
+        try:
+            adocao.data_adocao = datetime.fromisoformat(item['data']).date()
+        except ValueError:
+            pass
+        return adocao
+
+    def _devolucao_de_dict(self, item):
+        animal = self.buscar_animal_por_id(item.get('animal_id'))
+        if not animal:
+            return None
+        try:
+            data = datetime.fromisoformat(item['data'])
+        except (KeyError, TypeError, ValueError):
+            data = None
+        try:
+            motivo = MotivoDevolucao.interpretar(item.get('motivo') or "OUTRO")
+        except ValueError:
+            motivo = MotivoDevolucao.OUTRO
+        return Devolucao(animal, self.buscar_adotante_por_id(item.get('adotante_id')),
+                         motivo, item.get('descricao') or "", data)
 
     def _carregar_do_arquivo(self):
         """Tenta carregar dados do JSON e converter para objetos."""
-        dados_animais = self.repo.carregar_dados()
-        
-        
-        if dados_animais:
-            for item in dados_animais:
-                raca = item.get('raca', 'SRD')
-                sexo = item.get('sexo', 'M')
-                idade = item.get('idade_meses', 0)
-                porte = item.get('porte', 'M')
-                temperamento = item.get('temperamento', [])
-                
-                if 'especie' not in item:
-                    print(f"⚠️ Item corrompido ignorado (sem espécie): {item}")
+        # Centenas de milhares de objetos novos disparariam o GC cíclico várias vezes sem achar lixo
+        gc_ativo = gc.isenabled()
+        gc.disable()
+        try:
+            snapshot = self.repo.carregar_snapshot_binario()
+            if snapshot is not None:
+                self._carregar_do_snapshot(snapshot)
+            else:
+                self._carregar_registros()
+        finally:
+            if gc_ativo:
+                gc.enable()
+
+        # Devoluções: coleção própria; bases antigas só as têm no histórico (migradas abaixo).
+        # São registradas depois do journal que as antecede: as migradas numa base ainda sem
+        # snapshot citam animais e adotantes que só o journal cria
+        dados_devolucoes = self.repo.carregar_devolucoes()
+        self._devolucoes_pendentes = list(dados_devolucoes or ())
+
+        # Agregados gravados com os dados; o journal abaixo os atualiza a partir
+        # do primeiro registro que eles ainda não contam
+        agregados, ja_contados = None, 0
+        dados_agregados = self.repo.carregar_agregados()
+        if dados_agregados is not None:
+            try:
+                agregados = AgregadosRelatorio.from_dict(dados_agregados)
+                ja_contados = dados_agregados.get('registros_journal', 0)
+            except (KeyError, TypeError, ValueError):
+                agregados = None
+
+        # Reaplica as mutações feitas depois do último snapshot
+        self._reproduzindo_journal = True
+        lidos = 0
+        try:
+            for registro in self.repo.carregar_journal():
+                if lidos == ja_contados:
+                    self._agregados = agregados
+                self._aplicar_registro(registro)
+                lidos += 1
+        finally:
+            self._reproduzindo_journal = False
+        self._registrar_devolucoes_pendentes()
+        if lidos == ja_contados: # Nenhum registro depois dos agregados
+            self._agregados = agregados
+
+        if dados_devolucoes is None:
+            self._migrar_devolucoes_do_historico()
+
+        # Os registros carregados já avançaram as sequências; a gravada cobre ids que não existem mais
+        for colecao, proximo in self.repo.carregar_sequencias().items():
+            if colecao in self._proximos_ids and isinstance(proximo, int):
+                self._proximos_ids[colecao] = max(self._proximos_ids[colecao], proximo)
+        return True
+
+    def _registrar_devolucoes_pendentes(self):
+        """
+        Registra as devoluções lidas do arquivo. Todas são anteriores às do journal,
+        então entram antes da primeira delas (ou no fim da reprodução).
+        """
+        pendentes, self._devolucoes_pendentes = self._devolucoes_pendentes, ()
+        for item in pendentes:
+            devolucao = self._devolucao_de_dict(item)
+            if devolucao:
+                self._registrar_devolucao(devolucao)
+
+    def _migrar_devolucoes_do_historico(self):
+        """
+        Base anterior à coleção de devoluções: cria as devoluções a partir dos
+        eventos "Devolução" do histórico. Roda uma vez: logo depois da carga a
+        coleção migrada é gravada (`Repositorio.gravar_devolucoes`).
+        """
+        ja_registradas = {(d.animal.id, d.data_devolucao) for d in self.devolucoes}
+        adocoes_por_animal = defaultdict(list)
+        for adocao in self.adocoes:
+            adocoes_por_animal[adocao.animal.id].append(adocao)
+
+        migradas = []
+        for animal in self.animais:
+            for evento in animal.historico:
+                if evento.tipo != "Devolução" or (animal.id, evento.data) in ja_registradas:
                     continue
+                # Quem devolveu: a última adoção do animal até a data da devolução
+                anteriores = [a for a in adocoes_por_animal[animal.id] if a.data_adocao <= evento.data.date()]
+                adotante = anteriores[-1].adotante if anteriores else None
+                texto = evento.descricao.replace("Motivo: ", "")
+                migradas.append(Devolucao(animal, adotante, MotivoDevolucao.de_texto_antigo(texto), texto, evento.data))
 
-                if item['especie'] == "Cachorro":
-                    # Assumindo True para sociavel_com_gatos se não existir
-                    animal = Cachorro(item['id'], raca, item['nome'], sexo, idade, porte, temperamento, True)
-                else:
-                    # Assumindo True para usa_caixa_areia se não existir
-                    animal = Gato(item['id'], raca, item['nome'], sexo, idade, porte, temperamento, True)
-                
-                # Restaura o status salvo
-                if item['status'] != "DISPONIVEL":
-                    try:
-                        animal._status = StatusAnimal(item['status']) # Define Enum diretamente
-                    except ValueError:
-                        animal._status = StatusAnimal.DISPONIVEL
-                
-                self.animais.append(animal)
+        migradas.sort(key=lambda d: d.data_devolucao)
+        for devolucao in migradas:
+            self._registrar_devolucao(devolucao)
+        self._devolucoes_migradas = migradas
+        if migradas:
+            self._agregados = None # Contados sem as migradas: recalcula quando precisar
+            print(f"ℹ️ {len(migradas)} devoluções antigas migradas do histórico.")
+
+    def _carregar_registros(self):
+        """Carga registro a registro (dicionários vindos do JSON ou do SQLite)."""
+        com_reserva = []
+        for item in self.repo.carregar_dados():
+            animal = self._animal_de_dict(item)
+            if animal:
+                self._registrar_animal(animal)
+                if 'reserva' in item or 'fila_espera' in item:
+                    com_reserva.append((animal, item))
 
         # Carregar Adotantes 
-        dados_adotantes = self.repo.carregar_adotantes()
-        if dados_adotantes:
-            for item in dados_adotantes:
-                try:
-                    adotante = Adotante(
-                        item['id'], item['nome'], item['idade'], item['moradia'], 
-                        item['area_util'], item['outros_animais'], 
-                        item['experiencia_pets'], item['possui_criancas']
-                    )
-                    self.adotantes.append(adotante)
-                except KeyError:
-                    print(f"⚠️ Adotante corrompido ignorado: {item}")
+        for item in self.repo.carregar_adotantes():
+            adotante = self._adotante_de_dict(item)
+            if adotante:
+                self._registrar_adotante(adotante)
+
+        # Reservas e filas referenciam adotantes, então só depois deles
+        for animal, item in com_reserva:
+            self._restaurar_reserva_e_fila(animal, item)
 
         # Carregar Adoções
-        dados_adocoes = self.repo.carregar_adocoes()
-        if dados_adocoes:
-            for item in dados_adocoes:
-                # Tenta encontrar o animal pelo nome (já que não salvamos ID na adoção)
-                animal_obj = next((a for a in self.animais if a.nome == item['animal']), None)
-                
-                if animal_obj:
-                    # Tenta encontrar o adotante pelo nome
-                    adotante_obj = next((a for a in self.adotantes if a.nome == item['adotante']), None)
-                    
-                    # Se não achar, cria um temporário (legado)
-                    if not adotante_obj:
-                        adotante_obj = Adotante(0, item['adotante'], 0, "", 0, False, False, False)
-                    
-                    adocao = Adocao(animal_obj, adotante_obj, item['taxa'])
-                    # Converte string ISO para date
-                    try:
-                        adocao.data_adocao = datetime.fromisoformat(item['data']).date()
-                    except ValueError:
-                        pass 
-                        
-                    self.adocoes.append(adocao)
+        for item in self.repo.carregar_adocoes():
+            adocao = self._adocao_de_dict(item)
+            if adocao:
+                self._registrar_adocao(adocao)
 
-        return True
+    def _carregar_do_snapshot(self, snapshot):
+        """
+        Carga em massa a partir das colunas do snapshot binário, com o mesmo
+        resultado de `_carregar_registros`: espécie e status são resolvidos uma
+        vez por string distinta e os animais são criados por `Animal.restaurar`.
+        """
+        strings = snapshot.strings
+        hoje = date.today()
+
+        classes, status, datas = {}, {}, {0: hoje} # Ordinal 0: registro sem data de entrada
+        for indice in set(snapshot.animais['especie']):
+            classes[indice] = Cachorro if strings[indice] == "Cachorro" else Gato
+        for indice in set(snapshot.animais['status']):
+            try:
+                status[indice] = StatusAnimal(strings[indice])
+            except ValueError:
+                status[indice] = StatusAnimal.DISPONIVEL
+        for ordinal in set(snapshot.animais['data_entrada']):
+            if ordinal:
+                datas[ordinal] = date.fromordinal(ordinal)
+
+        col = snapshot.animais
+        temperamentos = snapshot.temperamentos
+        self._registrar_animais([
+            classes[especie].restaurar(id_animal, strings[raca], strings[nome], strings[sexo], idade,
+                                       strings[porte], list(temperamentos[temperamento][0]),
+                                       temperamentos[temperamento][1], status[situacao], datas[entrada], self.repo)
+            for id_animal, especie, raca, nome, sexo, idade, porte, temperamento, situacao, entrada in zip(
+                col['id'], col['especie'], col['raca'], col['nome'], col['sexo'],
+                col['idade_meses'], col['porte'], col['temperamento'], col['status'], col['data_entrada'])
+        ])
+
+        col = snapshot.adotantes
+        for dados in zip(col['id'], col['nome'], col['idade'], col['moradia'], col['area_util'],
+                         col['outros_animais'], col['experiencia_pets'], col['possui_criancas']):
+            id_adotante, nome, idade, moradia = dados[:4]
+            self._registrar_adotante(Adotante(id_adotante, strings[nome], idade, strings[moradia], *dados[4:]))
+
+        col = snapshot.adocoes
+        for animal, animal_id, adotante, adotante_id, data, taxa in zip(
+                col['animal'], col['animal_id'], col['adotante'], col['adotante_id'], col['data'], col['taxa']):
+            adocao = self._adocao_de_dict({"animal": strings[animal], "animal_id": animal_id,
+                                           "adotante": strings[adotante], "adotante_id": adotante_id,
+                                           "data": strings[data], "taxa": taxa})
+            if adocao:
+                self._registrar_adocao(adocao)
+
+    def _aplicar_registro(self, registro):
+        """Reaplica uma linha do journal sobre os objetos em memória."""
+        op = registro.get('op')
+        if op == "lote":
+            if registro.get('tipo') == "animal":
+                self._registrar_animais([a for a in map(self._animal_de_dict, registro.get('itens', [])) if a])
+            else:
+                for item in registro.get('itens', []):
+                    self._aplicar_registro({**item, "op": registro.get('tipo')})
+        elif op == "animal":
+            animal = self._animal_de_dict(registro)
+            if animal:
+                self._registrar_animal(animal)
+        elif op == "adotante":
+            adotante = self._adotante_de_dict(registro)
+            if adotante:
+                self._registrar_adotante(adotante)
+        elif op == "adocao":
+            adocao = self._adocao_de_dict(registro)
+            if adocao:
+                self._registrar_adocao(adocao)
+                if self._agregados is not None:
+                    self._agregados.registrar_adocao(adocao)
+        elif op == "devolucao":
+            self._registrar_devolucoes_pendentes()
+            devolucao = self._devolucao_de_dict(registro)
+            if devolucao:
+                self._registrar_devolucao(devolucao)
+                if self._agregados is not None:
+                    self._agregados.registrar_devolucao(devolucao)
+        elif op in ("status", "evento"):
+            animal = self.buscar_animal_por_id(registro.get('id'))
+            if not animal:
+                return
+            if op == "status":
+                anterior = animal.status
+                try:
+                    animal._status = StatusAnimal(registro['status'])
+                except ValueError:
+                    return
+                self._reindexar_status(animal, anterior)
+            animal.historico.append(Evento.from_dict(registro['evento']))
+
+    def _registrar_animal(self, animal):
+        """Adiciona o animal à coleção e aos índices, e passa a observar suas mutações."""
+        posicao = len(self.animais)
+        self.animais.append(animal)
+        self._animais_por_id.setdefault(animal.id, animal) # Em ids duplicados vale o primeiro, como na busca linear
+        self._animais_por_nome[animal.nome].append(animal)
+        self._posicao_animal[id(animal)] = posicao
+        self._posicoes_por_status[animal.status].append(posicao) # Sempre a maior posição: continua ordenado
+        animal._observador = self._ao_alterar_animal
+        if animal.id >= self._proximos_ids["animal"]:
+            self._proximos_ids["animal"] = animal.id + 1
+        if self._recomendacao is not None and animal.status == "DISPONIVEL":
+            self._recomendacao.adicionar_animal(posicao)
+        if self._eventos is not None:
+            for evento in animal.historico: # Eventos anteriores ao registro (ex: "Entrada" do cadastro)
+                self._eventos.adicionar(animal.id, evento)
+
+    def _registrar_animais(self, novos):
+        """Versão em massa de `_registrar_animal`: mesmos índices, sem o custo de uma chamada por animal."""
+        inicio = len(self.animais)
+        self.animais.extend(novos)
+        por_id, por_nome = self._animais_por_id, self._animais_por_nome
+        posicoes, por_status = self._posicao_animal, self._posicoes_por_status
+        observador = self._ao_alterar_animal
+        for posicao, animal in enumerate(novos, inicio):
+            por_id.setdefault(animal.id, animal)
+            por_nome[animal.nome].append(animal)
+            posicoes[id(animal)] = posicao
+            por_status[animal._status.value].append(posicao)
+            animal._observador = observador
+        if novos:
+            self._proximos_ids["animal"] = max(self._proximos_ids["animal"], max(a.id for a in novos) + 1)
+        if self._recomendacao is not None:
+            for posicao, animal in enumerate(novos, inicio):
+                if animal.status == "DISPONIVEL":
+                    self._recomendacao.adicionar_animal(posicao)
+        if self._eventos is not None:
+            for animal in novos:
+                for evento in animal.historico:
+                    self._eventos.adicionar(animal.id, evento)
+
+    def _reindexar_status(self, animal, status_anterior):
+        """Move o animal entre as listas do índice de status, mantendo a ordem de cadastro."""
+        if status_anterior == animal.status:
+            return
+        posicao = self._posicao_animal[id(animal)]
+        origem = self._posicoes_por_status[status_anterior]
+        i = bisect.bisect_left(origem, posicao)
+        if i < len(origem) and origem[i] == posicao:
+            del origem[i]
+        bisect.insort(self._posicoes_por_status[animal.status], posicao)
+        if self._recomendacao is not None:
+            if status_anterior == "DISPONIVEL":
+                self._recomendacao.remover_animal(posicao)
+            elif animal.status == "DISPONIVEL":
+                self._recomendacao.adicionar_animal(posicao)
+
+    def _registrar_adocao(self, adocao):
+        self.adocoes.append(adocao)
+        self._ultima_adocao[adocao.animal.id] = adocao
+
+    def _registrar_devolucao(self, devolucao):
+        """Adiciona a devolução à coleção e aos índices por motivo e por animal."""
+        posicao = len(self.devolucoes)
+        self.devolucoes.append(devolucao)
+        self._devolucoes_por_motivo[devolucao.motivo].append(posicao)
+        self._devolucoes_por_animal[devolucao.animal.id].append(posicao)
+
+    def listar_devolucoes(self, motivo=None, id_animal=None):
+        """Devoluções (em ordem de registro), filtradas por código de motivo e/ou animal pelos índices."""
+        if motivo is None and id_animal is None:
+            return list(self.devolucoes)
+        if motivo is not None:
+            posicoes = self._devolucoes_por_motivo.get(MotivoDevolucao.interpretar(motivo), [])
+            if id_animal is not None:
+                posicoes = [p for p in posicoes if self.devolucoes[p].animal.id == id_animal]
+        else:
+            posicoes = self._devolucoes_por_animal.get(id_animal, [])
+        return [self.devolucoes[p] for p in posicoes]
+
+    def _registrar_adotante(self, adotante):
+        """Adiciona o adotante à coleção e aos índices, e passa a observar mudanças de perfil."""
+        self._posicao_adotante[id(adotante)] = len(self.adotantes)
+        self.adotantes.append(adotante)
+        adotante._observador = self._ao_alterar_adotante
+        self._adotantes_por_id.setdefault(adotante.id, adotante)
+        self._adotantes_por_nome[adotante.nome].append(adotante)
+        if adotante.id >= self._proximos_ids["adotante"]:
+            self._proximos_ids["adotante"] = adotante.id + 1
+        if self._recomendacao is not None:
+            self._recomendacao.adicionar_adotante(len(self.adotantes) - 1)
+
+    def _ao_alterar_animal(self, animal, acao, dados):
+        """Callback chamado pelo Animal a cada mudança de status, novo evento ou mudança de perfil."""
+        if acao == "perfil":
+            if self._recomendacao is not None:
+                self._recomendacao.marcar_animal(self._posicao_animal[id(animal)])
+            return
+        if acao == "status":
+            self._reindexar_status(animal, dados['anterior'].value)
+        if self._eventos is not None:
+            self._eventos.adicionar(animal.id, dados['evento'])
+        if self._reproduzindo_journal:
+            return
+        if acao == "status":
+            self.repo.registrar("status", {"id": animal.id, "status": animal.status, "evento": dados['evento'].to_dict()})
+        elif acao == "evento":
+            self.repo.registrar("evento", {"id": animal.id, "evento": dados['evento'].to_dict()})
+
+    def _ao_alterar_adotante(self, adotante, acao, dados):
+        """Callback chamado pelo Adotante quando o perfil muda."""
+        if self._recomendacao is not None:
+            self._recomendacao.marcar_adotante(self._posicao_adotante[id(adotante)])
 
     def _carregar_dados_iniciais(self):
         if not self.animais:
             rex = Cachorro(1, "Vira-lata", "Rex", "M", 12, "M", ["Dócil"], True)
-            self.animais.append(rex)
+            self._registrar_animal(rex)
         
         if not self.adotantes:
             joao = Adotante(1, "Joao Silva", 25, "Casa", 100.0, False, True, False)
-            self.adotantes.append(joao)
+            self._registrar_adotante(joao)
 
-    def cadastrar_animal(self, tipo, nome, raca="SRD", sexo="M", idade=0, porte="M", especial=False, temperamento=None, info_extra=True):
-        id_novo = len(self.animais) + 1
-        
+    @staticmethod
+    def _novo_animal(id_novo, tipo, nome, raca="SRD", sexo="M", idade=0, porte="M", especial=False, temperamento=None, info_extra=True):
         if temperamento is None:
             temperamento = []
 
-        if tipo == "CACHORRO":
+        if str(tipo).upper() == "CACHORRO":
             novo_animal = Cachorro(id_novo, raca, nome, sexo, idade, porte, temperamento, info_extra)
         else:
             novo_animal = Gato(id_novo, raca, nome, sexo, idade, porte, temperamento, info_extra)
-        
-        # Atributo dinâmico para controle de taxa especial
+
+        # Controle de taxa especial
         novo_animal.tratamento_especial = especial
-        
+
         # Registra evento de entrada
         novo_animal.adicionar_evento("Entrada", "Animal cadastrado no sistema.")
-
-        self.animais.append(novo_animal)
         return novo_animal
 
+    @staticmethod
+    def _novo_adotante(id_novo, nome, idade, moradia, area_util, outros_animais=False, experiencia_pets=False, possui_criancas=False):
+        return Adotante(id_novo, nome, idade, moradia, area_util, outros_animais, experiencia_pets, possui_criancas)
+
+    def cadastrar_animal(self, tipo, nome, raca="SRD", sexo="M", idade=0, porte="M", especial=False, temperamento=None, info_extra=True):
+        with self._trava:
+            novo_animal = self._novo_animal(self._proximos_ids["animal"], tipo, nome, raca, sexo, idade, porte,
+                                            especial, temperamento, info_extra)
+            self._registrar_animal(novo_animal)
+            self.repo.registrar("animal", novo_animal.to_dict())
+            return novo_animal
+
     def cadastrar_adotante(self, nome, idade, moradia, area_util, outros_animais, experiencia_pets, possui_criancas):
-        novo_adotante = Adotante(len(self.adotantes)+1, nome, idade, moradia, area_util, outros_animais, experiencia_pets, possui_criancas)
-        self.adotantes.append(novo_adotante)
-        return novo_adotante
+        with self._trava:
+            novo_adotante = self._novo_adotante(self._proximos_ids["adotante"], nome, idade, moradia, area_util,
+                                                outros_animais, experiencia_pets, possui_criancas)
+            self._registrar_adotante(novo_adotante)
+            self.repo.registrar("adotante", novo_adotante.to_dict())
+            return novo_adotante
+
+    def _criar_em_lote(self, colecao, registros, fabrica, validar):
+        """
+        Monta os objetos de um cadastro em massa com ids consecutivos da sequência.
+        Valida tudo antes de alterar qualquer coisa: se algum registro for
+        inválido levanta ValueError com as posições e nada é cadastrado.
+        """
+        inicio = self._proximos_ids[colecao]
+        novos, erros = [], []
+        for posicao, dados in enumerate(registros):
+            try:
+                if not isinstance(dados, dict):
+                    raise ValueError("registro deve ser um dicionário")
+                validar(dados)
+                novos.append(fabrica(inicio + len(novos), **dados))
+            except (TypeError, ValueError) as e:
+                erros.append(f"{posicao}: {e}")
+        if erros:
+            resumo = "; ".join(erros[:10]) + (f"; ... e mais {len(erros) - 10}" if len(erros) > 10 else "")
+            raise ValueError(f"{len(erros)} registro(s) inválido(s), nenhum cadastrado: {resumo}")
+        return novos
+
+    @staticmethod
+    def _validar_animal(dados):
+        if not dados.get('nome') or not isinstance(dados['nome'], str):
+            raise ValueError("nome obrigatório")
+        if not isinstance(dados.get('tipo'), str):
+            raise ValueError("tipo obrigatório")
+        idade = dados.get('idade', 0)
+        if not isinstance(idade, int) or isinstance(idade, bool) or idade < 0:
+            raise ValueError(f"idade inválida: {idade!r}")
+        if not isinstance(dados.get('temperamento') or [], list):
+            raise ValueError("temperamento deve ser uma lista")
+
+    @staticmethod
+    def _validar_adotante(dados):
+        if not dados.get('nome') or not isinstance(dados['nome'], str):
+            raise ValueError("nome obrigatório")
+        if not isinstance(dados.get('moradia'), str):
+            raise ValueError("moradia obrigatória")
+        for campo in ('idade', 'area_util'):
+            valor = dados.get(campo)
+            if not isinstance(valor, (int, float)) or isinstance(valor, bool) or valor < 0:
+                raise ValueError(f"{campo} inválido: {valor!r}")
+
+    def cadastrar_animais_em_lote(self, registros):
+        """
+        Cadastra vários animais de uma vez. Cada registro é um dicionário com os
+        parâmetros de `cadastrar_animal` (tipo, nome, raca, ...). Os ids saem da
+        sequência, os índices são atualizados uma vez e o lote vira um único
+        registro no journal (ou uma transação no SQLite). Retorna os animais criados.
+        """
+        with self._trava:
+            novos = self._criar_em_lote("animal", registros, self._novo_animal, self._validar_animal)
+            if novos:
+                self._registrar_animais(novos)
+                self.repo.registrar_lote("animal", [animal.to_dict() for animal in novos])
+            return novos
+
+    def cadastrar_adotantes_em_lote(self, registros):
+        """Como `cadastrar_animais_em_lote`, com os parâmetros de `cadastrar_adotante` (outros_animais etc. opcionais)."""
+        with self._trava:
+            novos = self._criar_em_lote("adotante", registros, self._novo_adotante, self._validar_adotante)
+            for adotante in novos:
+                self._registrar_adotante(adotante)
+            if novos:
+                self.repo.registrar_lote("adotante", [adotante.to_dict() for adotante in novos])
+            return novos
 
     def listar_animais(self):
         return [a.get_resumo() for a in self.animais]
     
     def listar_animais_disponiveis(self):
-        return [a for a in self.animais if a.status == "DISPONIVEL"]
+        return self.listar_animais_por_status("DISPONIVEL")
 
     def buscar_adotante(self, indice):
         try:
@@ -189,214 +685,436 @@ class SistemaAdocao:
             return None
 
     def buscar_animal_disponivel(self, indice):
-        disponiveis = self.listar_animais_disponiveis()
+        return self.buscar_animal_por_status("DISPONIVEL", indice)
+
+    def buscar_animal_por_status(self, status, indice):
+        """Retorna o i-ésimo animal com o status dado (mesma ordem de listar_animais_por_status) em O(1)."""
         try:
-            return disponiveis[indice]
+            return self.animais[self._posicoes_por_status[status][indice]]
         except IndexError:
             return None
 
     def buscar_animal_por_id(self, id_animal):
         """Busca animal pelo ID (independente do status)."""
-        for animal in self.animais:
-            if animal.id == id_animal:
-                return animal
-        return None
+        return self._animais_por_id.get(id_animal)
+
+    def _indice_recomendacao(self):
+        if self._recomendacao is None:
+            indice = IndiceRecomendacao(self.animais, self.adotantes, self.elegibilidade)
+            for posicao in self._posicoes_por_status["DISPONIVEL"]:
+                indice.adicionar_animal(posicao)
+            for posicao in range(len(self.adotantes)):
+                indice.adicionar_adotante(posicao)
+            self._recomendacao = indice
+        return self._recomendacao
+
+    @property
+    def registro_eventos(self):
+        """
+        RegistroEventos com o histórico de todos os animais. Na primeira vez os
+        históricos ainda não carregados são lidos em sequência do repositório
+        (`iterar_historicos`), sem criar os eventos nos animais; depois é
+        mantido a cada novo evento.
+        """
+        with self._trava:
+            if self._eventos is None:
+                registro = RegistroEventos()
+                adiados = defaultdict(set) # repositório -> ids dos animais com histórico ainda não lido
+                for animal in self.animais:
+                    if animal.historico_carregado:
+                        for evento in animal.historico:
+                            registro.adicionar(animal.id, evento)
+                    else:
+                        adiados[animal._fonte_historico].add(animal.id)
+                for fonte, ids in adiados.items():
+                    for animal_id, eventos in fonte.iterar_historicos(ids):
+                        for dados in eventos:
+                            registro.adicionar_salvo(animal_id, dados)
+                self._eventos = registro
+            return self._eventos
+
+    def consultar_eventos(self, inicio=None, fim=None, tipo: str = None):
+        """Eventos de todos os animais com inicio <= data < fim (e do tipo dado), em ordem cronológica."""
+        with self._trava:
+            return self.registro_eventos.consultar(inicio, fim, tipo)
+
+    def recomendar_animais(self, adotante, k=5):
+        """
+        Os k animais disponíveis mais compatíveis com o adotante, entre os que ele
+        pode adotar: lista de (animal, score), do maior score para o menor e, no
+        empate, na ordem de cadastro. Mesmo resultado de pontuar todos os animais.
+        """
+        with self._trava:
+            return self._indice_recomendacao().melhores_animais(adotante, k, self.calcular_compatibilidade)
+
+    def recomendar_adotantes(self, animal, k=5):
+        """Os k adotantes elegíveis mais compatíveis com o animal, como (adotante, score) (ver `recomendar_animais`)."""
+        with self._trava:
+            return self._indice_recomendacao().melhores_adotantes(animal, k, self.calcular_compatibilidade)
 
     def reservar_animal(self, indice_adotante, indice_animal):
         """Realiza a reserva de um animal ou coloca na fila de espera."""
-        adotante = self.buscar_adotante(indice_adotante)
-        animal = self.buscar_animal_disponivel(indice_animal)
-        if not animal:
-            # Tenta buscar por ID direto na lista geral (caso esteja reservado)
-            try:
-                animal = self.animais[indice_animal] 
-            except IndexError:
-                return False, "Animal inválido."
+        with self._trava:
+            adotante = self.buscar_adotante(indice_adotante)
+            animal = self.buscar_animal_disponivel(indice_animal)
+            if not animal:
+                # Tenta buscar por ID direto na lista geral (caso esteja reservado)
+                try:
+                    animal = self.animais[indice_animal] 
+                except IndexError:
+                    return False, "Animal inválido."
+            return self.efetuar_reserva(adotante, animal)
 
-        if not adotante:
-            return False, "Adotante inválido."
+    def efetuar_reserva(self, adotante, animal):
+        """Reserva (ou fila de espera) a partir dos objetos; usada pelo menu e pelo modo em lote."""
+        with self._trava:
+            if not animal:
+                return False, "Animal inválido."
+            if not adotante:
+                return False, "Adotante inválido."
 
        
-        if animal.status == "RESERVADO":
-            # Verifica se já não é o dono da reserva atual
-            if animal.reserva_ativa and animal.reserva_ativa.adotante.id == adotante.id:
-                return False, "⚠️ Você já possui a reserva ativa deste animal."
+            if animal.status == "RESERVADO":
+                # Verifica se já não é o dono da reserva atual
+                if animal.reserva_ativa and animal.reserva_ativa.adotante.id == adotante.id:
+                    return False, "⚠️ Você já possui a reserva ativa deste animal."
             
             
-            score = self.calcular_compatibilidade(animal, adotante)
+                score = self.calcular_compatibilidade(animal, adotante)
             
             
-            animal.fila_espera.adicionar(adotante, score)
+                animal.fila_espera.adicionar(adotante, score)
+                posicao = animal.fila_espera.posicao(adotante)
             
-            return True, f"⏳ Animal reservado. {adotante.nome} entrou na fila de espera (Posição definida por compatibilidade: {score}/100)."
+                return True, f"⏳ Animal reservado. {adotante.nome} entrou na fila de espera na posição {posicao} (definida por compatibilidade: {score}/100)."
 
-        try:
-            horas = self.config.get('reserva_horas', 48)
-            reserva = adotante.solicitar_reserva(animal, horas_validade=horas)
+            try:
+                horas = self.config.get('reserva_horas', 48)
+                reserva = adotante.solicitar_reserva(animal, horas_validade=horas)
             
-            animal.reserva_ativa = reserva # Vincula a reserva ao animal
-            return True, f"Reserva realizada com sucesso para {animal.nome}! Vence em: {reserva.data_expiracao}"
-        except Exception as e:
-            return False, f"Erro na reserva: {str(e)}"
+                self._agendar_reserva(animal, reserva) # Vincula a reserva ao animal
+                return True, f"Reserva realizada com sucesso para {animal.nome}! Vence em: {reserva.data_expiracao:%d/%m/%Y %H:%M}"
+            except Exception as e:
+                return False, f"Erro na reserva: {str(e)}"
+
+    def desistir_da_fila(self, indice_adotante, id_animal):
+        """Retira o adotante da fila de espera de um animal."""
+        with self._trava:
+            adotante = self.buscar_adotante(indice_adotante)
+            animal = self.buscar_animal_por_id(id_animal)
+            if not adotante or not animal:
+                return False, "❌ Adotante ou animal inválido."
+            if animal.possui_fila_espera and animal.fila_espera.remover(adotante):
+                return True, f"{adotante.nome} saiu da fila de espera de {animal.nome}."
+            return False, f"{adotante.nome} não estava na fila de espera de {animal.nome}."
+
+    def _agendar_reserva(self, animal, reserva):
+        animal.reserva_ativa = reserva
+        self.agendador.agendar(reserva)
 
     def processar_expiracoes(self):
         """Verifica reservas vencidas e passa para o próximo da fila (por prioridade)."""
-        log = []
-        agora = datetime.now()
-        
-        for animal in self.animais:
-            if animal.status == "RESERVADO" and animal.reserva_ativa:
-                if animal.reserva_ativa.verificar_expiracao():
-                    log.append(f"Reserva de {animal.nome} expirou.")
-                    animal.reserva_ativa = None # Remove a reserva vencida
-                    
-                    if animal.fila_espera:
-                        # Usa o método da classe FilaEspera para pegar o melhor candidato
-                        melhor_candidato = animal.fila_espera.obter_proximo()
-                        
-                        proximo_adotante = melhor_candidato['adotante']
-                        score_proximo = melhor_candidato['score']
-                        
-                        # Cria nova reserva automaticamente
-                        horas = self.config.get('reserva_horas', 48)
-                        nova_reserva = proximo_adotante.solicitar_reserva(animal, horas_validade=horas) 
-                        animal.reserva_ativa = nova_reserva
-                        
-                        log.append(f"Animal realocado para {proximo_adotante.nome} da fila de espera (Score: {score_proximo}). Nova expiração: {nova_reserva.data_expiracao}")
-                    else:
-                        animal.mudar_status("DISPONIVEL")
-                        log.append(f"{animal.nome} voltou a ficar DISPONIVEL.")
-                else:
-                    log.append(f"Reserva de {animal.nome} ainda válida até {animal.reserva_ativa.data_expiracao}.")
-        
+        with self._trava:
+            # Inclui o que a verificação periódica já processou desde a última consulta
+            log, self._log_expiracoes = self._log_expiracoes, []
+            log.extend(self._processar_vencidas())
+
+            proxima = self.agendador.proxima()
+            if proxima:
+                ativas = len(self._posicoes_por_status["RESERVADO"])
+                log.append(f"{ativas} reserva(s) ainda válida(s). Próximo vencimento: "
+                           f"{proxima.animal.nome} em {proxima.data_expiracao:%d/%m/%Y %H:%M}.")
+
         if not log:
             return ["Nenhuma reserva expirada encontrada."]
         return log
 
+    def _processar_vencidas(self, agora=None):
+        """Trata só as reservas que venceram (retiradas do agendador), sem varrer os animais."""
+        log = []
+        for reserva in self.agendador.vencidas(agora):
+            animal = reserva.animal
+            if animal.status != "RESERVADO":
+                continue
 
+            log.append(f"Reserva de {animal.nome} expirou.")
+            reserva.status = "EXPIRADA"
+            animal.reserva_ativa = None # Remove a reserva vencida
+            animal.mudar_status("DISPONIVEL")
 
-    def processar_adocao(self, indice_adotante, indice_animal):
-        adotante = self.buscar_adotante(indice_adotante)
-        animal = self.buscar_animal_disponivel(indice_animal)
+            if animal.possui_fila_espera:
+                # Usa o método da classe FilaEspera para pegar o melhor candidato
+                melhor_candidato = animal.fila_espera.obter_proximo()
 
-        if not adotante:
-            return False, "❌ Adotante inválido."
-        if not animal:
-            return False, "❌ Animal inválido."
+                proximo_adotante = melhor_candidato['adotante']
+                score_proximo = melhor_candidato['score']
 
-        # Validação de Regras
-        if adotante.verificar_elegibilidade(animal):
-            # Verifica compatibilidade
-            score = self.calcular_compatibilidade(animal, adotante)
-            if score < 30: # Nota de corte arbitrária
-                return False, f"❌ Compatibilidade muito baixa ({score}). Adoção não recomendada."
-
-            # Define estratégia de taxa
-            nome_estrategia = "PADRAO"
-            if getattr(animal, 'tratamento_especial', False):
-                estrategia = TaxaEspecial()
-                nome_estrategia = "ESPECIAL"
-            elif animal.idade_meses < 6:
-                estrategia = TaxaFilhote()
-                nome_estrategia = "FILHOTE"
-            elif animal.idade_meses > 8 * 12: # 8 anos
-                estrategia = TaxaIdoso()
-                nome_estrategia = "IDOSO"
+                # Cria nova reserva automaticamente
+                horas = self.config.get('reserva_horas', 48)
+                nova_reserva = proximo_adotante.solicitar_reserva(animal, horas_validade=horas)
+                self._agendar_reserva(animal, nova_reserva)
+
+                log.append(f"Animal realocado para {proximo_adotante.nome} da fila de espera (Score: {score_proximo}). Nova expiração: {nova_reserva.data_expiracao:%d/%m/%Y %H:%M}")
             else:
-                estrategia = TaxaPadrao()
+                log.append(f"{animal.nome} voltou a ficar DISPONIVEL.")
+        return log
+
+    def iniciar_verificacao_periodica(self, intervalo_segundos=None):
+        """Processa reservas vencidas em segundo plano a cada `intervalo_segundos` (settings: intervalo_expiracao_segundos)."""
+        if self._parar_verificacao is not None:
+            return
+        intervalo = intervalo_segundos or self.config.get('intervalo_expiracao_segundos', 60)
+        self._parar_verificacao = threading.Event()
+
+        def ciclo(parar):
+            while not parar.wait(intervalo):
+                with self._trava:
+                    self._log_expiracoes.extend(self._processar_vencidas())
+
+        threading.Thread(target=ciclo, args=(self._parar_verificacao,), daemon=True).start()
+
+    def parar_verificacao_periodica(self):
+        if self._parar_verificacao is not None:
+            self._parar_verificacao.set()
+            self._parar_verificacao = None
+
+    def processar_adocao(self, indice_adotante, indice_animal):
+        with self._trava:
+            return self.efetuar_adocao(self.buscar_adotante(indice_adotante), self.buscar_animal_disponivel(indice_animal))
+
+    def efetuar_adocao(self, adotante, animal):
+        """Adoção de um animal disponível a partir dos objetos; usada pelo menu e pelo modo em lote."""
+        with self._trava:
+            if not adotante:
+                return False, "❌ Adotante inválido."
+            if not animal or animal.status != "DISPONIVEL":
+                return False, "❌ Animal inválido."
+
+            # Validação de Regras
+            motivos = self.elegibilidade.motivos(adotante, animal)
+            if not motivos:
+                # Verifica compatibilidade
+                score = self.calcular_compatibilidade(animal, adotante)
+                if score < 30: # Nota de corte arbitrária
+                    return False, f"❌ Compatibilidade muito baixa ({score}). Adoção não recomendada."
+
+                # Define estratégia de taxa
+                nome_estrategia = "PADRAO"
+                if animal.tratamento_especial:
+                    estrategia = TaxaEspecial()
+                    nome_estrategia = "ESPECIAL"
+                elif animal.idade_meses < 6:
+                    estrategia = TaxaFilhote()
+                    nome_estrategia = "FILHOTE"
+                elif animal.idade_meses > 8 * 12: # 8 anos
+                    estrategia = TaxaIdoso()
+                    nome_estrategia = "IDOSO"
+                else:
+                    estrategia = TaxaPadrao()
             
-            valor_taxa = estrategia.calcular(animal)
+                valor_taxa = estrategia.calcular(animal)
 
-            try:
-                adocao = adotante.finalizar_adocao(animal, taxa=valor_taxa, estrategia_nome=nome_estrategia)
-                self.adocoes.append(adocao)
+                try:
+                    adocao = adotante.finalizar_adocao(animal, taxa=valor_taxa, estrategia_nome=nome_estrategia)
+                    self._registrar_adocao(adocao)
+                    if self._agregados is not None:
+                        self._agregados.registrar_adocao(adocao)
+                    self.repo.registrar("adocao", adocao.to_dict())
                 
-                # Imprime o contrato no console
-                print(adocao.emitir_contrato())
+                    # Imprime o contrato no console
+                    print(adocao.emitir_contrato())
                 
-                return True, f"🎉 Sucesso! {animal.nome} foi adotado por {adotante.nome}! Taxa: R${valor_taxa:.2f}"
-            except Exception as e:
-                return False, f"Erro ao processar: {str(e)}"
+                    return True, f"🎉 Sucesso! {animal.nome} foi adotado por {adotante.nome}! Taxa: R${valor_taxa:.2f}"
+                except Exception as e:
+                    return False, f"Erro ao processar: {str(e)}"
         
-        return False, "❌ Adotante não elegível."
+            return False, f"❌ Adotante não elegível: {self.elegibilidade.mensagem(motivos[0], adotante)}"
+
+    def triagem_elegibilidade(self, adotantes=None, animais=None):
+        """
+        Máscara de elegibilidade (adotantes x animais) de uma vez, sem imprimir
+        nada; por padrão todos os adotantes contra os animais disponíveis.
+        Ver `RegrasElegibilidade.mascara`.
+        """
+        with self._trava:
+            adotantes = self.adotantes if adotantes is None else adotantes
+            animais = self.listar_animais_disponiveis() if animais is None else animais
+            return self.elegibilidade.mascara(adotantes, animais)
 
     def listar_animais_por_status(self, status):
         """Retorna lista de animais com um status específico."""
-        return [a for a in self.animais if a.status == status]
+        return [self.animais[p] for p in self._posicoes_por_status.get(status, [])]
 
-    def processar_devolucao(self, indice_animal_adotado, motivo):
-        """Registra a devolução de um animal adotado."""
-        adotados = self.listar_animais_por_status("ADOTADO")
-        
-        if 0 <= indice_animal_adotado < len(adotados):
-            animal = adotados[indice_animal_adotado]
-            novo_status = "QUARENTENA" if "doente" in motivo.lower() else "DEVOLVIDO"
-            
-            try:
-                animal.mudar_status(novo_status)
-                # Adiciona evento extra com o motivo
-                if hasattr(animal, 'adicionar_evento'):
-                    animal.adicionar_evento("Devolução", f"Motivo: {motivo}")
-                return True, f"⚠️ {animal.nome} foi devolvido e está agora como {novo_status}."
-            except Exception as e:
-                return False, f"Erro ao mudar status: {e}"
+    def processar_devolucao(self, indice_animal_adotado, motivo, descricao: str = None):
+        """
+        Registra a devolução de um animal adotado.
+
+        `motivo` é um MotivoDevolucao (ou seu código, como "SAUDE"); o texto livre
+        vai em `descricao`. SAUDE leva o animal à QUARENTENA; os demais, a DEVOLVIDO.
+        """
+        with self._trava:
+            animal = self.buscar_animal_por_status("ADOTADO", indice_animal_adotado) if indice_animal_adotado >= 0 else None
+            return self.efetuar_devolucao(animal, motivo, descricao)
+
+    def efetuar_devolucao(self, animal, motivo, descricao: str = None):
+        """Devolução de um animal adotado a partir do objeto (ver `processar_devolucao`)."""
+        with self._trava:
+            if animal and animal.status == "ADOTADO":
+                try:
+                    codigo = MotivoDevolucao.interpretar(motivo)
+                except ValueError as e:
+                    return False, f"❌ {e}"
+                adocao = self._ultima_adocao.get(animal.id)
+                devolucao = Devolucao(animal, adocao.adotante if adocao else None, codigo, descricao or "")
+
+                try:
+                    devolucao.ajustar_status_animal()
+                    devolucao.registrar_evento()
+                except Exception as e:
+                    return False, f"Erro ao mudar status: {e}"
+
+                self._registrar_devolucao(devolucao)
+                if self._agregados is not None:
+                    self._agregados.registrar_devolucao(devolucao)
+                self.repo.registrar("devolucao", devolucao.to_dict())
+                return True, f"⚠️ {animal.nome} foi devolvido e está agora como {animal.status}."
         
-        return False, "❌ Animal inválido."
+            return False, "❌ Animal inválido."
 
     def alterar_status_manual(self, indice_geral, novo_status):
         """Permite ao admin mudar o status (ex: Quarentena -> Disponivel)."""
-        if 0 <= indice_geral < len(self.animais):
-            animal = self.animais[indice_geral]
+        with self._trava:
+            if 0 <= indice_geral < len(self.animais):
+                animal = self.animais[indice_geral]
+                try:
+                    animal.mudar_status(novo_status)
+                    return True, f"✅ Status de {animal.nome} alterado para {novo_status}."
+                except Exception as e:
+                    return False, f"Erro: {e}"
+            return False, "❌ Índice inválido."
+
+    def mudar_status_em_lote(self, animais, novo_status):
+        """
+        Leva muitos animais ao mesmo status (ex: liberar a quarentena inteira):
+        valida todos antes de alterar (tudo ou nada), reindexa e grava um único
+        registro de lote no repositório em vez de um por animal.
+        """
+        with self._trava:
             try:
-                animal.mudar_status(novo_status)
-                return True, f"✅ Status de {animal.nome} alterado para {novo_status}."
+                alterados = Animal.mudar_status_em_lote(animais, novo_status, notificar=False)
             except Exception as e:
                 return False, f"Erro: {e}"
-        return False, "❌ Índice inválido."
+            if not alterados:
+                return True, "Nenhum animal para alterar."
+            for animal, anterior, evento in alterados:
+                self._reindexar_status(animal, anterior.value)
+                if self._eventos is not None:
+                    self._eventos.adicionar(animal.id, evento)
+            self.repo.registrar_lote("status", [{"id": animal.id, "status": animal.status, "evento": evento.to_dict()}
+                                                for animal, _, evento in alterados])
+            return True, f"✅ Status de {len(alterados)} animal(is) alterado para {alterados[0][0].status}."
 
     def registrar_vacina(self, indice_animal, tipo_vacina):
         """Registra vacina em qualquer animal (disponível ou não)."""
-        if 0 <= indice_animal < len(self.animais):
-            animal = self.animais[indice_animal]
+        with self._trava:
+            if 0 <= indice_animal < len(self.animais):
+                return self.vacinar_animal(self.animais[indice_animal], tipo_vacina)
+            return False, "❌ Índice inválido."
+
+    def vacinar_animal(self, animal, tipo_vacina):
+        with self._trava:
             if hasattr(animal, 'vacinar'):
                 animal.vacinar(tipo_vacina)
                 return True, f"💉 {animal.nome} foi vacinado contra {tipo_vacina}."
             return False, "❌ Este animal não pode ser vacinado."
-        return False, "❌ Índice inválido."
 
     def registrar_treino(self, indice_animal):
         """Registra treino apenas em cachorros."""
-        if 0 <= indice_animal < len(self.animais):
-            animal = self.animais[indice_animal]
+        with self._trava:
+            if 0 <= indice_animal < len(self.animais):
+                return self.treinar_animal(self.animais[indice_animal])
+            return False, "❌ Índice inválido."
+
+    def treinar_animal(self, animal):
+        with self._trava:
             if hasattr(animal, 'treinar'):
                 animal.treinar()
                 return True, f"🎓 {animal.nome} completou uma sessão de adestramento."
             return False, "❌ Apenas cachorros podem ser adestrados."
-        return False, "❌ Índice inválido."
+
+    def migrar_para(self, repo_destino):
+        """Copia todo o estado carregado para outro backend (ex: JSON -> SQLite)."""
+        repo_destino.compactar(self.animais, self.adocoes, self.adotantes, self.devolucoes, self._agregados,
+                               self._proximos_ids)
+        repo_destino.fechar()
 
     def salvar_dados(self):
-        try:
-            self.repo.salvar_dados(self.animais, self.adocoes, self.adotantes)
-        except RepositorioError as e:
-            print(f"❌ Erro ao salvar: {e}")
+        with self._trava:
+            try:
+                self.repo.salvar_dados(self.animais, self.adocoes, self.adotantes, self.devolucoes, self._agregados,
+                                       self._proximos_ids)
+                self.repo.fechar()
+            except RepositorioError as e:
+                print(f"❌ Erro ao salvar: {e}")
+
+    @property
+    def agregados(self):
+        """Totais dos relatórios; na primeira vez sem versão salva, calculados por varredura completa."""
+        if self._agregados is None:
+            self._agregados = AgregadosRelatorio.calcular(self.adocoes, self.devolucoes)
+        return self._agregados
+
+    def verificar_agregados(self):
+        """
+        Confere os agregados com a varredura completa. Se divergirem, avisa e
+        passa a usar os recalculados. Retorna os relatórios que divergiam.
+        """
+        divergentes = self.agregados.conferir(self.adocoes, self.devolucoes)
+        if divergentes:
+            print(f"⚠️ Agregados divergentes da varredura completa ({', '.join(divergentes)}); recalculados.")
+            self._agregados = AgregadosRelatorio.calcular(self.adocoes, self.devolucoes)
+        return divergentes
+
+    def gerar_relatorios(self, processos: int = None, verificar: bool = None):
+        """
+        Gera um dicionário com todos os relatórios do sistema.
+
+        `processos` (ou `relatorios.processos` no settings.json) > 1 distribui o
+        top-5, que é a parte pesada, num pool de processos; 0 usa todos os
+        núcleos. O resultado é o mesmo do cálculo serial.
+
+        Tempo médio, taxa por tipo e devoluções vêm dos agregados incrementais;
+        `verificar` (ou `relatorios.verificar_agregados`) os confere antes com a
+        varredura completa.
+        """
+        opcoes = self.config.get('relatorios', {})
+        if processos is None:
+            processos = opcoes.get('processos', 1)
+        if verificar is None:
+            verificar = opcoes.get('verificar_agregados', False)
+        if verificar:
+            self.verificar_agregados()
 
-    def gerar_relatorios(self):
-        """Gera um dicionário com todos os relatórios do sistema."""
-        
         top5 = []
         if self.adotantes:
-            # Calcula compatibilidade média para cada animal disponível
-            for animal in self.listar_animais_disponiveis():
-                scores = [self.calcular_compatibilidade(animal, ad) for ad in self.adotantes]
-                media = sum(scores) / len(scores) if scores else 0
-                top5.append({"nome": animal.nome, "especie": animal.especie, "score_medio": media})
-            
-            # Ordena e pega os 5 melhores
-            top5 = sorted(top5, key=lambda x: x['score_medio'], reverse=True)[:5]
+            disponiveis = self.listar_animais_disponiveis()
+            processos = relatorios_paralelos.processos_uteis(processos, len(disponiveis), len(self.adotantes))
+            if processos > 1:
+                top5 = relatorios_paralelos.top_k_adotaveis(disponiveis, self.adotantes, self.config, processos, k=5)
+            else:
+                # Matriz animais x adotantes em blocos com NumPy quando disponível; senão, par a par
+                if MotorCompatibilidade.disponivel():
+                    pontuador = MotorCompatibilidade(self.config)
+                elif len(disponiveis) * len(self.adotantes) <= self.cache_compatibilidade.capacidade:
+                    pontuador = self.calcular_compatibilidade # Cabe no cache: o próximo relatório reaproveita os scores
+                else:
+                    pontuador = self.pontuador.pontuar # Uma varredura maior que o cache só expulsaria as entradas úteis
+                top5 = Relatorios.top_k_adotaveis(disponiveis, self.adotantes, pontuador, k=5)
 
+        agregados = self.agregados
         return {
             "top5": top5,
-            "tempo_medio": Relatorios.tempo_medio_adocao(self.adocoes),
-            "taxa_tipo": Relatorios.taxa_adocoes_por_tipo(self.adocoes),
-            "devolucoes": Relatorios.devolucoes_por_motivo(self.animais)
+            "tempo_medio": agregados.tempo_medio_adocao(),
+            "taxa_tipo": agregados.taxa_adocoes_por_tipo(),
+            "devolucoes": agregados.devolucoes_por_motivo()
         }
@@ -0,0 +1,260 @@
+"""
+Modo em lote: aplica um arquivo de comandos ao SistemaAdocao sem o menu.
+
+Cada comando é um objeto JSON por linha (JSON Lines) ou uma linha de CSV com
+cabeçalho; a coluna/chave "comando" diz o que fazer e as demais são os campos:
+
+    {"comando": "cadastrar_animal", "ref": "rex", "tipo": "CACHORRO", "nome": "Rex", "idade": 24}
+    {"comando": "cadastrar_adotante", "ref": "ana", "nome": "Ana", "idade": 30, "moradia": "Casa", "area_util": 80}
+    {"comando": "adotar", "adotante_ref": "ana", "animal_ref": "rex"}
+    {"comando": "vacinar", "animal_id": 12, "vacina": "V10"}
+    {"comando": "devolver", "animal_ref": "rex", "motivo": "ALERGIA", "descricao": "Rinite"}
+
+O "motivo" de "devolver" é um código de MotivoDevolucao (SAUDE, ALERGIA, ...).
+
+Animais e adotantes são referenciados pelo id (`animal_id`, `adotante_id`) ou,
+se foram cadastrados no mesmo arquivo, pelo `ref` dado no cadastro
+(`animal_ref`, `adotante_ref`). No CSV, listas (temperamento) separam itens
+com ";" e booleanos aceitam true/false, sim/não, 1/0.
+
+Os comandos passam pelos mesmos métodos do menu; um comando que falha é
+anotado no resumo e o lote continua. Os dados são salvos uma única vez, no fim.
+"""
+import contextlib
+import csv
+import io
+import json
+import os
+import time
+
+VERDADEIROS = {"true", "1", "sim", "s", "yes", "y"}
+FALSOS = {"false", "0", "nao", "não", "n", "no", ""}
+
+
+class ComandoInvalidoError(Exception):
+    """Linha do lote que não pode ser aplicada (comando ou campo inválido)."""
+    pass
+
+
+# --- Conversão de campos ---
+def _booleano(valor):
+    if isinstance(valor, bool):
+        return valor
+    texto = str(valor).strip().lower()
+    if texto in VERDADEIROS:
+        return True
+    if texto in FALSOS:
+        return False
+    raise ValueError(f"valor booleano inválido: {valor!r}")
+
+
+def _lista(valor):
+    if isinstance(valor, list):
+        return valor
+    return [item.strip() for item in str(valor).split(";") if item.strip()]
+
+
+CONVERSORES = {str: str, int: int, float: float, bool: _booleano, list: _lista}
+
+
+def _campos(registro, esquema, obrigatorios):
+    """Valida e converte os campos do comando segundo o esquema {nome: tipo}."""
+    campos = {}
+    for nome, tipo in esquema.items():
+        valor = registro.get(nome)
+        if valor is None or valor == "" and tipo is not str:
+            continue
+        try:
+            campos[nome] = CONVERSORES[tipo](valor)
+        except (TypeError, ValueError):
+            raise ComandoInvalidoError(f"campo '{nome}' inválido: {valor!r}")
+    faltando = [nome for nome in obrigatorios if nome not in campos]
+    if faltando:
+        raise ComandoInvalidoError(f"campos obrigatórios ausentes: {', '.join(faltando)}")
+    return campos
+
+
+class ExecutorLote:
+    """Aplica comandos a um SistemaAdocao, resolvendo ids e refs, e contabiliza os resultados."""
+
+    def __init__(self, sistema):
+        self.sistema = sistema
+        self.refs_animais = {}
+        self.refs_adotantes = {}
+        self.comandos = {
+            "cadastrar_animal": self._cadastrar_animal,
+            "cadastrar_adotante": self._cadastrar_adotante,
+            "reservar": self._reservar,
+            "adotar": self._adotar,
+            "devolver": self._devolver,
+            "vacinar": self._vacinar,
+            "treinar": self._treinar,
+        }
+
+    # --- Resolução de referências ---
+    def _animal(self, registro):
+        if registro.get("animal_ref") not in (None, ""):
+            animal = self.refs_animais.get(registro["animal_ref"])
+        else:
+            try:
+                animal = self.sistema.buscar_animal_por_id(int(registro["animal_id"]))
+            except (KeyError, TypeError, ValueError):
+                raise ComandoInvalidoError("informe 'animal_id' ou 'animal_ref'")
+        if animal is None:
+            raise ComandoInvalidoError("animal não encontrado")
+        return animal
+
+    def _adotante(self, registro):
+        if registro.get("adotante_ref") not in (None, ""):
+            adotante = self.refs_adotantes.get(registro["adotante_ref"])
+        else:
+            try:
+                adotante = self.sistema.buscar_adotante_por_id(int(registro["adotante_id"]))
+            except (KeyError, TypeError, ValueError):
+                raise ComandoInvalidoError("informe 'adotante_id' ou 'adotante_ref'")
+        if adotante is None:
+            raise ComandoInvalidoError("adotante não encontrado")
+        return adotante
+
+    # --- Comandos ---
+    def _cadastrar_animal(self, registro):
+        campos = _campos(registro, {"tipo": str, "nome": str, "raca": str, "sexo": str, "idade": int, "porte": str,
+                                    "especial": bool, "temperamento": list, "info_extra": bool}, ("tipo", "nome"))
+        campos["tipo"] = campos["tipo"].upper()
+        animal = self.sistema.cadastrar_animal(**campos)
+        if registro.get("ref"):
+            self.refs_animais[registro["ref"]] = animal
+        return True, f"{animal.nome} cadastrado (ID: {animal.id})."
+
+    def _cadastrar_adotante(self, registro):
+        campos = _campos(registro, {"nome": str, "idade": int, "moradia": str, "area_util": float,
+                                    "outros_animais": bool, "experiencia_pets": bool, "possui_criancas": bool},
+                         ("nome", "idade", "moradia", "area_util"))
+        for opcional in ("outros_animais", "experiencia_pets", "possui_criancas"):
+            campos.setdefault(opcional, False)
+        adotante = self.sistema.cadastrar_adotante(**campos)
+        if registro.get("ref"):
+            self.refs_adotantes[registro["ref"]] = adotante
+        return True, f"{adotante.nome} cadastrado (ID: {adotante.id})."
+
+    def _reservar(self, registro):
+        return self.sistema.efetuar_reserva(self._adotante(registro), self._animal(registro))
+
+    def _adotar(self, registro):
+        return self.sistema.efetuar_adocao(self._adotante(registro), self._animal(registro))
+
+    def _devolver(self, registro):
+        campos = _campos(registro, {"motivo": str, "descricao": str}, ("motivo",))
+        return self.sistema.efetuar_devolucao(self._animal(registro), campos["motivo"], campos.get("descricao"))
+
+    def _vacinar(self, registro):
+        campos = _campos(registro, {"vacina": str}, ("vacina",))
+        return self.sistema.vacinar_animal(self._animal(registro), campos["vacina"])
+
+    def _treinar(self, registro):
+        return self.sistema.treinar_animal(self._animal(registro))
+
+    def executar(self, registro):
+        """Aplica um comando. Retorna (sucesso, mensagem); nunca levanta para erros do comando."""
+        nome = registro.get("comando")
+        comando = self.comandos.get(nome)
+        if comando is None:
+            return False, f"comando desconhecido: {nome!r}"
+        try:
+            return comando(registro)
+        except ComandoInvalidoError as e:
+            return False, str(e)
+        except Exception as e: # Regra de negócio violada (status, elegibilidade...): falha só este comando
+            return False, f"Erro: {e}"
+
+
+class ResultadoLote:
+    """Contagem por comando, falhas (linha, comando, mensagem) e tempos do lote."""
+
+    def __init__(self):
+        self.por_comando = {} # comando -> [sucessos, falhas]
+        self.falhas = []
+        self.tempo_comandos = 0.0
+        self.tempo_salvamento = 0.0
+
+    @property
+    def total(self):
+        return sum(ok + falhou for ok, falhou in self.por_comando.values())
+
+    @property
+    def sucessos(self):
+        return sum(ok for ok, _ in self.por_comando.values())
+
+    def anotar(self, linha, comando, sucesso, mensagem):
+        contagem = self.por_comando.setdefault(comando or "?", [0, 0])
+        contagem[0 if sucesso else 1] += 1
+        if not sucesso:
+            self.falhas.append((linha, comando, mensagem))
+
+    def resumo(self, max_falhas: int = 20) -> str:
+        vazao = self.total / self.tempo_comandos if self.tempo_comandos else 0.0
+        linhas = [f"\n📦 --- Resumo do Lote ---",
+                  f"{self.total} comandos em {self.tempo_comandos:.2f} s ({vazao:.0f} comandos/s); "
+                  f"salvamento em {self.tempo_salvamento:.2f} s"]
+        for comando, (ok, falhou) in self.por_comando.items():
+            linhas.append(f"   - {comando:<20} ✅ {ok:>6}   ❌ {falhou:>6}")
+        if self.falhas:
+            linhas.append(f"\n❌ Falhas ({len(self.falhas)}):")
+            for linha, comando, mensagem in self.falhas[:max_falhas]:
+                linhas.append(f"   linha {linha} ({comando}): {mensagem}")
+            if len(self.falhas) > max_falhas:
+                linhas.append(f"   ... e mais {len(self.falhas) - max_falhas}.")
+        return "\n".join(linhas)
+
+
+# --- Leitura do arquivo ---
+def ler_comandos(caminho: str, formato: str = None):
+    """Gera (número da linha, registro) do arquivo. `formato` "jsonl" ou "csv" (padrão: pela extensão)."""
+    formato = formato or ("csv" if caminho.lower().endswith(".csv") else "jsonl")
+    with open(caminho, 'r', encoding='utf-8', newline='') as f:
+        if formato == "csv":
+            leitor = csv.DictReader(f)
+            for registro in leitor:
+                yield leitor.line_num, {chave.strip(): valor for chave, valor in registro.items() if chave}
+            return
+        for numero, linha in enumerate(f, 1):
+            linha = linha.strip()
+            if not linha or linha.startswith("#"):
+                continue
+            try:
+                registro = json.loads(linha)
+            except json.JSONDecodeError as e:
+                registro = {"_erro": f"JSON inválido: {e}"}
+            if not isinstance(registro, dict):
+                registro = {"_erro": "a linha deve ser um objeto JSON"}
+            yield numero, registro
+
+
+def executar_lote(sistema, caminho: str, formato: str = None, detalhado: bool = False) -> ResultadoLote:
+    """
+    Aplica todos os comandos do arquivo e salva uma vez no fim.
+    Com `detalhado=False` as mensagens que os métodos imprimem (contratos etc.) são suprimidas.
+    """
+    if not os.path.exists(caminho):
+        raise FileNotFoundError(caminho)
+    executor = ExecutorLote(sistema)
+    resultado = ResultadoLote()
+
+    inicio = time.perf_counter()
+    for numero, registro in ler_comandos(caminho, formato):
+        if "_erro" in registro:
+            resultado.anotar(numero, "?", False, registro["_erro"])
+            continue
+        if detalhado:
+            sucesso, mensagem = executor.executar(registro)
+            print(f"linha {numero}: {mensagem}")
+        else:
+            with contextlib.redirect_stdout(io.StringIO()):
+                sucesso, mensagem = executor.executar(registro)
+        resultado.anotar(numero, registro.get("comando"), sucesso, mensagem)
+    resultado.tempo_comandos = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    sistema.salvar_dados()
+    resultado.tempo_salvamento = time.perf_counter() - inicio
+    return resultado
@@ -1,7 +1,11 @@
-from datetime import date, datetime
+import heapq
+from datetime import date, datetime, time, timedelta
 from typing import List, Union
 from abc import ABC, abstractmethod
 from enum import Enum
+from types import MappingProxyType
+from compatibilidade import mascara_temperamento
+from elegibilidade import REGRAS_PADRAO, RegrasElegibilidade
 
 # --- Enum para Status ---
 class StatusAnimal(Enum):
@@ -12,6 +16,44 @@ class StatusAnimal(Enum):
     QUARENTENA = "QUARENTENA"
     INADOTAVEL = "INADOTAVEL"
 
+# --- Enum para Motivos de Devolução ---
+class MotivoDevolucao(Enum):
+    SAUDE = "SAUDE"
+    COMPORTAMENTO = "COMPORTAMENTO"
+    ADAPTACAO = "ADAPTACAO"
+    ALERGIA = "ALERGIA"
+    MUDANCA = "MUDANCA"
+    FINANCEIRO = "FINANCEIRO"
+    OUTRO = "OUTRO"
+
+    @property
+    def status_destino(self) -> str:
+        """Animal devolvido por saúde vai para a quarentena; os demais ficam como DEVOLVIDO."""
+        return "QUARENTENA" if self is MotivoDevolucao.SAUDE else "DEVOLVIDO"
+
+    @classmethod
+    def interpretar(cls, motivo):
+        """Aceita o enum ou o seu código em texto (ex: "saude"); outro valor levanta ValueError."""
+        if isinstance(motivo, cls):
+            return motivo
+        try:
+            return cls(str(motivo).strip().upper())
+        except ValueError:
+            codigos = ", ".join(m.value for m in cls)
+            raise ValueError(f"Motivo de devolução desconhecido: '{motivo}'. Use um dos códigos: {codigos}.")
+
+    @classmethod
+    def de_texto_antigo(cls, texto: str):
+        """
+        Só para migrar eventos "Devolução" de bases antigas, que guardavam um
+        texto livre: vira SAUDE se mencionar "doente" (a regra anterior) e OUTRO
+        caso contrário, a menos que o texto já seja um código.
+        """
+        try:
+            return cls.interpretar(texto)
+        except ValueError:
+            return cls.SAUDE if "doente" in texto.lower() else cls.OUTRO
+
 # --- Exceções Customizadas ---
 class ReservaInvalidaError(Exception):
     """Erro levantado quando uma reserva não pode ser feita."""
@@ -29,9 +71,61 @@ class RepositorioError(Exception):
     """Erro genérico para falhas no repositório de dados."""
     pass
 
+# --- Máquina de Estados do StatusAnimal ---
+class MaquinaStatus:
+    """
+    Transições permitidas do StatusAnimal, compiladas uma vez: destinos em
+    frozenset por origem (num MappingProxyType, somente leitura) e um cache
+    texto -> Enum, para `mudar_status` não remontar a tabela nem reconverter
+    o texto a cada chamada. Manter o mesmo status é sempre permitido.
+    """
+    __slots__ = ('_destinos', '_por_texto')
+
+    def __init__(self, transicoes: dict):
+        self._destinos = MappingProxyType({origem: frozenset(destinos) for origem, destinos in transicoes.items()})
+        self._por_texto = {status.value: status for status in StatusAnimal}
+
+    def status(self, valor: Union[str, StatusAnimal]) -> StatusAnimal:
+        """Converte texto (qualquer caixa) ou Enum para StatusAnimal."""
+        if isinstance(valor, StatusAnimal):
+            return valor
+        if not isinstance(valor, str):
+            raise TransicaoDeEstadoInvalidaError("Status inválido.")
+        status = self._por_texto.get(valor)
+        if status is None:
+            try:
+                status = StatusAnimal(valor.upper())
+            except ValueError:
+                raise TransicaoDeEstadoInvalidaError(f"Status '{valor}' não existe.")
+            self._por_texto[valor] = status # Só textos válidos entram: o cache fica limitado às grafias usadas
+        return status
+
+    def destinos(self, origem: StatusAnimal) -> frozenset:
+        return self._destinos.get(origem, frozenset())
+
+    def permite(self, atual: StatusAnimal, novo: StatusAnimal) -> bool:
+        return novo is atual or novo in self._destinos.get(atual, ())
+
+    def validar(self, atual: StatusAnimal, novo: StatusAnimal):
+        if not self.permite(atual, novo):
+            raise TransicaoDeEstadoInvalidaError(f"Transição inválida: De {atual.value} para {novo.value}")
+
+
+# Regras permitidas (origem -> destinos permitidos)
+TRANSICOES_STATUS = MaquinaStatus({
+    StatusAnimal.DISPONIVEL: [StatusAnimal.RESERVADO, StatusAnimal.INADOTAVEL, StatusAnimal.ADOTADO], # ADOTADO direto permitido? Sim.
+    StatusAnimal.RESERVADO: [StatusAnimal.ADOTADO, StatusAnimal.DISPONIVEL], # Pode cancelar reserva
+    StatusAnimal.ADOTADO: [StatusAnimal.DEVOLVIDO, StatusAnimal.QUARENTENA], # Permitir Quarentena direto se doente
+    StatusAnimal.DEVOLVIDO: [StatusAnimal.QUARENTENA, StatusAnimal.DISPONIVEL, StatusAnimal.INADOTAVEL],
+    StatusAnimal.QUARENTENA: [StatusAnimal.DISPONIVEL, StatusAnimal.INADOTAVEL],
+    StatusAnimal.INADOTAVEL: [StatusAnimal.DISPONIVEL] # Pode voltar a ser adotável? Sim.
+})
+
 # --- Classe Base (Herança) ---
 class Pessoa(ABC):
     """Classe abstrata que representa uma pessoa genérica no sistema."""
+    __slots__ = ('id', 'nome', 'idade')
+
     def __init__(self, id: int, nome: str, idade: int):
         self.id = id
         self.nome = nome
@@ -42,7 +136,9 @@ class Pessoa(ABC):
 
 # --- Mixins (Herança Múltipla) ---
 class VacinavelMixin:
-    """Mixin para animais que podem ser vacinados."""
+    """Mixin para animais que podem ser vacinados. O slot `vacinas` fica na classe concreta."""
+    __slots__ = ()
+
     def __init__(self):
         self.vacinas = []
 
@@ -53,7 +149,9 @@ class VacinavelMixin:
             self.adicionar_evento("Vacinação", f"Recebeu vacina: {nome_vacina}")
 
 class AdestravelMixin:
-    """Mixin para animais que podem ser treinados."""
+    """Mixin para animais que podem ser treinados. O slot `nivel_adestramento` fica na classe concreta."""
+    __slots__ = ()
+
     def __init__(self):
         self.nivel_adestramento = 0
 
@@ -91,10 +189,12 @@ class Evento:
     Classe de dados simples que representa um registro de ocorrência no histórico do Animal.
     É responsável por armazenar a data, o tipo de evento (vacina, mudança de status)
     """
-    def __init__(self, tipo: str, descricao: str):
+    __slots__ = ('tipo', 'descricao', 'data')
+
+    def __init__(self, tipo: str, descricao: str, data: datetime = None):
         self.tipo = tipo
         self.descricao = descricao
-        self.data = datetime.now()
+        self.data = data or datetime.now()
 
     def to_dict(self):
         return {
@@ -103,46 +203,136 @@ class Evento:
             "data": self.data.isoformat()
         }
 
+    @classmethod
+    def from_dict(cls, dados: dict):
+        """Reconstrói um evento salvo (mantém a data original)."""
+        try:
+            data = datetime.fromisoformat(dados['data'])
+        except (KeyError, TypeError, ValueError):
+            data = None
+        return cls(dados.get('tipo', ''), dados.get('descricao', ''), data)
+
 class FilaEspera:
     """
     Encapsula a lógica de fila de espera com prioridade.
     Implementa __len__ para saber quantos estão na fila.
+
+    Internamente é um heap (heapq) ordenado por score decrescente e depois por
+    data de entrada crescente; um contador de chegada desempata entradas com a
+    mesma data. Remoções por adotante são "preguiçosas": a entrada é marcada
+    como removida e descartada quando chegar ao topo.
     """
+    __slots__ = ('_heap', '_por_adotante', '_chegadas', '_ativos')
+
     def __init__(self):
-        self._candidatos = [] # Lista de dicionários
+        self._heap = [] # Entradas: [-score, data_entrada, chegada, candidato ou None se removido]
+        self._por_adotante = {} # adotante.id -> entradas ativas desse adotante
+        self._chegadas = 0
+        self._ativos = 0
 
-    def adicionar(self, adotante, score):
-        """Adiciona um interessado na fila."""
-        self._candidatos.append({
+    def _nova_entrada(self, adotante, score, data_entrada):
+        candidato = {
             "adotante": adotante,
             "score": score,
-            "data_entrada": datetime.now()
-        })
+            "data_entrada": data_entrada or datetime.now()
+        }
+        entrada = [-score, candidato["data_entrada"], self._chegadas, candidato]
+        self._chegadas += 1
+        self._ativos += 1
+        self._por_adotante.setdefault(adotante.id, []).append(entrada)
+        return entrada
+
+    def adicionar(self, adotante, score, data_entrada: datetime = None):
+        """Adiciona um interessado na fila."""
+        heapq.heappush(self._heap, self._nova_entrada(adotante, score, data_entrada))
+
+    def adicionar_varios(self, candidatos):
+        """Adiciona vários interessados de uma vez: (adotante, score) ou (adotante, score, data_entrada)."""
+        novas = [self._nova_entrada(c[0], c[1], c[2] if len(c) > 2 else None) for c in candidatos]
+        if len(novas) > len(self._heap):
+            self._heap.extend(novas)
+            heapq.heapify(self._heap) # O(n) em vez de n pushes
+        else:
+            for entrada in novas:
+                heapq.heappush(self._heap, entrada)
+
+    def _descartar_removidos_do_topo(self):
+        while self._heap and self._heap[0][3] is None:
+            heapq.heappop(self._heap)
+
+    def espiar(self):
+        """Retorna o candidato com maior prioridade sem removê-lo da fila."""
+        self._descartar_removidos_do_topo()
+        return self._heap[0][3] if self._heap else None
 
     def obter_proximo(self):
         """Retorna o candidato com maior prioridade (Score > Data) e remove da fila."""
-        if not self._candidatos:
+        self._descartar_removidos_do_topo()
+        if not self._heap:
             return None
-        
-        # Ordena: Score decrescente, depois Data crescente (mais antigo primeiro)
-        self._candidatos.sort(key=lambda x: (-x['score'], x['data_entrada']))
-        
-        return self._candidatos.pop(0) # Retorna o primeiro da lista ordenada
+
+        entrada = heapq.heappop(self._heap)
+        candidato = entrada[3]
+        self._esquecer(entrada)
+        return candidato
+
+    def remover(self, adotante) -> bool:
+        """Retira o adotante da fila (desistência). Retorna False se ele não estava nela."""
+        entradas = self._por_adotante.pop(adotante.id, None)
+        if not entradas:
+            return False
+        for entrada in entradas:
+            entrada[3] = None
+            self._ativos -= 1
+        # Muitas entradas mortas deixam o heap lento: reconstrói só com as ativas
+        if len(self._heap) > 2 * self._ativos + 32:
+            self._heap = [e for e in self._heap if e[3] is not None]
+            heapq.heapify(self._heap)
+        return True
+
+    def _esquecer(self, entrada):
+        self._ativos -= 1
+        adotante_id = entrada[3]["adotante"].id
+        entradas = self._por_adotante.get(adotante_id)
+        if entradas:
+            entradas.remove(entrada)
+            if not entradas:
+                del self._por_adotante[adotante_id]
+
+    def posicao(self, adotante):
+        """Posição (1 = próximo a ser chamado) da melhor entrada do adotante, ou None se não estiver na fila."""
+        entradas = self._por_adotante.get(adotante.id)
+        if not entradas:
+            return None
+        melhor = min(entradas)[:3]
+        return 1 + sum(1 for e in self._heap if e[3] is not None and e[:3] < melhor)
 
     def __len__(self):
-        return len(self._candidatos)
+        return self._ativos
 
     def __bool__(self):
-        return len(self._candidatos) > 0
+        return self._ativos > 0
+
+    def __iter__(self):
+        """Itera sobre os candidatos (sem remover), em ordem de prioridade."""
+        return (e[3] for e in sorted(e for e in self._heap if e[3] is not None))
 
 
 class Animal(VacinavelMixin):
     """
     Representa a entidade principal do sistema: o animal disponível para adoção.
+    Usa __slots__ (sem __dict__ por instância): atributos novos precisam ser declarados aqui.
     """
+    __slots__ = ('id', 'especie', 'raca', 'nome', 'sexo', '_idade_meses', '_porte',
+                 '_temperamento', '_mascara_temperamento', '_versao_perfil', '_status', 'data_entrada',
+                 '_historico', '_fonte_historico', '_fila_espera', 'reserva_ativa', '_observador',
+                 'tratamento_especial', 'vacinas')
+
     def __init__(self, id: int, especie: str, raca: str, nome: str, sexo: str, 
                 idade_meses: int, porte: str, temperamento: List[str]):
         super().__init__() # Inicializa o VacinavelMixin
+        self._versao_perfil = 0 # Sobe a cada mudança de perfil (ver `_perfil_alterado`)
+        self._observador = None # Callback(animal, acao, dados) avisado a cada mutação
         self.id = id
         self.especie = especie
         self.raca = raca
@@ -150,13 +340,135 @@ class Animal(VacinavelMixin):
         self.sexo = sexo
         self.idade_meses = idade_meses
         self.porte = porte
-        self.temperamento = temperamento
+        self.temperamento = temperamento # Via setter: também zera o cache da máscara
         
         self._status = StatusAnimal.DISPONIVEL
         self.data_entrada = date.today()
-        self.historico: List[Evento] = []
-        self.fila_espera = FilaEspera() # Usa a classe customizada
+        self._historico: List[Evento] = []
+        self._fonte_historico = None # Repositório de onde o histórico será lido no primeiro acesso
+        self._fila_espera = None # FilaEspera criada só quando alguém entra na fila
         self.reserva_ativa = None # Armazena o objeto Reserva atual
+        self.tratamento_especial = False # Define a TaxaEspecial na adoção
+
+    @classmethod
+    def restaurar(cls, id: int, raca: str, nome: str, sexo: str, idade_meses: int, porte: str,
+                  temperamento: List[str], mascara: int, status: StatusAnimal, data_entrada: date, fonte_historico):
+        """
+        Recria um animal salvo sem passar pelos construtores (carga em massa do
+        snapshot binário). Os campos já vêm validados, inclusive a máscara de
+        temperamento; o histórico fica adiado em `fonte_historico`.
+        """
+        animal = cls.__new__(cls)
+        animal.id = id
+        animal.especie = cls.ESPECIE
+        animal.raca = raca
+        animal.nome = nome
+        animal.sexo = sexo
+        animal._idade_meses = idade_meses
+        animal._versao_perfil = 0
+        animal._porte = porte
+        animal._temperamento = temperamento
+        animal._mascara_temperamento = mascara
+        animal._status = status
+        animal.data_entrada = data_entrada
+        animal._historico = None
+        animal._fonte_historico = fonte_historico
+        animal._fila_espera = None
+        animal.reserva_ativa = None
+        animal.tratamento_especial = False
+        animal._observador = None
+        animal.vacinas = []
+        animal._restaurar_padroes()
+        return animal
+
+    def _restaurar_padroes(self):
+        """Campos próprios da subclasse, com os mesmos padrões assumidos na carga do JSON."""
+        pass
+
+    @property
+    def historico(self) -> List[Evento]:
+        """Histórico de eventos. Se ainda não foi lido do repositório, é carregado agora."""
+        if self._historico is None:
+            dados = self._fonte_historico.carregar_historico(self.id)
+            self._historico = [Evento.from_dict(e) for e in dados]
+            self._fonte_historico = None
+        return self._historico
+
+    @historico.setter
+    def historico(self, eventos: List[Evento]):
+        self._historico = eventos
+        self._fonte_historico = None
+
+    def adiar_historico(self, fonte):
+        """Deixa o histórico no repositório `fonte` (que implementa carregar_historico(id)) até ser usado."""
+        self._historico = None
+        self._fonte_historico = fonte
+
+    @property
+    def historico_carregado(self) -> bool:
+        return self._historico is not None
+
+    @property
+    def fila_espera(self) -> FilaEspera:
+        """Fila de espera do animal (alocada no primeiro acesso)."""
+        if self._fila_espera is None:
+            self._fila_espera = FilaEspera()
+        return self._fila_espera
+
+    @property
+    def possui_fila_espera(self) -> bool:
+        """True se há alguém na fila, sem alocar a fila à toa."""
+        return bool(self._fila_espera)
+
+    @property
+    def temperamento(self):
+        return self._temperamento
+
+    @temperamento.setter
+    def temperamento(self, valor: List[str]):
+        self._temperamento = valor
+        self._mascara_temperamento = None # Recalculada no próximo acesso
+        self._perfil_alterado()
+
+    @property
+    def idade_meses(self):
+        return self._idade_meses
+
+    @idade_meses.setter
+    def idade_meses(self, valor: int):
+        self._idade_meses = valor
+        self._perfil_alterado()
+
+    @property
+    def porte(self):
+        return self._porte
+
+    @porte.setter
+    def porte(self, valor: str):
+        self._porte = valor
+        self._perfil_alterado()
+
+    @property
+    def mascara_temperamento(self) -> int:
+        """Bits TEMPERAMENTO_RUIM/BOM do temperamento, calculados uma vez e guardados.
+        Atribua uma nova lista a `temperamento` (em vez de alterá-la no lugar) para invalidar."""
+        if self._mascara_temperamento is None:
+            self._mascara_temperamento = mascara_temperamento(self._temperamento)
+        return self._mascara_temperamento
+
+    def _notificar(self, acao: str, **dados):
+        """Avisa o observador (ex: SistemaAdocao) sobre uma mutação do animal."""
+        if self._observador is not None:
+            self._observador(self, acao, dados)
+
+    def _perfil_alterado(self):
+        """
+        Mudança que altera compatibilidade ou elegibilidade: nova `_versao_perfil`
+        (o CacheCompatibilidade descarta os scores da versão anterior) e aviso
+        "perfil" ao observador (o IndiceRecomendacao muda o animal de balde).
+        """
+        self._versao_perfil += 1
+        self._notificar("perfil")
 
     def __iter__(self):
         """Permite iterar diretamente sobre o histórico do animal."""
@@ -167,38 +479,51 @@ class Animal(VacinavelMixin):
         """Retorna o valor string do status atual."""
         return self._status.value
 
-    def mudar_status(self, novo_status: Union[str, StatusAnimal]):
+    def mudar_status(self, novo_status: Union[str, StatusAnimal], data: datetime = None):
         """Altera o status do animal e registra no histórico, com validação via Enum."""
-        if isinstance(novo_status, str):
-            try:
-                novo_status = StatusAnimal(novo_status.upper())
-            except ValueError:
-                raise TransicaoDeEstadoInvalidaError(f"Status '{novo_status}' não existe.")
-        
-        if not isinstance(novo_status, StatusAnimal):
-             raise TransicaoDeEstadoInvalidaError("Status inválido.")
-
-        # --- Máquina de Estados (Regras de Transição) ---
+        novo_status = TRANSICOES_STATUS.status(novo_status)
         atual = self._status
-        
-        # Regras permitidas (origem -> destinos permitidos)
-        transicoes_permitidas = {
-            StatusAnimal.DISPONIVEL: [StatusAnimal.RESERVADO, StatusAnimal.INADOTAVEL, StatusAnimal.ADOTADO], # ADOTADO direto permitido? Sim.
-            StatusAnimal.RESERVADO: [StatusAnimal.ADOTADO, StatusAnimal.DISPONIVEL], # Pode cancelar reserva
-            StatusAnimal.ADOTADO: [StatusAnimal.DEVOLVIDO, StatusAnimal.QUARENTENA], # Permitir Quarentena direto se doente
-            StatusAnimal.DEVOLVIDO: [StatusAnimal.QUARENTENA, StatusAnimal.DISPONIVEL, StatusAnimal.INADOTAVEL],
-            StatusAnimal.QUARENTENA: [StatusAnimal.DISPONIVEL, StatusAnimal.INADOTAVEL],
-            StatusAnimal.INADOTAVEL: [StatusAnimal.DISPONIVEL] # Pode voltar a ser adotável? Sim.
-        }
+        TRANSICOES_STATUS.validar(atual, novo_status)
 
-        if novo_status not in transicoes_permitidas.get(atual, []):
-             # Permite manter o mesmo status (idempotência)
-             if novo_status != atual:
-                raise TransicaoDeEstadoInvalidaError(f"Transição inválida: De {atual.value} para {novo_status.value}")
-
-        evento = Evento("Mudança de Status", f"De {self._status.value} para {novo_status.value}")
+        evento = Evento("Mudança de Status", f"De {atual.value} para {novo_status.value}", data)
         self.historico.append(evento)
         self._status = novo_status
+        self._notificar("status", anterior=atual, evento=evento)
+
+    @staticmethod
+    def mudar_status_em_lote(animais, novo_status: Union[str, StatusAnimal], notificar: bool = True) -> list:
+        """
+        Leva todos os `animais` ao mesmo status. Valida todos antes de alterar
+        qualquer um: se alguma transição for inválida, levanta
+        TransicaoDeEstadoInvalidaError listando os animais e nada muda.
+        Os eventos do lote têm a mesma data. Com `notificar=False` o observador
+        não é avisado (quem chama reindexa e registra o lote de uma vez).
+        Retorna [(animal, status anterior, evento)].
+        """
+        novo_status = TRANSICOES_STATUS.status(novo_status)
+        animais = list(animais)
+        invalidos = [a for a in animais if not TRANSICOES_STATUS.permite(a._status, novo_status)]
+        if invalidos:
+            exemplos = ", ".join(f"{a.nome} (ID: {a.id}, {a.status})" for a in invalidos[:5])
+            resto = f" e mais {len(invalidos) - 5}" if len(invalidos) > 5 else ""
+            raise TransicaoDeEstadoInvalidaError(
+                f"Transição inválida para {novo_status.value} em {len(invalidos)} animal(is): {exemplos}{resto}")
+
+        agora = datetime.now()
+        descricoes = {} # status anterior -> descrição, compartilhada pelos eventos do lote
+        alterados = []
+        for animal in animais:
+            atual = animal._status
+            descricao = descricoes.get(atual)
+            if descricao is None:
+                descricao = descricoes[atual] = f"De {atual.value} para {novo_status.value}"
+            evento = Evento("Mudança de Status", descricao, agora)
+            animal.historico.append(evento)
+            animal._status = novo_status
+            if notificar:
+                animal._notificar("status", anterior=atual, evento=evento)
+            alterados.append((animal, atual, evento))
+        return alterados
 
     def __repr__(self):
         return f"<Animal {self.nome} id={self.id}>"
@@ -215,17 +540,18 @@ class Animal(VacinavelMixin):
     def aplicar_vacina(self, vacina: str):
         self.adicionar_evento("Vacina", f"Aplicação de: {vacina}")
 
-    def adicionar_evento(self, tipo: str, descricao: str):
+    def adicionar_evento(self, tipo: str, descricao: str, data: datetime = None):
         """Método auxiliar para adicionar eventos ao histórico."""
-        novo_evento = Evento(tipo, descricao)
+        novo_evento = Evento(tipo, descricao, data)
         self.historico.append(novo_evento)
+        self._notificar("evento", evento=novo_evento)
 
     def get_resumo(self) -> str:
         return f"[{self.status}] {self.nome} - {self.especie}"
     
-    def to_dict(self):
+    def to_dict(self, incluir_historico: bool = True):
         """Converte o objeto para dicionário"""
-        return {
+        dados = {
             "id": self.id,
             "especie": self.especie,
             "raca": self.raca,
@@ -235,8 +561,11 @@ class Animal(VacinavelMixin):
             "porte": self.porte,
             "temperamento": self.temperamento,
             "status": self.status,
-            "historico": [e.to_dict() for e in self.historico]
+            "data_entrada": self.data_entrada.isoformat()
         }
+        if incluir_historico:
+            dados["historico"] = [e.to_dict() for e in self.historico]
+        return dados
 
 class Adocao:
     """
@@ -246,6 +575,7 @@ class Adocao:
     e documentar qual Estratégia de cálculo foi aplicada.
     Contém a lógica para emissão do contrato final.
     """
+    __slots__ = ('animal', 'adotante', 'data_adocao', 'taxa', 'estrategia_taxa')
 
     def __init__(self, animal: Animal, adotante: 'Adotante', taxa: float, estrategia_taxa: str = "PADRAO"):
         self.animal = animal
@@ -257,7 +587,9 @@ class Adocao:
     def to_dict(self):
         return {
             "animal": self.animal.nome,
+            "animal_id": self.animal.id,
             "adotante": self.adotante.nome,
+            "adotante_id": self.adotante.id,
             "data": self.data_adocao.isoformat(),
             "taxa": self.taxa
         }
@@ -290,14 +622,24 @@ class Adocao:
 class Reserva:
     """
     Classe de Transação que registra o bloqueio temporário (48h) de um Animal
-    por um Adotante, controlando o prazo de expiração.
+    por um Adotante, controlando o prazo de expiração (com precisão de horas).
     """
-    def __init__(self, animal: Animal, adotante: 'Adotante', data_reserva: date = None, data_expiracao: date = None):
+    __slots__ = ('animal', 'adotante', 'data_reserva', 'data_expiracao', 'status')
+
+    def __init__(self, animal: Animal, adotante: 'Adotante', data_reserva: datetime = None, data_expiracao: datetime = None):
         self.animal = animal
         self.adotante = adotante
-        self.data_reserva = data_reserva or date.today()
-        # Reserva expira em 2 dias por padrão
-        self.data_expiracao = data_expiracao or date.fromordinal(self.data_reserva.toordinal() + 2)
+        self.data_reserva = data_reserva or datetime.now()
+        if not isinstance(self.data_reserva, datetime):
+            self.data_reserva = datetime.combine(self.data_reserva, time.min)
+
+        if data_expiracao is None:
+            # Reserva expira em 48h por padrão
+            data_expiracao = self.data_reserva + timedelta(hours=48)
+        elif not isinstance(data_expiracao, datetime):
+            # Reservas antigas guardavam só o dia: valiam até o fim dele
+            data_expiracao = datetime.combine(data_expiracao, time.min) + timedelta(days=1)
+        self.data_expiracao = data_expiracao
         self.status = "ATIVA"
 
     def to_dict(self):
@@ -314,8 +656,8 @@ class Reserva:
     def encerrar_reserva(self):
         pass
     
-    def verificar_expiracao(self) -> bool:
-        return date.today() > self.data_expiracao
+    def verificar_expiracao(self, agora: datetime = None) -> bool:
+        return (agora or datetime.now()) >= self.data_expiracao
 
 class Adotante(Pessoa):
     """
@@ -324,8 +666,13 @@ class Adotante(Pessoa):
     moradia, área útil e experiência com pets). Contém a lógica inicial para
     verificar a elegibilidade conforme o sistema.
     """
+    __slots__ = ('_idade', '_moradia', 'moradia_normalizada', '_area_util', 'outros_animais',
+                 '_possui_criancas', '_experiencia_pets', '_versao_perfil', '_observador')
+
     def __init__(self, id: int, nome: str, idade: int, moradia: str, area_util: float, 
                 outros_animais: bool, experiencia_pets: bool, possui_criancas: bool):
+        self._versao_perfil = 0 # Sobe a cada mudança de perfil (ver `_perfil_alterado`)
+        self._observador = None # Callback(adotante, acao, dados) avisado quando o perfil muda
         super().__init__(id, nome, idade)
         self.moradia = moradia
         self.area_util = area_util
@@ -334,6 +681,34 @@ class Adotante(Pessoa):
         self.possui_criancas = possui_criancas
         self.experiencia_pets = experiencia_pets
         
+    @property
+    def idade(self):
+        return self._idade
+
+    @idade.setter
+    def idade(self, valor: int):
+        self._idade = valor # Pesa na compatibilidade (acima de 60) e na elegibilidade (idade mínima)
+        self._perfil_alterado()
+
+    @property
+    def moradia(self):
+        return self._moradia
+
+    @moradia.setter
+    def moradia(self, valor: str):
+        self._moradia = valor
+        self.moradia_normalizada = valor.lower() # Usada nas regras de compatibilidade
+        self._perfil_alterado()
+
+    @property
+    def area_util(self):
+        return self._area_util
+
+    @area_util.setter
+    def area_util(self, valor: float):
+        self._area_util = valor
+        self._perfil_alterado()
+
     @property
     def possui_criancas(self):
         return self._possui_criancas
@@ -343,6 +718,7 @@ class Adotante(Pessoa):
         if not isinstance(valor, bool):
             raise ValueError("O campo 'possui_criancas' deve ser True ou False.")
         self._possui_criancas = valor
+        self._perfil_alterado()
 
     @property
     def experiencia_pets(self):
@@ -353,6 +729,13 @@ class Adotante(Pessoa):
         if not isinstance(valor, bool):
             raise ValueError("A experiência deve ser True ou False.")
         self._experiencia_pets = valor
+        self._perfil_alterado()
+
+    def _perfil_alterado(self):
+        """Nova `_versao_perfil` e aviso ao observador (ver `Animal._perfil_alterado`)."""
+        self._versao_perfil += 1
+        if self._observador is not None:
+            self._observador(self, "perfil", {})
 
 
     def solicitar_reserva(self, animal: Animal, horas_validade: int = 48) -> Reserva:
@@ -361,16 +744,11 @@ class Adotante(Pessoa):
         
         animal.mudar_status(StatusAnimal.RESERVADO)
         
-        # Calcula expiração baseada nas horas passadas
+        # Calcula expiração baseada nas horas passadas (sem arredondar para dias)
         data_reserva = datetime.now()
-        # Usando timedelta para precisão de horas, mas mantendo compatibilidade com date se necessário
-        # O modelo Reserva original usava date, vamos adaptar para datetime ou manter date + dias
-        
-        # Se a classe Reserva espera date, convertemos horas para dias (arredondando para cima)
-        dias = max(1, int(horas_validade / 24))
-        data_exp = date.fromordinal(date.today().toordinal() + dias)
+        data_exp = data_reserva + timedelta(hours=horas_validade)
         
-        nova_reserva = Reserva(animal, self, date.today(), data_exp)
+        nova_reserva = Reserva(animal, self, data_reserva, data_exp)
         return nova_reserva
 
     def finalizar_adocao(self, animal: Animal, taxa: float, estrategia_nome: str = "PADRAO") -> Adocao:
@@ -382,37 +760,26 @@ class Adotante(Pessoa):
         nova_adocao = Adocao(animal, self, taxa, estrategia_nome)
         return nova_adocao
 
-    def verificar_elegibilidade(self, animal: Animal = None) -> bool:
+    def verificar_elegibilidade(self, animal: Animal = None, regras: RegrasElegibilidade = None) -> bool:
         """
         Usa os dados encapsulados para determinar se o adotante é elegível.
-        Regras:
+        Regras (limites em `regras`, por padrão os de RegrasElegibilidade):
         1. Maior de 18 anos.
         2. Se tiver crianças, precisa ter experiência prévia.
-        3. Se o animal for Grande, não pode morar em Apartamento pequeno.
+        3. Se o animal for Grande, precisa morar em Casa com área mínima (80 m²).
+        Imprime o motivo da reprovação; para triagem sem console use `RegrasElegibilidade.motivos`.
         """
-        # Regra 1: Idade Mínima
-        if self.idade < 18:
-            print(f"❌ Reprovado: Adotante menor de idade ({self.idade} anos).")
+        motivo = self.motivo_inelegibilidade(animal, regras)
+        if motivo:
+            print(f"❌ Reprovado: {motivo}")
             return False
-
-        # Regra 2: Crianças vs Experiência
-        if self._possui_criancas and not self._experiencia_pets:
-            print("❌ Reprovado: Possui crianças mas não tem experiência com pets.")
-            return False 
-        
-        # Regra 3: Porte vs Moradia
-        if animal:
-            # Exige moradia "Casa" para animais de grande porte
-            if animal.porte == "G":
-                if self.moradia.lower() != "casa":
-                    print("❌ Reprovado: Animais de grande porte exigem moradia em Casa.")
-                    return False
-                # Se for Casa, verifica área mínima (ex: 80m2)
-                if self.area_util < 80:
-                    print("❌ Reprovado: Área útil insuficiente para animal de grande porte.")
-                    return False
-
         return True
+
+    def motivo_inelegibilidade(self, animal: Animal = None, regras: RegrasElegibilidade = None):
+        """Mesmas regras de `verificar_elegibilidade`, sem imprimir: o texto do primeiro motivo de reprovação ou None."""
+        regras = regras or REGRAS_PADRAO
+        motivos = regras.motivos(self, animal)
+        return regras.mensagem(motivos[0], self) if motivos else None
     
     def to_dict(self):
         return {
@@ -437,38 +804,79 @@ class Adotante(Pessoa):
 class Devolucao:
     """
     Classe de Transação que registra o retorno de um Animal após ter sido adotado.
-    É responsável por documentar o motivo detalhado do retorno e por acionar o
-    processo de reavaliação do Animal, ajustando seu status para DEVOLVIDO ou QUARENTENA.
+    É responsável por documentar o motivo do retorno (código + texto livre) e por
+    acionar o processo de reavaliação do Animal, ajustando seu status para
+    DEVOLVIDO ou QUARENTENA.
     """
-    def __init__(self, animal: Animal, adotante: Adotante, motivo: str):
+    __slots__ = ('animal', 'adotante', 'data_devolucao', 'motivo', 'descricao')
+
+    def __init__(self, animal: Animal, adotante: Union['Adotante', None], motivo: MotivoDevolucao,
+                 descricao: str = "", data_devolucao: datetime = None):
         self.animal = animal
-        self.adotante = adotante
-        self.data_devolucao = date.today()
+        self.adotante = adotante # Quem devolveu (None em registros antigos sem adoção correspondente)
+        self.data_devolucao = data_devolucao or datetime.now()
         self.motivo = motivo
+        self.descricao = descricao
+
+    def to_dict(self):
+        return {
+            "animal_id": self.animal.id,
+            "adotante_id": self.adotante.id if self.adotante else None,
+            "data": self.data_devolucao.isoformat(),
+            "motivo": self.motivo.value,
+            "descricao": self.descricao
+        }
 
     def registrar_evento(self):
-        pass
-    
+        """Anota a devolução no histórico do animal (mesma data da transação)."""
+        texto = self.descricao or self.motivo.value
+        self.animal.adicionar_evento("Devolução", f"Motivo: {texto}", data=self.data_devolucao)
+
     def ajustar_status_animal(self):
-        pass
+        """Leva o animal a DEVOLVIDO ou QUARENTENA, com a transição datada na própria devolução."""
+        self.animal.mudar_status(self.motivo.status_destino, data=self.data_devolucao)
 
 class Relatorios:
     """
     Classe de Serviço responsável por processar dados de persistência
     para gerar métricas e informações consolidadas.
     """
+    @staticmethod
+    def top_k(itens, k, chave):
+        """
+        Os k maiores itens segundo `chave`, consumindo `itens` como stream.
+        Usa um heap limitado a k (memória O(k), tempo O(N log k)) e mantém o
+        desempate de sorted(..., reverse=True)[:k]: em empate, vence quem veio antes.
+        """
+        return heapq.nlargest(k, itens, key=chave)
+
+    @staticmethod
+    def top_k_adotaveis(animais, adotantes, pontuador, k=5):
+        """
+        Retorna os k animais (dentre `animais`) com maior média de compatibilidade com os adotantes.
+
+        `pontuador` pode ser uma função (animal, adotante) -> score, como
+        SistemaAdocao.calcular_compatibilidade, ou um pontuador em lote com
+        `iterar_medias(animais, adotantes)`, como o MotorCompatibilidade.
+        """
+        if hasattr(pontuador, 'iterar_medias'):
+            animais = list(animais)
+            medias = zip(animais, pontuador.iterar_medias(animais, adotantes))
+        else:
+            def medias_escalares():
+                for animal in animais:
+                    scores = [pontuador(animal, ad) for ad in adotantes]
+                    yield animal, (sum(scores) / len(scores) if scores else 0)
+            medias = medias_escalares()
+
+        melhores = Relatorios.top_k(medias, k, chave=lambda par: par[1])
+        return [{"nome": animal.nome, "especie": animal.especie, "score_medio": media} for animal, media in melhores]
+
     @staticmethod
     def top_5_adotaveis(animais, adotantes, func_compatibilidade):
-        """Retorna os 5 animais com maior média de compatibilidade com os adotantes cadastrados."""
-        ranking = []
-        for animal in animais:
-            if animal.status == 'DISPONIVEL':
-                scores = [func_compatibilidade(animal, ad) for ad in adotantes]
-                media = sum(scores) / len(scores) if scores else 0
-                ranking.append({"nome": animal.nome, "media": media, "especie": animal.especie})
-        
-        # Ordena pela média decrescente
-        return sorted(ranking, key=lambda x: x['media'], reverse=True)[:5]
+        """Retorna os 5 animais disponíveis com maior média de compatibilidade com os adotantes cadastrados."""
+        disponiveis = (a for a in animais if a.status == 'DISPONIVEL')
+        return Relatorios.top_k_adotaveis(disponiveis, adotantes, func_compatibilidade, k=5)
 
     @staticmethod
     def tempo_medio_adocao(adocoes):
@@ -476,52 +884,141 @@ class Relatorios:
         if not adocoes:
             return 0.0
             
-        total_dias = 0
-        for adocao in adocoes:
-            # Garante que as datas sejam do tipo date
-            d_adocao = adocao.data_adocao
-            d_entrada = adocao.animal.data_entrada
-            
-            # Se for datetime, converte para date
-            if isinstance(d_adocao, datetime): d_adocao = d_adocao.date()
-            if isinstance(d_entrada, datetime): d_entrada = d_entrada.date()
-                
-            delta = d_adocao - d_entrada
-            total_dias += delta.days
-            
+        total_dias = sum(Relatorios.dias_ate_adocao(adocao) for adocao in adocoes)
         return total_dias / len(adocoes)
 
+    @staticmethod
+    def dias_ate_adocao(adocao):
+        """Dias entre a entrada do animal e a adoção."""
+        # Garante que as datas sejam do tipo date
+        d_adocao = adocao.data_adocao
+        d_entrada = adocao.animal.data_entrada
+
+        # Se for datetime, converte para date
+        if isinstance(d_adocao, datetime): d_adocao = d_adocao.date()
+        if isinstance(d_entrada, datetime): d_entrada = d_entrada.date()
+
+        return (d_adocao - d_entrada).days
+
+    @staticmethod
+    def tipo_adocao(adocao):
+        """Chave "Espécie (Porte)" usada em `taxa_adocoes_por_tipo`."""
+        return f"{adocao.animal.especie} ({adocao.animal.porte})"
+
+    @staticmethod
+    def formatar_taxas(contagem, total):
+        """Converte a contagem por tipo em porcentagem do total."""
+        if total == 0: return {}
+        return {k: f"{(v/total)*100:.1f}% ({v})" for k, v in contagem.items()}
+
     @staticmethod
     def taxa_adocoes_por_tipo(adocoes):
         """Retorna a contagem de adoções agrupada por Espécie e Porte."""
         stats = {}
-        total = len(adocoes)
-        if total == 0: return {}
-
         for adocao in adocoes:
-            chave = f"{adocao.animal.especie} ({adocao.animal.porte})"
+            chave = Relatorios.tipo_adocao(adocao)
             stats[chave] = stats.get(chave, 0) + 1
-            
-        # Converte para porcentagem
-        return {k: f"{(v/total)*100:.1f}% ({v})" for k, v in stats.items()}
+        return Relatorios.formatar_taxas(stats, len(adocoes))
 
     @staticmethod
-    def devolucoes_por_motivo(animais):
-        """Analisa o histórico de todos os animais buscando devoluções."""
+    def devolucoes_por_motivo(devolucoes):
+        """Conta as devoluções por código de motivo."""
         motivos = {}
-        for animal in animais:
-            for evento in animal.historico:
-                if evento.tipo == "Devolução":
-                    # Extrai o motivo da string "Motivo: XXXXX"
-                    motivo_texto = evento.descricao.replace("Motivo: ", "")
-                    motivos[motivo_texto] = motivos.get(motivo_texto, 0) + 1
+        for devolucao in devolucoes:
+            codigo = devolucao.motivo.value
+            motivos[codigo] = motivos.get(codigo, 0) + 1
         return motivos
 
 
+class AgregadosRelatorio:
+    """
+    Totais de `tempo_medio_adocao`, `taxa_adocoes_por_tipo` e
+    `devolucoes_por_motivo` mantidos a cada adoção/devolução, para que os
+    relatórios saiam em O(1) em vez de varrer adoções e históricos.
+
+    `calcular` monta os totais do zero (varredura completa) e `conferir`
+    compara com ela; `to_dict`/`from_dict` são o formato persistido.
+    """
+    __slots__ = ('adocoes_por_tipo', 'soma_dias', 'total_adocoes', 'devolucoes')
+
+    def __init__(self):
+        self.adocoes_por_tipo = {}
+        self.soma_dias = 0
+        self.total_adocoes = 0
+        self.devolucoes = {}
+
+    @classmethod
+    def calcular(cls, adocoes, devolucoes):
+        agregados = cls()
+        for adocao in adocoes:
+            agregados.registrar_adocao(adocao)
+        for devolucao in devolucoes:
+            agregados.registrar_devolucao(devolucao)
+        return agregados
+
+    def registrar_adocao(self, adocao):
+        chave = Relatorios.tipo_adocao(adocao)
+        self.adocoes_por_tipo[chave] = self.adocoes_por_tipo.get(chave, 0) + 1
+        self.soma_dias += Relatorios.dias_ate_adocao(adocao)
+        self.total_adocoes += 1
+
+    def registrar_devolucao(self, devolucao):
+        codigo = devolucao.motivo.value
+        self.devolucoes[codigo] = self.devolucoes.get(codigo, 0) + 1
+
+    # --- Relatórios (mesmo formato de Relatorios) ---
+    def tempo_medio_adocao(self):
+        return self.soma_dias / self.total_adocoes if self.total_adocoes else 0.0
+
+    def taxa_adocoes_por_tipo(self):
+        return Relatorios.formatar_taxas(self.adocoes_por_tipo, self.total_adocoes)
+
+    def devolucoes_por_motivo(self):
+        return dict(self.devolucoes)
+
+    def conferir(self, adocoes, devolucoes):
+        """Compara com a varredura completa. Retorna os nomes dos relatórios que divergem."""
+        completo = AgregadosRelatorio.calcular(adocoes, devolucoes)
+        divergentes = []
+        if self.tempo_medio_adocao() != completo.tempo_medio_adocao():
+            divergentes.append("tempo_medio")
+        if self.adocoes_por_tipo != completo.adocoes_por_tipo:
+            divergentes.append("taxa_tipo")
+        if self.devolucoes != completo.devolucoes:
+            divergentes.append("devolucoes")
+        return divergentes
+
+    VERSAO = 2 # 2: devoluções contadas por código de motivo (antes, pelo texto do histórico)
+
+    def to_dict(self):
+        return {
+            "versao": self.VERSAO,
+            "adocoes_por_tipo": self.adocoes_por_tipo,
+            "soma_dias": self.soma_dias,
+            "total_adocoes": self.total_adocoes,
+            "devolucoes": self.devolucoes
+        }
+
+    @classmethod
+    def from_dict(cls, dados):
+        """Levanta ValueError se os dados forem de outra versão do formato."""
+        if dados.get('versao') != cls.VERSAO:
+            raise ValueError("Agregados em formato antigo.")
+        agregados = cls()
+        agregados.adocoes_por_tipo = dict(dados['adocoes_por_tipo'])
+        agregados.soma_dias = dados['soma_dias']
+        agregados.total_adocoes = dados['total_adocoes']
+        agregados.devolucoes = dict(dados['devolucoes'])
+        return agregados
+
+
 class Cachorro(Animal, AdestravelMixin):
     """
     Subclasse que herda de Animal, especializando atributos e comportamentos caninos,
     """
+    __slots__ = ('nivel_adestramento', 'sociavel_com_gatos')
+    ESPECIE = "Cachorro"
+
     def __init__(self, id: int, raca: str, nome: str, sexo: str, idade_meses: int, 
                 porte: str, temperamento: List[str], sociavel_com_gatos: bool):
         
@@ -529,14 +1026,24 @@ class Cachorro(Animal, AdestravelMixin):
         AdestravelMixin.__init__(self) # Inicializa o mixin
         self.sociavel_com_gatos = sociavel_com_gatos
 
+    def _restaurar_padroes(self):
+        AdestravelMixin.__init__(self)
+        self.sociavel_com_gatos = True
+
 class Gato(Animal):
     """
     Subclasse que herda de Animal, especializando atributos e comportamentos felinos
     """
+    __slots__ = ('usa_caixa_areia',)
+    ESPECIE = "Gato"
+
     def __init__(self, id: int, raca: str, nome: str, sexo: str, idade_meses: int, 
                 porte: str, temperamento: List[str], usa_caixa_areia: bool):
         
         super().__init__(id, "Gato", raca, nome, sexo, idade_meses, porte, temperamento)
         self.usa_caixa_areia = usa_caixa_areia
 
+    def _restaurar_padroes(self):
+        self.usa_caixa_areia = True
+
 
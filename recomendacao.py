@@ -0,0 +1,161 @@
+"""
+Índice de recomendação: melhores animais para um adotante e melhores adotantes para um animal.
+
+A compatibilidade (`PontuadorCompatibilidade.pontuar`) e a elegibilidade
+(`RegrasElegibilidade`) só dependem de poucas características discretas de
+cada lado:
+
+    adotante  moradia (casa/apartamento/a exigida para porte grande/outra),
+              faixa de área (< 50, < área mínima do porte grande, acima),
+              experiência, crianças, idade > 60, idade < idade mínima
+    animal    porte grande, classe de temperamento (ruim/bom/neutro),
+              faixa de idade (< 24, 24-60, > 60 meses)
+
+Animais disponíveis e adotantes ficam em baldes por essa chave, cada balde com
+as posições (na lista do SistemaAdocao) em ordem crescente. Uma consulta pontua
+um representante por balde, já que todos do balde têm o mesmo score e a mesma
+elegibilidade, e junta os baldes do maior score para o menor; dentro do mesmo
+score as posições são intercaladas em ordem, o mesmo desempate do
+`heapq.nlargest` sobre a lista inteira. O resultado é idêntico à força bruta.
+
+Cada entrada guarda a chave e a `_versao_perfil` com que foi indexada. Quando
+um perfil muda (moradia, área, temperamento, idade...), o objeto avisa o
+SistemaAdocao, que marca a posição com `marcar_animal`/`marcar_adotante`; antes
+de cada consulta as posições marcadas cuja versão mudou são levadas para o
+balde da chave nova. Os limites vêm das regras de elegibilidade, então o
+índice é remontado quando as configurações mudam.
+"""
+import bisect
+import heapq
+from collections import defaultdict
+
+from compatibilidade import TEMPERAMENTO_BOM, TEMPERAMENTO_RUIM
+
+
+def chave_adotante(adotante, regras):
+    moradia = adotante.moradia_normalizada
+    area = adotante.area_util
+    return (moradia if moradia in ("casa", "apartamento", regras.moradia_porte_grande) else None,
+            area < 50, area < regras.area_minima_porte_grande,
+            adotante.experiencia_pets, adotante.possui_criancas,
+            adotante.idade > 60, adotante.idade < regras.idade_minima)
+
+
+def chave_animal(animal):
+    mascara = animal.mascara_temperamento
+    # Ruim tem precedência sobre bom, como no pontuador
+    temperamento = TEMPERAMENTO_RUIM if mascara & TEMPERAMENTO_RUIM else mascara & TEMPERAMENTO_BOM
+    idade = animal.idade_meses
+    return (animal.porte == "G", temperamento, 0 if idade < 24 else 2 if idade > 60 else 1)
+
+
+class IndiceRecomendacao:
+    """
+    Baldes de animais disponíveis e de adotantes, mantidos pelo SistemaAdocao
+    a cada cadastro, mudança de status e mudança de perfil. `animais` e `adotantes` são as listas
+    do sistema (as posições guardadas apontam para elas); `regras` é a
+    RegrasElegibilidade em vigor.
+    """
+    def __init__(self, animais, adotantes, regras):
+        self._animais = animais
+        self._adotantes = adotantes
+        self._regras = regras
+        self._baldes_animais = defaultdict(list) # chave -> posições em ordem crescente
+        self._baldes_adotantes = defaultdict(list)
+        # posição -> (chave, versão do perfil indexada), para retirar do balde certo e achar entradas velhas
+        self._chave_animal = {}
+        self._chave_adotante = {}
+        self._animais_marcados = set() # Posições cujo perfil pode ter mudado desde a indexação
+        self._adotantes_marcados = set()
+
+    @staticmethod
+    def _inserir(balde, posicao):
+        if not balde or balde[-1] < posicao:
+            balde.append(posicao) # Cadastro novo: sempre a maior posição
+        else:
+            bisect.insort(balde, posicao) # Animal voltando a ficar disponível ou perfil alterado
+
+    @staticmethod
+    def _retirar(balde, posicao):
+        i = bisect.bisect_left(balde, posicao)
+        if i < len(balde) and balde[i] == posicao:
+            del balde[i]
+
+    def adicionar_animal(self, posicao):
+        animal = self._animais[posicao]
+        chave = chave_animal(animal)
+        self._chave_animal[posicao] = (chave, animal._versao_perfil)
+        self._inserir(self._baldes_animais[chave], posicao)
+
+    def remover_animal(self, posicao):
+        entrada = self._chave_animal.pop(posicao, None)
+        if entrada is not None:
+            self._retirar(self._baldes_animais[entrada[0]], posicao)
+
+    def adicionar_adotante(self, posicao):
+        adotante = self._adotantes[posicao]
+        chave = chave_adotante(adotante, self._regras)
+        self._chave_adotante[posicao] = (chave, adotante._versao_perfil)
+        self._inserir(self._baldes_adotantes[chave], posicao)
+
+    def _remover_adotante(self, posicao):
+        entrada = self._chave_adotante.pop(posicao, None)
+        if entrada is not None:
+            self._retirar(self._baldes_adotantes[entrada[0]], posicao)
+
+    # --- Perfis alterados ---
+    def marcar_animal(self, posicao):
+        """O perfil do animal mudou: revisto antes da próxima consulta (O(1) aqui)."""
+        self._animais_marcados.add(posicao)
+
+    def marcar_adotante(self, posicao):
+        self._adotantes_marcados.add(posicao)
+
+    def _atualizar(self):
+        """Muda de balde as entradas marcadas cuja `_versao_perfil` não é mais a indexada."""
+        for posicao in self._animais_marcados:
+            entrada = self._chave_animal.get(posicao)
+            if entrada is not None and entrada[1] != self._animais[posicao]._versao_perfil:
+                self.remover_animal(posicao)
+                self.adicionar_animal(posicao)
+        self._animais_marcados.clear()
+        for posicao in self._adotantes_marcados:
+            entrada = self._chave_adotante.get(posicao)
+            if entrada is not None and entrada[1] != self._adotantes[posicao]._versao_perfil:
+                self._remover_adotante(posicao)
+                self.adicionar_adotante(posicao)
+        self._adotantes_marcados.clear()
+
+    @staticmethod
+    def _melhores(baldes, itens, k, avaliar):
+        """Top-k de (item, score); `avaliar(representante)` dá o score do balde ou None se inelegível."""
+        if k <= 0:
+            return []
+        por_score = defaultdict(list)
+        for posicoes in baldes.values():
+            if posicoes:
+                score = avaliar(itens[posicoes[0]])
+                if score is not None:
+                    por_score[score].append(posicoes)
+
+        resultado = []
+        for score in sorted(por_score, reverse=True):
+            for posicao in heapq.merge(*por_score[score]):
+                resultado.append((itens[posicao], score))
+                if len(resultado) == k:
+                    return resultado
+        return resultado
+
+    def melhores_animais(self, adotante, k, pontuar):
+        self._atualizar()
+        elegivel = self._regras.elegivel
+        def avaliar(animal):
+            return pontuar(animal, adotante) if elegivel(adotante, animal) else None
+        return self._melhores(self._baldes_animais, self._animais, k, avaliar)
+
+    def melhores_adotantes(self, animal, k, pontuar):
+        self._atualizar()
+        elegivel = self._regras.elegivel
+        def avaliar(adotante):
+            return pontuar(animal, adotante) if elegivel(adotante, animal) else None
+        return self._melhores(self._baldes_adotantes, self._adotantes, k, avaliar)
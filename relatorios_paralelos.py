@@ -0,0 +1,116 @@
+"""
+Top-k de compatibilidade distribuído num pool de processos.
+
+O ranking de `Relatorios.top_k_adotaveis` pontua cada animal disponível
+contra todos os adotantes (A x D pares), o que prende um núcleo só. Aqui os
+animais são fatiados em faixas contíguas e cada processo calcula o top-k da sua
+faixa; o processo principal junta os parciais.
+
+Os dados somente leitura (perfis de animais e adotantes, configurações) vão
+uma única vez por processo, pelo `initializer` do pool; cada tarefa é só uma
+faixa (inicio, fim) e devolve até k pares (posição, média). Os perfis são
+tuplas com os campos que a pontuação usa, então nada que aponte para o
+SistemaAdocao ou para o repositório atravessa o processo.
+
+O resultado é idêntico ao serial: cada média é calculada pelo mesmo pontuador
+e na mesma ordem de soma, e a junção mantém o desempate do `heapq.nlargest`
+(em empate vence o animal que vem antes na lista), porque os parciais são
+reunidos em ordem de posição antes do top-k final.
+"""
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from compatibilidade import MotorCompatibilidade, PontuadorCompatibilidade
+
+# Abaixo disso o custo de subir processos e enviar os perfis supera o ganho
+MIN_PARES_POR_PROCESSO = 200_000
+
+
+class _PerfilAnimal:
+    __slots__ = ('porte', 'mascara_temperamento', 'idade_meses')
+
+    def __init__(self, porte, mascara_temperamento, idade_meses):
+        self.porte = porte
+        self.mascara_temperamento = mascara_temperamento
+        self.idade_meses = idade_meses
+
+
+class _PerfilAdotante:
+    __slots__ = ('moradia_normalizada', 'area_util', 'experiencia_pets', 'possui_criancas', 'idade')
+
+    def __init__(self, moradia_normalizada, area_util, experiencia_pets, possui_criancas, idade):
+        self.moradia_normalizada = moradia_normalizada
+        self.area_util = area_util
+        self.experiencia_pets = experiencia_pets
+        self.possui_criancas = possui_criancas
+        self.idade = idade
+
+
+# Estado de cada processo do pool, preenchido uma vez por `_inicializar`
+_animais = None
+_adotantes = None
+_pontuador = None
+
+
+def _inicializar(config, perfis_animais, perfis_adotantes, usar_numpy):
+    global _animais, _adotantes, _pontuador
+    _animais = [_PerfilAnimal(*perfil) for perfil in perfis_animais]
+    _adotantes = [_PerfilAdotante(*perfil) for perfil in perfis_adotantes]
+    _pontuador = MotorCompatibilidade(config) if usar_numpy else PontuadorCompatibilidade(config)
+
+
+def _iterar_medias(animais, adotantes, pontuador):
+    """Mesmas médias de `Relatorios.top_k_adotaveis`, na ordem de `animais`."""
+    if hasattr(pontuador, 'iterar_medias'):
+        yield from pontuador.iterar_medias(animais, adotantes)
+        return
+    pontuar = pontuador.pontuar
+    for animal in animais:
+        scores = [pontuar(animal, ad) for ad in adotantes]
+        yield sum(scores) / len(scores) if scores else 0
+
+
+def _top_k_faixa(inicio, fim, k):
+    """Top-k da faixa [inicio, fim): lista de (posição, média)."""
+    medias = zip(range(inicio, fim), _iterar_medias(_animais[inicio:fim], _adotantes, _pontuador))
+    return heapq.nlargest(k, medias, key=lambda par: par[1])
+
+
+def _perfil_animal(animal):
+    return (animal.porte, animal.mascara_temperamento, animal.idade_meses)
+
+
+def _perfil_adotante(adotante):
+    return (adotante.moradia_normalizada, adotante.area_util, adotante.experiencia_pets,
+            adotante.possui_criancas, adotante.idade)
+
+
+def processos_uteis(processos, n_animais, n_adotantes):
+    """Quantos processos valem a pena para A x D pares (1 = calcular no processo atual)."""
+    if not processos or processos < 0:
+        processos = os.cpu_count() or 1
+    return max(1, min(processos, n_animais, (n_animais * n_adotantes) // MIN_PARES_POR_PROCESSO))
+
+
+def top_k_adotaveis(animais, adotantes, config, processos, k=5, usar_numpy=None):
+    """
+    Mesmo resultado de `Relatorios.top_k_adotaveis(animais, adotantes, pontuador, k)`
+    com o pontuador do settings.json, calculado em `processos` processos.
+    """
+    animais = list(animais)
+    if usar_numpy is None:
+        usar_numpy = MotorCompatibilidade.disponivel()
+
+    # Faixas contíguas e em ordem: a junção abaixo depende disso para manter o desempate
+    tamanho = -(-len(animais) // processos)
+    faixas = [(inicio, min(inicio + tamanho, len(animais))) for inicio in range(0, len(animais), tamanho)]
+
+    iniciais = (config, [_perfil_animal(a) for a in animais], [_perfil_adotante(a) for a in adotantes], usar_numpy)
+    with ProcessPoolExecutor(max_workers=len(faixas), initializer=_inicializar, initargs=iniciais) as pool:
+        parciais = list(pool.map(_top_k_faixa, *zip(*faixas), [k] * len(faixas)))
+
+    candidatos = sorted((par for parcial in parciais for par in parcial), key=lambda par: par[0])
+    melhores = heapq.nlargest(k, candidatos, key=lambda par: par[1])
+    return [{"nome": animais[posicao].nome, "especie": animais[posicao].especie, "score_medio": media}
+            for posicao, media in melhores]
@@ -1,72 +1,1252 @@
+import contextlib
+import itertools
 import json
 import os
-from models import RepositorioError
+import sqlite3
+import threading
+import catalogo
+import snapshot_binario
+from models import MotivoDevolucao, RepositorioError
+
+try:
+    import fcntl
+except ImportError: # Windows: usa msvcrt
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+TAMANHO_BLOCO_LEITURA = 1 << 16 # 64 KiB por leitura no parser incremental
+
+
+def iterar_registros_json(caminho: str):
+    """
+    Lê um arquivo de registros um a um, sem carregar o arquivo inteiro.
+
+    Aceita tanto um array JSON (`[{...}, {...}]`) quanto JSON Lines (um objeto
+    por linha); o formato é detectado pelo primeiro caractere. Para o array, o
+    texto é lido em blocos e cada elemento é decodificado com `raw_decode`
+    assim que estiver completo no buffer.
+    """
+    with open(caminho, 'r', encoding='utf-8') as f:
+        inicio = f.read(1)
+        while inicio.isspace():
+            inicio = f.read(1)
+        if not inicio:
+            return
+
+        if inicio != '[':
+            # JSON Lines: cada linha já é um registro completo
+            for linha in itertools.chain([inicio + f.readline()], f):
+                linha = linha.strip()
+                if linha:
+                    yield json.loads(linha)
+            return
+
+        decodificador = json.JSONDecoder()
+        buffer, pos, fim_arquivo = "", 0, False
+        tamanho_bloco = TAMANHO_BLOCO_LEITURA
+        while True:
+            # Pula espaços e a vírgula entre elementos
+            while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ','):
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            if pos < len(buffer):
+                try:
+                    registro, fim = decodificador.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    fim = None
+                # Só aceita se o elemento terminou antes do fim do buffer (senão pode estar cortado)
+                if fim is not None and (fim < len(buffer) or fim_arquivo):
+                    yield registro
+                    pos = fim
+                    continue
+            if fim_arquivo:
+                raise json.JSONDecodeError("Array JSON incompleto", buffer, pos)
+
+            # Precisa de mais texto: descarta o que já foi consumido e lê o próximo bloco
+            buffer = buffer[pos:]
+            pos = 0
+            if len(buffer) >= tamanho_bloco:
+                tamanho_bloco *= 2 # Registro maior que o bloco: evita reprocessar o buffer várias vezes
+            bloco = f.read(tamanho_bloco)
+            if bloco:
+                buffer += bloco
+            else:
+                fim_arquivo = True
+
+
+class TravaArquivo:
+    """
+    Trava consultiva entre processos sobre um arquivo (fcntl.flock no POSIX,
+    msvcrt.locking no Windows, onde toda trava é exclusiva).
+
+    É reentrante no mesmo processo: só a aquisição mais externa toca no
+    arquivo, e as threads do processo se revezam por um RLock.
+    """
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._arquivo = None
+        self._nivel = 0
+        self._mutex = threading.RLock()
+
+    @contextlib.contextmanager
+    def segurar(self, compartilhada: bool = False):
+        with self._mutex:
+            if self._nivel == 0:
+                self._adquirir(compartilhada)
+            self._nivel += 1
+            try:
+                yield
+            finally:
+                self._nivel -= 1
+                if self._nivel == 0:
+                    self._liberar()
+
+    def _adquirir(self, compartilhada):
+        try:
+            if self._arquivo is None:
+                self._arquivo = open(self.caminho, 'a+b')
+            if fcntl is not None:
+                fcntl.flock(self._arquivo.fileno(), fcntl.LOCK_SH if compartilhada else fcntl.LOCK_EX)
+            elif msvcrt is not None:
+                self._arquivo.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(self._arquivo.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue # LK_LOCK desiste após ~10s; continua esperando o outro escritor
+        except OSError as e:
+            raise RepositorioError(f"Não foi possível travar a base ({self.caminho}): {e}")
+
+    def _liberar(self):
+        if fcntl is not None:
+            fcntl.flock(self._arquivo.fileno(), fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            self._arquivo.seek(0)
+            msvcrt.locking(self._arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def escrever_registros_json(f, registros, indent: int = None, linhas: bool = False):
+    """
+    Serializa os registros (qualquer iterável, inclusive um gerador) um por vez.
+
+    Com `linhas=True` grava JSON Lines; senão grava um array JSON com a mesma
+    formatação de `json.dump(lista, f, indent=indent)`.
+    """
+    if linhas:
+        for registro in registros:
+            f.write(json.dumps(registro, ensure_ascii=False, separators=(',', ':')))
+            f.write("\n")
+        return
+
+    if indent is None:
+        separador, abertura, fechamento, quebra = ", ", "[", "]", None
+    else:
+        quebra = "\n" + " " * indent
+        separador, abertura, fechamento = "," + quebra, "[" + quebra, "\n]"
+
+    primeiro = True
+    for registro in registros:
+        texto = json.dumps(registro, indent=indent, ensure_ascii=False)
+        if quebra:
+            texto = texto.replace("\n", quebra)
+        f.write(abertura if primeiro else separador)
+        f.write(texto)
+        primeiro = False
+    f.write("[]" if primeiro else fechamento)
+
 
 class Repositorio:
-    def __init__(self):
+    """
+    Persistência em arquivos JSON.
+
+    Modos:
+    - "json": cada salvamento reescreve os três arquivos por completo (padrão).
+    - "journal": cada mutação vira uma linha compacta em database_journal.jsonl.
+      Os arquivos JSON passam a funcionar como snapshot e só são reescritos na
+      compactação (a cada `compactar_apos` registros).
+
+    Formatos dos arquivos de dados:
+    - "json": um array JSON por arquivo (database_animais.json, ...).
+    - "jsonl": JSON Lines, um registro por linha (database_animais.jsonl, ...).
+    Nos dois casos a leitura e a escrita são feitas registro a registro, sem
+    montar o arquivo inteiro em memória.
+
+    Os históricos dos animais ficam fora de database_animais.json, em
+    database_historicos.jsonl (uma linha por animal) com um índice id -> (offset,
+    tamanho) em database_historicos.idx.json. Assim a inicialização não lê eventos:
+    cada histórico é lido com um seek quando o animal precisa dele.
+
+    Gravação segura: cada salvamento é uma "geração". Os arquivos são escritos
+    em temporários (`.novo`) com fsync; database_manifest.json confirma a
+    geração listando as renomeações, que são então aplicadas com os.replace.
+    Se o processo cair depois da confirmação, o próximo carregamento termina as
+    renomeações; se cair antes, os temporários são descartados e a geração
+    anterior continua inteira. Escritores são serializados por uma trava
+    consultiva em database.lock, e uma instância que carregou a geração N se
+    recusa a sobrescrever uma geração N+1 gravada por outra.
+
+    Com `snapshot_binario=True`, cada geração também grava database_snapshot.bin
+    (ver snapshot_binario.py), preferido na inicialização quando o CRC32 e a
+    geração conferem; senão a carga cai no JSON.
+
+    Com `catalogo_relatorios=True`, cada geração também grava
+    database_catalogo.bin (ver catalogo.py), lido via mmap pelos processos de
+    relatório. No modo journal ele reflete o último snapshot compactado.
+    """
+    MODOS = ("json", "journal")
+    FORMATOS = ("json", "jsonl")
+    SUFIXO_TEMPORARIO = ".novo"
+
+    def __init__(self, modo: str = "json", compactar_apos: int = 1000, formato: str = "json",
+                 snapshot_binario: bool = False, catalogo_relatorios: bool = False, pasta: str = None):
+        if formato not in self.FORMATOS:
+            raise RepositorioError(f"Formato de arquivo desconhecido: '{formato}'.")
+        self.formato = formato
+        self.snapshot_binario = snapshot_binario
+        self.catalogo_relatorios = catalogo_relatorios
+
         # Garante que os arquivos sejam salvos na mesma pasta do script, independente de onde for executado
-        base_path = os.path.dirname(os.path.abspath(__file__))
-        self.arquivo_animais = os.path.join(base_path, "database_animais.json")
-        self.arquivo_adocoes = os.path.join(base_path, "database_adocoes.json")
-        self.arquivo_adotantes = os.path.join(base_path, "database_adotantes.json")
+        base_path = pasta or os.path.dirname(os.path.abspath(__file__))
+        self.base_path = base_path
+        self.arquivo_animais = os.path.join(base_path, f"database_animais.{formato}")
+        self.arquivo_adocoes = os.path.join(base_path, f"database_adocoes.{formato}")
+        self.arquivo_adotantes = os.path.join(base_path, f"database_adotantes.{formato}")
+        self.arquivo_devolucoes = os.path.join(base_path, f"database_devolucoes.{formato}")
+        # Gravados no `formato` configurado: ao trocar de formato, a cópia no outro é apagada na geração seguinte
+        self.arquivos_de_dados = (self.arquivo_animais, self.arquivo_adocoes, self.arquivo_adotantes,
+                                  self.arquivo_devolucoes)
+        self.arquivo_journal = os.path.join(base_path, "database_journal.jsonl")
+        self.arquivo_historicos = os.path.join(base_path, "database_historicos.jsonl")
+        self.arquivo_indice_historicos = os.path.join(base_path, "database_historicos.idx.json")
+        self._indice_historicos = None # id -> [offset, tamanho], lido sob demanda
+        self.arquivo_manifesto = os.path.join(base_path, "database_manifest.json")
+        self.arquivo_binario = os.path.join(base_path, "database_snapshot.bin")
+        self.arquivo_catalogo = os.path.join(base_path, "database_catalogo.bin")
+        self.arquivo_agregados = os.path.join(base_path, "database_agregados.json")
+        self.arquivo_sequencias = os.path.join(base_path, "database_sequencias.json")
+        self._trava_arquivo = TravaArquivo(os.path.join(base_path, "database.lock"))
 
-    def salvar_dados(self, lista_animais, lista_adocoes, lista_adotantes):
-        """Salva as listas de objetos em arquivos JSON."""
-        try:
-            dados_animais = [animal.to_dict() for animal in lista_animais]
-            dados_adocoes = [adocao.to_dict() for adocao in lista_adocoes]
-            dados_adotantes = [adotante.to_dict() for adotante in lista_adotantes]
-
-            with open(self.arquivo_animais, 'w', encoding='utf-8') as f:
-                json.dump(dados_animais, f, indent=4, ensure_ascii=False)
-                
-            with open(self.arquivo_adocoes, 'w', encoding='utf-8') as f:
-                json.dump(dados_adocoes, f, indent=4, ensure_ascii=False)
-
-            with open(self.arquivo_adotantes, 'w', encoding='utf-8') as f:
-                json.dump(dados_adotantes, f, indent=4, ensure_ascii=False)
-                
+        if modo not in self.MODOS:
+            raise RepositorioError(f"Modo de persistência desconhecido: '{modo}'.")
+        self.modo = modo
+        self.compactar_apos = compactar_apos
+        self._registros_no_journal = 0
+        self._journal = None # Handle aberto em modo append (aberto sob demanda)
+        self._tamanho_journal = 0 # Bytes do journal que esta instância conhece (lidos + anexados)
+        self._journal_truncado_em = None # Offset da última linha íntegra, se o fim estiver corrompido
+
+        self._geracao = 0
+        self._recuperar_geracao()
+
+    @property
+    def usa_journal(self):
+        return self.modo == "journal"
+
+    def salvar_dados(self, lista_animais, lista_adocoes, lista_adotantes, lista_devolucoes=(), agregados=None,
+                     sequencias=None):
+        """
+        Salva as listas de objetos (e os agregados dos relatórios e as sequências de ids, se houver).
+        No modo journal as mutações já estão no log; aqui só compactamos quando ele cresceu demais.
+        """
+        if self.usa_journal:
+            self._sincronizar_journal()
+            if self.precisa_compactar:
+                self.compactar(lista_animais, lista_adocoes, lista_adotantes, lista_devolucoes, agregados, sequencias)
+            elif agregados is not None:
+                self._gravar_agregados_journal(agregados)
             print("💾 Dados salvos com sucesso!")
-        except IOError as e:
-            raise RepositorioError(f"Falha ao escrever no disco: {e}")
-        except Exception as e:
-            raise RepositorioError(f"Erro inesperado ao salvar: {e}")
+            return
 
-    def carregar_dados(self):
-        """Carrega os dados de animais para leitura."""
-        if not os.path.exists(self.arquivo_animais):
-            return []
-            
+        self._escrever_snapshot(lista_animais, lista_adocoes, lista_adotantes, lista_devolucoes, agregados, sequencias,
+                                indent=4)
+        print("💾 Dados salvos com sucesso!")
+
+    @property
+    def precisa_compactar(self):
+        return self.usa_journal and self._registros_no_journal >= self.compactar_apos
+
+    def compactar(self, lista_animais, lista_adocoes, lista_adotantes, lista_devolucoes=(), agregados=None,
+                  sequencias=None):
+        """Grava um snapshot completo e descarta o journal que ele absorveu."""
+        self._escrever_snapshot(lista_animais, lista_adocoes, lista_adotantes, lista_devolucoes, agregados, sequencias,
+                                truncar_journal=True)
+
+    def _escrever_snapshot(self, lista_animais, lista_adocoes, lista_adotantes, lista_devolucoes=(), agregados=None,
+                           sequencias=None, indent=None, truncar_journal=False):
+        """
+        Grava uma nova geração da base: cada arquivo vai para um temporário
+        (`.novo`) com fsync e só depois o manifesto confirma o conjunto todo.
+        """
+        with self.trava():
+            self._verificar_geracao()
+            pendentes = []
+            try:
+                novo_indice = self._escrever_historicos(lista_animais, pendentes)
+
+                # Geradores: cada to_dict() é serializado e descartado antes do próximo
+                arquivos = (
+                    (self.arquivo_animais, (animal.to_dict(incluir_historico=False) for animal in lista_animais)),
+                    (self.arquivo_adocoes, (adocao.to_dict() for adocao in lista_adocoes)),
+                    (self.arquivo_adotantes, (adotante.to_dict() for adotante in lista_adotantes)),
+                    (self.arquivo_devolucoes, (devolucao.to_dict() for devolucao in lista_devolucoes)),
+                )
+                for caminho, registros in arquivos:
+                    with self._abrir_temporario(caminho, pendentes, 'w', encoding='utf-8') as f:
+                        escrever_registros_json(f, registros, indent=indent, linhas=self.formato == "jsonl")
+                        self._fsync(f)
+
+                if self.snapshot_binario:
+                    self._escrever_binario(lista_animais, lista_adocoes, lista_adotantes, pendentes)
+                if self.catalogo_relatorios:
+                    self._escrever_catalogo(lista_animais, lista_adocoes, pendentes)
+                if agregados is not None:
+                    # Marcado com a geração: o journal anexado depois dela é reaplicado por cima na carga
+                    with self._abrir_temporario(self.arquivo_agregados, pendentes, 'w', encoding='utf-8') as f:
+                        json.dump({"geracao": self._geracao + 1, "registros_journal": 0, **agregados.to_dict()},
+                                  f, ensure_ascii=False)
+                        self._fsync(f)
+                if sequencias is not None:
+                    with self._abrir_temporario(self.arquivo_sequencias, pendentes, 'w', encoding='utf-8') as f:
+                        json.dump(sequencias, f)
+                        self._fsync(f)
+
+                self._confirmar_geracao(pendentes, truncar_journal)
+            except IOError as e:
+                self._descartar_temporarios(pendentes)
+                raise RepositorioError(f"Falha ao escrever no disco: {e}")
+            except RepositorioError:
+                self._descartar_temporarios(pendentes)
+                raise
+            except Exception as e:
+                self._descartar_temporarios(pendentes)
+                raise RepositorioError(f"Erro inesperado ao salvar: {e}")
+            self._indice_historicos = novo_indice
+
+    def _escrever_binario(self, lista_animais, lista_adocoes, lista_adotantes, pendentes):
+        try:
+            conteudo = snapshot_binario.serializar(lista_animais, lista_adotantes, lista_adocoes, self._geracao + 1)
+        except ValueError as e:
+            # O JSON continua completo; sem o binário a próxima carga só fica mais lenta
+            print(f"⚠️ Snapshot binário não gravado: {e}")
+            return
+        with self._abrir_temporario(self.arquivo_binario, pendentes, 'wb') as f:
+            f.write(conteudo)
+            self._fsync(f)
+
+    def _escrever_catalogo(self, lista_animais, lista_adocoes, pendentes):
         try:
-            with open(self.arquivo_animais, 'r', encoding='utf-8') as f:
+            conteudo = catalogo.serializar(lista_animais, lista_adocoes, self._geracao + 1)
+        except ValueError as e:
+            print(f"⚠️ Catálogo de relatórios não gravado: {e}")
+            return
+        # os.replace troca o arquivo sem afetar quem já o mapeou: leitores seguem na geração que abriram
+        with self._abrir_temporario(self.arquivo_catalogo, pendentes, 'wb') as f:
+            f.write(conteudo)
+            self._fsync(f)
+
+    @property
+    def geracao(self):
+        return self._geracao
+
+    def _gravar_agregados_journal(self, agregados):
+        """
+        Modo journal sem compactação: grava os agregados junto com quantos
+        registros do journal eles já contam, para a carga reaplicar só os seguintes.
+        """
+        with self.trava():
+            try:
+                self._verificar_geracao()
+            except RepositorioError:
+                return # Outra instância gravou depois de nós: os agregados serão recalculados na carga
+            temporario = self.arquivo_agregados + self.SUFIXO_TEMPORARIO
+            try:
+                with open(temporario, 'w', encoding='utf-8') as f:
+                    json.dump({"geracao": self._geracao, "registros_journal": self._registros_no_journal,
+                               **agregados.to_dict()}, f, ensure_ascii=False)
+                    self._fsync(f)
+                os.replace(temporario, self.arquivo_agregados)
+            except IOError as e:
+                raise RepositorioError(f"Falha ao gravar os agregados dos relatórios: {e}")
+
+    def gravar_devolucoes(self, lista_devolucoes):
+        """
+        Grava só a coleção de devoluções, fora de uma geração (como os agregados
+        no modo journal). Usado uma vez, depois de migrar uma base anterior às
+        devoluções: com o arquivo presente a migração não se repete nas próximas
+        cargas, mesmo no modo journal antes da primeira compactação.
+        """
+        with self.trava():
+            try:
+                self._verificar_geracao()
+            except RepositorioError:
+                return # Outra instância gravou depois de nós: a próxima carga decide de novo
+            temporario = self.arquivo_devolucoes + self.SUFIXO_TEMPORARIO
+            try:
+                with open(temporario, 'w', encoding='utf-8') as f:
+                    escrever_registros_json(f, (devolucao.to_dict() for devolucao in lista_devolucoes),
+                                            linhas=self.formato == "jsonl")
+                    self._fsync(f)
+                os.replace(temporario, self.arquivo_devolucoes)
+            except IOError as e:
+                raise RepositorioError(f"Falha ao gravar as devoluções migradas: {e}")
+
+    def carregar_agregados(self):
+        """
+        Agregados dos relatórios gravados nesta geração (dicionário), ou None.
+        `registros_journal` diz quantos registros do journal já estão contados neles.
+        """
+        try:
+            with open(self.arquivo_agregados, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (IOError, ValueError) as e:
+            print(f"⚠️ Agregados dos relatórios ignorados ({e}); serão recalculados.")
+            return None
+        # De outra geração (salvamento sem agregados depois dele): não vale para os dados atuais
+        return dados if dados.get("geracao") == self._geracao else None
+
+    def carregar_sequencias(self):
+        """
+        Próximo id de cada coleção ({"animal": n, "adotante": n}) gravado no último
+        snapshot, ou {}. No modo journal os ids anexados depois dele vêm nos próprios registros.
+        """
+        try:
+            with open(self.arquivo_sequencias, 'r', encoding='utf-8') as f:
                 return json.load(f)
-        except json.JSONDecodeError:
-            raise RepositorioError("Arquivo de dados de animais corrompido.")
+        except FileNotFoundError:
+            return {}
+        except (IOError, ValueError) as e:
+            print(f"⚠️ Sequências de ids ignoradas ({e}); recalculadas a partir dos ids carregados.")
+            return {}
+
+    def carregar_snapshot_binario(self):
+        """Snapshot binário da geração atual, ou None (desativado, ausente, antigo ou corrompido)."""
+        if not self.snapshot_binario or not os.path.exists(self.arquivo_binario):
+            return None
+        try:
+            return snapshot_binario.ler(self.arquivo_binario, geracao_esperada=self._geracao)
+        except ValueError as e:
+            print(f"⚠️ Snapshot binário ignorado ({e}); carregando do JSON.")
+            return None
         except IOError as e:
-            raise RepositorioError(f"Erro ao ler arquivo de animais: {e}")
+            raise RepositorioError(f"Erro ao ler o snapshot binário: {e}")
 
-    def carregar_adocoes(self):
-        """Carrega os dados de adoções para leitura."""
-        if not os.path.exists(self.arquivo_adocoes):
-            return []
-            
+    # --- Gerações (manifesto + renomeação atômica) ---
+    def _abrir_temporario(self, caminho, pendentes, modo, **kwargs):
+        """Abre `<caminho>.novo` e o anota como pendente de renomear para `caminho`."""
+        temporario = caminho + self.SUFIXO_TEMPORARIO
+        pendentes.append((os.path.basename(temporario), os.path.basename(caminho)))
+        return open(temporario, modo, **kwargs)
+
+    @staticmethod
+    def _fsync(f):
+        f.flush()
+        os.fsync(f.fileno())
+
+    def _fsync_diretorio(self):
+        """Torna as renomeações duráveis (no Windows não existe fsync de diretório)."""
         try:
-            with open(self.arquivo_adocoes, 'r', encoding='utf-8') as f:
+            fd = os.open(self.base_path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _descartar_temporarios(self, pendentes):
+        for temporario, _ in pendentes:
+            try:
+                os.remove(os.path.join(self.base_path, temporario))
+            except OSError:
+                pass
+
+    def _ler_manifesto(self):
+        if not os.path.exists(self.arquivo_manifesto):
+            return {"geracao": 0, "pendentes": []}
+        try:
+            with open(self.arquivo_manifesto, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except json.JSONDecodeError:
-            raise RepositorioError("Arquivo de dados de adoções corrompido.")
+            raise RepositorioError("Manifesto da base corrompido.")
         except IOError as e:
-            raise RepositorioError(f"Erro ao ler arquivo de adoções: {e}")
+            raise RepositorioError(f"Erro ao ler o manifesto: {e}")
 
-    def carregar_adotantes(self):
-        """Carrega os dados de adotantes para leitura."""
-        if not os.path.exists(self.arquivo_adotantes):
+    def _gravar_manifesto(self, manifesto):
+        temporario = self.arquivo_manifesto + self.SUFIXO_TEMPORARIO
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(manifesto, f)
+            self._fsync(f)
+        os.replace(temporario, self.arquivo_manifesto)
+        self._fsync_diretorio()
+
+    def _confirmar_geracao(self, pendentes, truncar_journal):
+        """
+        Ponto de confirmação: gravado o manifesto com a lista de renomeações,
+        a geração vale mesmo que o processo caia no meio delas (o próximo
+        carregamento termina o serviço em `_recuperar_geracao`).
+        """
+        manifesto = {"geracao": self._geracao + 1, "pendentes": list(pendentes), "truncar_journal": truncar_journal}
+        self._gravar_manifesto(manifesto)
+        # Confirmada: os temporários agora pertencem ao manifesto e não podem mais ser descartados
+        pendentes.clear()
+        self._geracao = manifesto["geracao"]
+        self._aplicar_manifesto(manifesto)
+
+    def _aplicar_manifesto(self, manifesto):
+        """Renomeia os temporários da geração (idempotente) e marca o manifesto como concluído."""
+        for temporario, definitivo in manifesto.get("pendentes", []):
+            temporario = os.path.join(self.base_path, temporario)
+            definitivo = os.path.join(self.base_path, definitivo)
+            if os.path.exists(temporario):
+                os.replace(temporario, definitivo)
+            if definitivo in self.arquivos_de_dados:
+                self._remover_formato_antigo(definitivo)
+        if manifesto.get("truncar_journal"):
+            self.fechar()
+            with open(self.arquivo_journal, 'w', encoding='utf-8'):
+                pass
+            self._registros_no_journal = 0
+            self._tamanho_journal = 0
+            self._journal_truncado_em = None
+        self._fsync_diretorio()
+
+        self._geracao = manifesto["geracao"]
+        self._gravar_manifesto({"geracao": self._geracao, "pendentes": []})
+
+    def _recuperar_geracao(self):
+        """Conclui uma geração confirmada e interrompida e apaga temporários de gerações não confirmadas."""
+        with self.trava():
+            try:
+                manifesto = self._ler_manifesto()
+                self._geracao = manifesto.get("geracao", 0)
+                if manifesto.get("pendentes"):
+                    self._aplicar_manifesto(manifesto)
+                for nome in os.listdir(self.base_path):
+                    if nome.startswith("database_") and nome.endswith(self.SUFIXO_TEMPORARIO):
+                        os.remove(os.path.join(self.base_path, nome))
+                if os.path.exists(self.arquivo_journal):
+                    self._tamanho_journal = os.path.getsize(self.arquivo_journal)
+            except IOError as e:
+                raise RepositorioError(f"Falha ao recuperar a última gravação: {e}")
+
+    def _verificar_geracao(self):
+        """
+        Recusa sobrescrever o que outra instância gravou depois do nosso
+        carregamento: uma geração nova ou linhas anexadas ao journal (que a
+        compactação descartaria).
+        """
+        geracao_em_disco = self._ler_manifesto().get("geracao", 0)
+        journal_alheio = (self.usa_journal and os.path.exists(self.arquivo_journal)
+                          and os.path.getsize(self.arquivo_journal) > self._tamanho_journal)
+        if geracao_em_disco != self._geracao or journal_alheio:
+            raise RepositorioError(
+                "A base foi salva por outra instância depois de carregada aqui; "
+                "reinicie o programa para trabalhar sobre os dados atuais."
+            )
+
+    def trava(self, compartilhada: bool = False):
+        """Trava consultiva entre processos sobre database.lock (leitores compartilham, escritores são exclusivos)."""
+        return self._trava_arquivo.segurar(compartilhada)
+
+    # --- Históricos (arquivo separado, lidos sob demanda) ---
+    def _carregar_indice_historicos(self):
+        if self._indice_historicos is not None:
+            return self._indice_historicos
+
+        indice = {}
+        if os.path.exists(self.arquivo_indice_historicos):
+            try:
+                with open(self.arquivo_indice_historicos, 'r', encoding='utf-8') as f:
+                    indice = {int(k): v for k, v in json.load(f).items()}
+            except (json.JSONDecodeError, ValueError):
+                indice = self._reconstruir_indice_historicos()
+            except IOError as e:
+                raise RepositorioError(f"Erro ao ler índice de históricos: {e}")
+        elif os.path.exists(self.arquivo_historicos):
+            indice = self._reconstruir_indice_historicos()
+        self._indice_historicos = indice
+        return indice
+
+    def _reconstruir_indice_historicos(self):
+        """Refaz o índice varrendo o arquivo (só o id no começo de cada linha é interpretado)."""
+        indice = {}
+        try:
+            with open(self.arquivo_historicos, 'rb') as f:
+                offset = 0
+                for linha in f:
+                    # Linhas gravadas como {"id":123,"historico":[...]}
+                    inicio = linha.find(b':') + 1
+                    fim = linha.find(b',', inicio)
+                    try:
+                        indice[int(linha[inicio:fim])] = [offset, len(linha)]
+                    except ValueError:
+                        pass
+                    offset += len(linha)
+        except IOError as e:
+            raise RepositorioError(f"Erro ao ler arquivo de históricos: {e}")
+        return indice
+
+    def _ler_linha_historico(self, arquivo, animal_id, revalidar=True):
+        posicao = self._carregar_indice_historicos().get(animal_id)
+        if posicao is None:
+            return None
+        arquivo.seek(posicao[0])
+        linha = arquivo.read(posicao[1])
+        if revalidar and not linha.startswith(f'{{"id":{animal_id},'.encode('utf-8')):
+            # Arquivo regravado por outra instância (ou gravação interrompida): o índice em memória ficou velho
+            self._indice_historicos = self._reconstruir_indice_historicos()
+            return self._ler_linha_historico(arquivo, animal_id, revalidar=False)
+        return linha
+
+    def carregar_historico(self, animal_id):
+        """Lê o histórico (lista de dicionários) de um único animal."""
+        if not os.path.exists(self.arquivo_historicos):
             return []
-            
         try:
-            with open(self.arquivo_adotantes, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(self.arquivo_historicos, 'rb') as f:
+                linha = self._ler_linha_historico(f, animal_id)
+            return json.loads(linha)["historico"] if linha else []
+        except (json.JSONDecodeError, KeyError):
+            raise RepositorioError(f"Histórico do animal {animal_id} corrompido.")
+        except IOError as e:
+            raise RepositorioError(f"Erro ao ler histórico do animal {animal_id}: {e}")
+
+    def iterar_historicos(self, ids=None):
+        """
+        Gera (id do animal, eventos em dicionário) lendo o arquivo de históricos
+        em sequência, sem criar objetos nos animais. Com `ids`, linhas de outros
+        animais são puladas sem interpretar o JSON.
+        """
+        if not os.path.exists(self.arquivo_historicos):
+            return
+        try:
+            with open(self.arquivo_historicos, 'rb') as f:
+                for linha in f:
+                    if ids is not None:
+                        # Linhas gravadas como {"id":123,"historico":[...]}
+                        inicio = linha.find(b':') + 1
+                        try:
+                            if int(linha[inicio:linha.find(b',', inicio)]) not in ids:
+                                continue
+                        except ValueError:
+                            pass
+                    if linha.strip():
+                        registro = json.loads(linha)
+                        yield registro["id"], registro["historico"]
+        except (json.JSONDecodeError, KeyError):
+            raise RepositorioError("Arquivo de históricos corrompido.")
+        except IOError as e:
+            raise RepositorioError(f"Erro ao ler arquivo de históricos: {e}")
+
+    def _escrever_historicos(self, lista_animais, pendentes):
+        """
+        Grava o arquivo de históricos e seu índice como temporários da geração
+        e retorna o novo índice. Históricos que nunca foram carregados são
+        copiados byte a byte do arquivo atual, sem passar pelo JSON.
+        """
+        antigo = open(self.arquivo_historicos, 'rb') if os.path.exists(self.arquivo_historicos) else None
+        novo_indice = {}
+        try:
+            with self._abrir_temporario(self.arquivo_historicos, pendentes, 'wb') as f:
+                offset = 0
+                for animal in lista_animais:
+                    if not animal.historico_carregado and animal._fonte_historico is self:
+                        linha = self._ler_linha_historico(antigo, animal.id) if antigo is not None else None
+                        if linha is None:
+                            continue
+                    else:
+                        # Carregado (ou vindo de outro repositório, como na migração): serializa
+                        registro = {"id": animal.id, "historico": [e.to_dict() for e in animal.historico]}
+                        linha = (json.dumps(registro, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+                    novo_indice[animal.id] = [offset, len(linha)]
+                    f.write(linha)
+                    offset += len(linha)
+                self._fsync(f)
+        finally:
+            if antigo is not None:
+                antigo.close()
+
+        with self._abrir_temporario(self.arquivo_indice_historicos, pendentes, 'w', encoding='utf-8') as f:
+            json.dump(novo_indice, f, separators=(',', ':'))
+            self._fsync(f)
+        return novo_indice
+
+    # --- Journal (append-only) ---
+    def registrar(self, operacao: str, dados: dict):
+        """Anexa uma mutação ao journal. No modo "json" não faz nada."""
+        if not self.usa_journal:
+            return
+        registro = dict(dados)
+        registro["op"] = operacao
+        self._anexar_journal(registro)
+
+    def registrar_lote(self, operacao: str, lista_dados: list):
+        """
+        Anexa várias mutações do mesmo tipo como um único registro do journal
+        ({"op": "lote", "tipo": operacao, "itens": [...]}): uma escrita e uma
+        linha, que a carga reaplica inteira ou (se truncada) não reaplica.
+        """
+        if not self.usa_journal or not lista_dados:
+            return
+        self._anexar_journal({"op": "lote", "tipo": operacao, "itens": list(lista_dados)})
+
+    def _anexar_journal(self, registro):
+        linha = (json.dumps(registro, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+        with self.trava():
+            try:
+                if self._journal is None:
+                    if self._journal_truncado_em is not None:
+                        # Descarta a linha incompleta antes de anexar depois dela
+                        os.truncate(self.arquivo_journal, self._journal_truncado_em)
+                        self._tamanho_journal = self._journal_truncado_em
+                        self._journal_truncado_em = None
+                    self._journal = open(self.arquivo_journal, 'ab')
+                self._journal.write(linha)
+                self._journal.flush()
+            except IOError as e:
+                raise RepositorioError(f"Falha ao escrever no journal: {e}")
+        self._tamanho_journal += len(linha)
+        self._registros_no_journal += 1
+
+    def carregar_journal(self):
+        """Gera os registros do journal na ordem em que foram gravados."""
+        self._registros_no_journal = 0
+        if not self.usa_journal or not os.path.exists(self.arquivo_journal):
+            return
+
+        try:
+            with open(self.arquivo_journal, 'rb') as f:
+                offset = 0
+                for linha in f:
+                    if linha.strip():
+                        try:
+                            registro = json.loads(linha)
+                        except (json.JSONDecodeError, UnicodeDecodeError):
+                            # Última linha truncada por queda no meio da escrita: ignora o resto
+                            self._journal_truncado_em = offset
+                            break
+                        self._registros_no_journal += 1
+                        yield registro
+                    offset += len(linha)
+                # O resto corrompido (se houver) também é conhecido: não conta como escrita alheia
+                self._tamanho_journal = os.fstat(f.fileno()).st_size
+        except IOError as e:
+            raise RepositorioError(f"Erro ao ler o journal: {e}")
+
+    def _sincronizar_journal(self):
+        if self._journal is not None:
+            try:
+                self._journal.flush()
+                os.fsync(self._journal.fileno())
+            except IOError as e:
+                raise RepositorioError(f"Falha ao sincronizar o journal: {e}")
+
+    def fechar(self):
+        """Fecha o handle do journal, se estiver aberto."""
+        if self._journal is not None:
+            self._sincronizar_journal()
+            self._journal.close()
+            self._journal = None
+
+    # --- Leitura (registro a registro) ---
+    @staticmethod
+    def _caminho_outro_formato(caminho):
+        base, extensao = os.path.splitext(caminho)
+        return base + (".json" if extensao == ".jsonl" else ".jsonl")
+
+    def _remover_formato_antigo(self, caminho):
+        """Depois de gravar no formato configurado, apaga a cópia no outro formato (se houver)."""
+        antigo = self._caminho_outro_formato(caminho)
+        if os.path.exists(antigo):
+            os.remove(antigo)
+
+    def _iterar_arquivo(self, caminho, descricao):
+        # Base gravada no outro formato (antes de trocar o settings.json) continua legível
+        if not os.path.exists(caminho):
+            caminho = self._caminho_outro_formato(caminho)
+            if not os.path.exists(caminho):
+                return
+        try:
+            yield from iterar_registros_json(caminho)
         except json.JSONDecodeError:
-            raise RepositorioError("Arquivo de dados de adotantes corrompido.")
+            raise RepositorioError(f"Arquivo de dados de {descricao} corrompido.")
         except IOError as e:
-            raise RepositorioError(f"Erro ao ler arquivo de adotantes: {e}")
\ No newline at end of file
+            raise RepositorioError(f"Erro ao ler arquivo de {descricao}: {e}")
+
+    def carregar_dados(self):
+        """Gera os dados de animais (dicionários), um por vez."""
+        return self._iterar_arquivo(self.arquivo_animais, "animais")
+
+    def carregar_adocoes(self):
+        """Gera os dados de adoções (dicionários), um por vez."""
+        return self._iterar_arquivo(self.arquivo_adocoes, "adoções")
+
+    def carregar_adotantes(self):
+        """Gera os dados de adotantes (dicionários), um por vez."""
+        return self._iterar_arquivo(self.arquivo_adotantes, "adotantes")
+
+    def carregar_devolucoes(self):
+        """
+        Gera os dados de devoluções (dicionários), um por vez. Retorna None se a
+        base for anterior à coleção de devoluções (elas só existem no histórico).
+        """
+        caminho = self.arquivo_devolucoes
+        if not os.path.exists(caminho) and not os.path.exists(self._caminho_outro_formato(caminho)):
+            return None
+        return self._iterar_arquivo(caminho, "devoluções")
+
+
+class RepositorioSQLite:
+    """
+    Persistência em SQLite (stdlib), com tabelas normalizadas e índices.
+
+    Cada mutação registrada via `registrar` é aplicada na hora (write-through),
+    então o banco sempre reflete o estado atual e pode responder consultas
+    filtradas por status/espécie/porte sem carregar tudo em memória.
+    Reservas e filas de espera são sincronizadas em `salvar_dados`.
+    """
+    usa_journal = False
+    precisa_compactar = False
+
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS animais (
+            id INTEGER NOT NULL UNIQUE,
+            especie TEXT NOT NULL,
+            raca TEXT,
+            nome TEXT NOT NULL,
+            sexo TEXT,
+            idade_meses INTEGER,
+            porte TEXT,
+            temperamento TEXT,
+            status TEXT NOT NULL,
+            data_entrada TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_animais_status ON animais(status);
+        CREATE INDEX IF NOT EXISTS idx_animais_especie ON animais(especie);
+        CREATE INDEX IF NOT EXISTS idx_animais_porte ON animais(porte);
+        CREATE INDEX IF NOT EXISTS idx_animais_nome ON animais(nome);
+
+        CREATE TABLE IF NOT EXISTS eventos (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            animal_id INTEGER NOT NULL,
+            tipo TEXT NOT NULL,
+            descricao TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_eventos_animal ON eventos(animal_id);
+
+        CREATE TABLE IF NOT EXISTS adotantes (
+            id INTEGER NOT NULL UNIQUE,
+            nome TEXT NOT NULL,
+            idade INTEGER,
+            moradia TEXT,
+            area_util REAL,
+            outros_animais INTEGER,
+            experiencia_pets INTEGER,
+            possui_criancas INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_adotantes_nome ON adotantes(nome);
+
+        CREATE TABLE IF NOT EXISTS adocoes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            animal TEXT NOT NULL,
+            adotante TEXT NOT NULL,
+            data TEXT,
+            taxa REAL,
+            animal_id INTEGER,
+            adotante_id INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_adocoes_animal ON adocoes(animal);
+        CREATE INDEX IF NOT EXISTS idx_adocoes_adotante ON adocoes(adotante);
+
+        CREATE TABLE IF NOT EXISTS reservas (
+            animal_id INTEGER PRIMARY KEY,
+            adotante_id INTEGER NOT NULL,
+            data_reserva TEXT,
+            data_expiracao TEXT,
+            status TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS filas_espera (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            animal_id INTEGER NOT NULL,
+            adotante_id INTEGER NOT NULL,
+            score REAL,
+            data_entrada TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_filas_animal ON filas_espera(animal_id);
+
+        CREATE TABLE IF NOT EXISTS devolucoes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            animal_id INTEGER NOT NULL,
+            adotante_id INTEGER,
+            data TEXT NOT NULL,
+            motivo TEXT NOT NULL,
+            descricao TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_devolucoes_motivo ON devolucoes(motivo);
+        CREATE INDEX IF NOT EXISTS idx_devolucoes_animal ON devolucoes(animal_id);
+
+        CREATE TABLE IF NOT EXISTS agregados (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            dados TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS sequencias (
+            nome TEXT PRIMARY KEY,
+            proximo INTEGER NOT NULL
+        );
+    """
+
+    INSERIR_ANIMAL = ("INSERT INTO animais (id, especie, raca, nome, sexo, idade_meses, porte, temperamento, status, "
+                      "data_entrada) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+    def __init__(self, arquivo: str = None):
+        base_path = os.path.dirname(os.path.abspath(__file__))
+        self.arquivo = os.path.join(base_path, arquivo or "database.sqlite3")
+        try:
+            # A verificação periódica de reservas roda em outra thread (acesso serializado pelo SistemaAdocao)
+            self._conexao = sqlite3.connect(self.arquivo, check_same_thread=False)
+            tabelas = {linha[0] for linha in self._conexao.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            self._conexao.executescript(self.ESQUEMA)
+            self._atualizar_esquema()
+            if "animais" in tabelas and "devolucoes" not in tabelas:
+                self._migrar_devolucoes_do_historico()
+        except sqlite3.Error as e:
+            raise RepositorioError(f"Falha ao abrir banco SQLite: {e}")
+
+    def _atualizar_esquema(self):
+        """Bancos criados em versões anteriores ganham as colunas que faltam."""
+        colunas = {linha[1] for linha in self._conexao.execute("PRAGMA table_info(adocoes)")}
+        colunas_animais = {linha[1] for linha in self._conexao.execute("PRAGMA table_info(animais)")}
+        with self._conexao:
+            for coluna in ("animal_id", "adotante_id"):
+                if coluna not in colunas:
+                    self._conexao.execute(f"ALTER TABLE adocoes ADD COLUMN {coluna} INTEGER")
+            if "data_entrada" not in colunas_animais:
+                self._conexao.execute("ALTER TABLE animais ADD COLUMN data_entrada TEXT")
+
+    def _migrar_devolucoes_do_historico(self):
+        """Bancos anteriores à tabela de devoluções: cria os registros a partir dos eventos "Devolução"."""
+        linhas = []
+        for animal_id, descricao, data in self._conexao.execute(
+                "SELECT animal_id, descricao, data FROM eventos WHERE tipo = 'Devolução' ORDER BY seq").fetchall():
+            texto = (descricao or "").replace("Motivo: ", "")
+            # Quem devolveu: a última adoção do animal até a data da devolução
+            adocao = self._conexao.execute(
+                "SELECT adotante_id FROM adocoes WHERE animal_id = ? AND data <= ? ORDER BY data DESC, seq DESC LIMIT 1",
+                (animal_id, data)).fetchone()
+            linhas.append((animal_id, adocao[0] if adocao else None, data,
+                           MotivoDevolucao.de_texto_antigo(texto).value, texto))
+        with self._conexao:
+            self._conexao.executemany(
+                "INSERT INTO devolucoes (animal_id, adotante_id, data, motivo, descricao) VALUES (?, ?, ?, ?, ?)", linhas)
+
+    # --- Escrita ---
+    def salvar_dados(self, lista_animais, lista_adocoes, lista_adotantes, lista_devolucoes=(), agregados=None,
+                     sequencias=None):
+        """
+        Animais, adotantes e adoções (e as sequências de ids) já foram gravados via `registrar`; aqui
+        sincronizamos reservas, filas e os agregados dos relatórios.
+        """
+        try:
+            with self._conexao:
+                self._gravar_reservas_e_filas(lista_animais)
+                self._gravar_agregados(agregados)
+            print("💾 Dados salvos com sucesso!")
+        except sqlite3.Error as e:
+            raise RepositorioError(f"Falha ao salvar no SQLite: {e}")
+
+    def compactar(self, lista_animais, lista_adocoes, lista_adotantes, lista_devolucoes=(), agregados=None,
+                  sequencias=None):
+        """Reescreve o banco inteiro a partir dos objetos (usado também na migração)."""
+        try:
+            # Serializa antes de apagar: históricos ainda não lidos vêm deste próprio banco
+            dados_animais = [animal.to_dict() for animal in lista_animais]
+            with self._conexao:
+                for tabela in ("animais", "eventos", "adotantes", "adocoes", "devolucoes", "agregados"):
+                    self._conexao.execute(f"DELETE FROM {tabela}")
+                for dados in dados_animais:
+                    self._inserir_animal(dados)
+                self._conexao.executemany(
+                    "INSERT INTO adotantes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (self._linha_adotante(a.to_dict()) for a in lista_adotantes)
+                )
+                self._conexao.executemany(
+                    "INSERT INTO adocoes (animal, adotante, data, taxa, animal_id, adotante_id) VALUES (?, ?, ?, ?, ?, ?)",
+                    (self._linha_adocao(a.to_dict()) for a in lista_adocoes)
+                )
+                self._conexao.executemany(
+                    "INSERT INTO devolucoes (animal_id, adotante_id, data, motivo, descricao) VALUES (?, ?, ?, ?, ?)",
+                    (self._linha_devolucao(d.to_dict()) for d in lista_devolucoes)
+                )
+                self._gravar_reservas_e_filas(lista_animais)
+                self._gravar_agregados(agregados)
+                for nome, proximo in (sequencias or {}).items():
+                    self._avancar_sequencia(nome, proximo)
+            self._conexao.execute("VACUUM")
+        except sqlite3.Error as e:
+            raise RepositorioError(f"Falha ao gravar no SQLite: {e}")
+
+    def registrar(self, operacao: str, dados: dict):
+        """Aplica uma mutação diretamente no banco."""
+        try:
+            with self._conexao:
+                if operacao == "animal":
+                    self._inserir_animal(dados)
+                    self._avancar_sequencia("animal", dados['id'] + 1)
+                elif operacao == "adotante":
+                    self._conexao.execute("INSERT INTO adotantes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self._linha_adotante(dados))
+                    self._avancar_sequencia("adotante", dados['id'] + 1)
+                elif operacao == "adocao":
+                    self._conexao.execute("INSERT INTO adocoes (animal, adotante, data, taxa, animal_id, adotante_id) VALUES (?, ?, ?, ?, ?, ?)", self._linha_adocao(dados))
+                    self._invalidar_agregados()
+                elif operacao == "status":
+                    self._conexao.execute("UPDATE animais SET status = ? WHERE id = ?", (dados['status'], dados['id']))
+                    self._inserir_eventos(dados['id'], [dados['evento']])
+                elif operacao == "evento":
+                    self._inserir_eventos(dados['id'], [dados['evento']])
+                elif operacao == "devolucao":
+                    self._conexao.execute("INSERT INTO devolucoes (animal_id, adotante_id, data, motivo, descricao) VALUES (?, ?, ?, ?, ?)", self._linha_devolucao(dados))
+                    self._invalidar_agregados()
+        except sqlite3.Error as e:
+            raise RepositorioError(f"Falha ao registrar '{operacao}' no SQLite: {e}")
+
+    def registrar_lote(self, operacao: str, lista_dados: list):
+        """Cadastro ("animal", "adotante") ou mudança de status em massa numa única transação, com executemany."""
+        if not lista_dados:
+            return
+        try:
+            with self._conexao:
+                if operacao == "animal":
+                    self._conexao.executemany(self.INSERIR_ANIMAL, (self._linha_animal(d) for d in lista_dados))
+                    self._conexao.executemany(
+                        "INSERT INTO eventos (animal_id, tipo, descricao, data) VALUES (?, ?, ?, ?)",
+                        ((d['id'], e['tipo'], e['descricao'], e['data']) for d in lista_dados for e in d.get('historico', []))
+                    )
+                elif operacao == "adotante":
+                    self._conexao.executemany("INSERT INTO adotantes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                              (self._linha_adotante(d) for d in lista_dados))
+                elif operacao == "status":
+                    self._conexao.executemany("UPDATE animais SET status = ? WHERE id = ?",
+                                              ((d['status'], d['id']) for d in lista_dados))
+                    self._conexao.executemany(
+                        "INSERT INTO eventos (animal_id, tipo, descricao, data) VALUES (?, ?, ?, ?)",
+                        ((d['id'], d['evento']['tipo'], d['evento']['descricao'], d['evento']['data']) for d in lista_dados)
+                    )
+                else:
+                    raise RepositorioError(f"Operação '{operacao}' não suportada em lote.")
+                if operacao != "status":
+                    self._avancar_sequencia(operacao, max(d['id'] for d in lista_dados) + 1)
+        except sqlite3.Error as e:
+            raise RepositorioError(f"Falha ao registrar lote de '{operacao}' no SQLite: {e}")
+
+    def _avancar_sequencia(self, nome, proximo):
+        # Só avança: um id já entregue nunca volta a ser usado
+        self._conexao.execute(
+            "INSERT INTO sequencias (nome, proximo) VALUES (?, ?) "
+            "ON CONFLICT(nome) DO UPDATE SET proximo = MAX(proximo, excluded.proximo)", (nome, proximo))
+
+    def _gravar_agregados(self, agregados):
+        if agregados is not None:
+            self._conexao.execute("INSERT OR REPLACE INTO agregados (id, dados) VALUES (1, ?)",
+                                  (json.dumps(agregados.to_dict(), ensure_ascii=False),))
+
+    def _invalidar_agregados(self):
+        # A mutação já está no banco e os agregados só são regravados no salvamento:
+        # se o programa cair antes disso, a próxima carga os recalcula
+        self._conexao.execute("DELETE FROM agregados")
+
+    def _inserir_animal(self, dados):
+        self._conexao.execute(self.INSERIR_ANIMAL, self._linha_animal(dados))
+        self._inserir_eventos(dados['id'], dados.get('historico', []))
+
+    @staticmethod
+    def _linha_animal(dados):
+        return (dados['id'], dados['especie'], dados.get('raca'), dados['nome'], dados.get('sexo'),
+                dados.get('idade_meses'), dados.get('porte'),
+                json.dumps(dados.get('temperamento', []), ensure_ascii=False), dados['status'], dados.get('data_entrada'))
+
+    def _inserir_eventos(self, animal_id, eventos):
+        self._conexao.executemany(
+            "INSERT INTO eventos (animal_id, tipo, descricao, data) VALUES (?, ?, ?, ?)",
+            ((animal_id, e['tipo'], e['descricao'], e['data']) for e in eventos)
+        )
+
+    def _gravar_reservas_e_filas(self, lista_animais):
+        self._conexao.execute("DELETE FROM reservas")
+        self._conexao.execute("DELETE FROM filas_espera")
+        for animal in lista_animais:
+            reserva = animal.reserva_ativa
+            if reserva:
+                self._conexao.execute(
+                    "INSERT INTO reservas VALUES (?, ?, ?, ?, ?)",
+                    (animal.id, reserva.adotante.id, reserva.data_reserva.isoformat(),
+                     reserva.data_expiracao.isoformat(), reserva.status)
+                )
+            if animal.possui_fila_espera:
+                self._conexao.executemany(
+                    "INSERT INTO filas_espera (animal_id, adotante_id, score, data_entrada) VALUES (?, ?, ?, ?)",
+                    ((animal.id, c['adotante'].id, c['score'], c['data_entrada'].isoformat()) for c in animal.fila_espera)
+                )
+
+    @staticmethod
+    def _linha_adotante(dados):
+        return (dados['id'], dados['nome'], dados['idade'], dados['moradia'], dados['area_util'],
+                dados['outros_animais'], dados['experiencia_pets'], dados['possui_criancas'])
+
+    @staticmethod
+    def _linha_devolucao(dados):
+        return (dados['animal_id'], dados.get('adotante_id'), dados['data'], dados['motivo'], dados.get('descricao'))
+
+    @staticmethod
+    def _linha_adocao(dados):
+        return (dados['animal'], dados['adotante'], dados.get('data'), dados.get('taxa'),
+                dados.get('animal_id'), dados.get('adotante_id'))
+
+    # --- Leitura ---
+    def carregar_dados(self):
+        """
+        Carrega os animais (com reserva e fila de espera) como dicionários.
+        O histórico fica no banco e é lido por `carregar_historico` quando usado.
+        """
+        try:
+            reservas = {}
+            for animal_id, adotante_id, data_reserva, data_expiracao, status in self._conexao.execute(
+                    "SELECT animal_id, adotante_id, data_reserva, data_expiracao, status FROM reservas"):
+                reservas[animal_id] = {"adotante_id": adotante_id, "data_reserva": data_reserva,
+                                       "data_expiracao": data_expiracao, "status": status}
+
+            filas = {}
+            for animal_id, adotante_id, score, data_entrada in self._conexao.execute(
+                    "SELECT animal_id, adotante_id, score, data_entrada FROM filas_espera ORDER BY seq"):
+                filas.setdefault(animal_id, []).append({"adotante_id": adotante_id, "score": score, "data_entrada": data_entrada})
+
+            dados = []
+            for linha in self._conexao.execute(
+                    "SELECT id, especie, raca, nome, sexo, idade_meses, porte, temperamento, status, data_entrada "
+                    "FROM animais ORDER BY rowid"):
+                item = {
+                    "id": linha[0], "especie": linha[1], "raca": linha[2], "nome": linha[3], "sexo": linha[4],
+                    "idade_meses": linha[5], "porte": linha[6], "temperamento": json.loads(linha[7] or "[]"),
+                    "status": linha[8], "data_entrada": linha[9]
+                }
+                if linha[0] in reservas:
+                    item["reserva"] = reservas[linha[0]]
+                if linha[0] in filas:
+                    item["fila_espera"] = filas[linha[0]]
+                dados.append(item)
+            return dados
+        except sqlite3.Error as e:
+            raise RepositorioError(f"Erro ao ler animais do SQLite: {e}")
+
+    def trava(self, compartilhada: bool = False):
+        """O SQLite já coordena leitores e escritores com as próprias travas."""
+        return contextlib.nullcontext()
+
+    def carregar_snapshot_binario(self):
+        return None
+
+    def carregar_agregados(self):
+        try:
+            linha = self._conexao.execute("SELECT dados FROM agregados WHERE id = 1").fetchone()
+        except sqlite3.Error as e:
+            raise RepositorioError(f"Erro ao ler agregados do SQLite: {e}")
+        return json.loads(linha[0]) if linha else None
+
+    def carregar_sequencias(self):
+        try:
+            return dict(self._conexao.execute("SELECT nome, proximo FROM sequencias"))
+        except sqlite3.Error as e:
+            raise RepositorioError(f"Erro ao ler sequências do SQLite: {e}")
+
+    def carregar_historico(self, animal_id):
+        """Eventos de um único animal, em ordem (usa o índice idx_eventos_animal)."""
+        try:
+            return [{"tipo": tipo, "descricao": descricao, "data": data}
+                    for tipo, descricao, data in self._conexao.execute(
+                        "SELECT tipo, descricao, data FROM eventos WHERE animal_id = ? ORDER BY seq", (animal_id,))]
+        except sqlite3.Error as e:
+            raise RepositorioError(f"Erro ao ler histórico do animal {animal_id} no SQLite: {e}")
+
+    def iterar_historicos(self, ids=None):
+        """Gera (id do animal, eventos em dicionário) numa única consulta, animal por animal."""
+        try:
+            cursor = self._conexao.execute("SELECT animal_id, tipo, descricao, data FROM eventos ORDER BY animal_id, seq")
+            for animal_id, linhas in itertools.groupby(cursor, key=lambda linha: linha[0]):
+                if ids is None or animal_id in ids:
+                    yield animal_id, [{"tipo": tipo, "descricao": descricao, "data": data} for _, tipo, descricao, data in linhas]
+        except sqlite3.Error as e:
+            raise RepositorioError(f"Erro ao ler históricos do SQLite: {e}")
+
+    def carregar_adocoes(self):
+        try:
+            return [{"animal": animal, "adotante": adotante, "data": data, "taxa": taxa,
+                     "animal_id": animal_id, "adotante_id": adotante_id}
+                    for animal, adotante, data, taxa, animal_id, adotante_id in self._conexao.execute(
+                        "SELECT animal, adotante, data, taxa, animal_id, adotante_id FROM adocoes ORDER BY seq")]
+        except sqlite3.Error as e:
+            raise RepositorioError(f"Erro ao ler adoções do SQLite: {e}")
+
+    def carregar_adotantes(self):
+        try:
+            return [{"id": l[0], "nome": l[1], "idade": l[2], "moradia": l[3], "area_util": l[4],
+                     "outros_animais": bool(l[5]), "experiencia_pets": bool(l[6]), "possui_criancas": bool(l[7])}
+                    for l in self._conexao.execute("SELECT * FROM adotantes ORDER BY rowid")]
+        except sqlite3.Error as e:
+            raise RepositorioError(f"Erro ao ler adotantes do SQLite: {e}")
+
+    def carregar_devolucoes(self):
+        try:
+            return [{"animal_id": l[0], "adotante_id": l[1], "data": l[2], "motivo": l[3], "descricao": l[4]}
+                    for l in self._conexao.execute(
+                        "SELECT animal_id, adotante_id, data, motivo, descricao FROM devolucoes ORDER BY seq")]
+        except sqlite3.Error as e:
+            raise RepositorioError(f"Erro ao ler devoluções do SQLite: {e}")
+
+    def carregar_journal(self):
+        return []
+
+    def consultar_animais(self, status: str = None, especie: str = None, porte: str = None):
+        """Retorna os ids dos animais que atendem aos filtros, na ordem de cadastro (usa os índices)."""
+        filtros, parametros = [], []
+        for coluna, valor in (("status", status), ("especie", especie), ("porte", porte)):
+            if valor is not None:
+                filtros.append(f"{coluna} = ?")
+                parametros.append(valor)
+        sql = "SELECT id FROM animais"
+        if filtros:
+            sql += " WHERE " + " AND ".join(filtros)
+        try:
+            return [linha[0] for linha in self._conexao.execute(sql + " ORDER BY rowid", parametros)]
+        except sqlite3.Error as e:
+            raise RepositorioError(f"Erro na consulta ao SQLite: {e}")
+
+    def fechar(self):
+        self._conexao.commit()
+
+
+def criar_repositorio(persistencia: dict = None, backend: str = None):
+    """Fábrica usada pelo SistemaAdocao: escolhe o backend a partir do bloco 'persistencia' do settings.json."""
+    persistencia = persistencia or {}
+    backend = backend or persistencia.get('backend', 'json')
+    if backend == "sqlite":
+        return RepositorioSQLite(persistencia.get('arquivo_sqlite'))
+    if backend == "json":
+        return Repositorio(
+            modo=persistencia.get('modo', 'json'),
+            compactar_apos=persistencia.get('compactar_apos', 1000),
+            formato=persistencia.get('formato', 'json'),
+            snapshot_binario=persistencia.get('snapshot_binario', False),
+            catalogo_relatorios=persistencia.get('catalogo_relatorios', False)
+        )
+    raise RepositorioError(f"Backend de persistência desconhecido: '{backend}'.")
@@ -0,0 +1,249 @@
+"""
+Snapshot binário da base, usado para acelerar a inicialização.
+
+Layout (little-endian):
+
+    cabeçalho  mágico "POOPETSB", versão, contagens, geração e CRC32 do corpo
+    corpo      seções com prefixo de tamanho (uint64), nesta ordem:
+               - tabela de strings: UTF-8 separado por '\\0' (espécie, raça,
+                 porte, status, nomes, datas... cada valor distinto aparece uma vez)
+               - combinações de temperamento: tamanhos + índices na tabela
+               - colunas dos animais, dos adotantes e das adoções (array.array)
+
+Campos fixos viram colunas de inteiros/floats, e textos viram índices na tabela
+de strings, então a leitura é um punhado de `frombytes` em vez de um
+`json.loads` por registro. Valores que o formato não representa (tipos
+inesperados, '\\0' em texto) fazem `serializar` levantar ValueError; nesse caso
+o Repositorio continua só com o JSON.
+"""
+import struct
+import sys
+import zlib
+from array import array
+
+from compatibilidade import mascara_temperamento
+
+MAGICO = b"POOPETSB"
+VERSAO = 2 # 2: coluna data_entrada (ordinal do date)
+CABECALHO = struct.Struct("<8sHHIIIQI") # mágico, versão, reservado, animais, adotantes, adoções, geração, crc32
+TAMANHO_SECAO = struct.Struct("<Q")
+
+NULO = -1 # Índice de string ausente (None)
+INTEIRO_NULO = -(1 << 63) # Inteiro ausente (None)
+
+# Bits da coluna de flags dos adotantes
+OUTROS_ANIMAIS = 1
+EXPERIENCIA_PETS = 2
+POSSUI_CRIANCAS = 4
+AREA_INTEIRA = 8 # area_util era int (mantém o tipo na volta)
+
+# Bits da coluna de flags das adoções
+TAXA_INTEIRA = 1
+
+_TROCAR_BYTES = sys.byteorder != "little"
+
+
+class SnapshotBinario:
+    """
+    Conteúdo decodificado: a tabela de strings e as colunas como listas Python.
+    Colunas de texto guardam índices em `strings` (`strings[-1]` é None, então o
+    índice NULO resolve direto para None); as demais já vêm com os valores
+    finais (None, int/float e bool restaurados).
+    """
+    __slots__ = ('geracao', 'strings', 'temperamentos', 'animais', 'adotantes', 'adocoes')
+
+    def __init__(self, geracao, strings, temperamentos, animais, adotantes, adocoes):
+        self.geracao = geracao
+        self.strings = strings
+        self.temperamentos = temperamentos # Lista de (temperamento, máscara)
+        self.animais = animais # Dicionário coluna -> lista
+        self.adotantes = adotantes
+        self.adocoes = adocoes
+
+
+class _TabelaStrings:
+    def __init__(self):
+        self.indices = {}
+        self.valores = []
+
+    def indice(self, texto):
+        if texto is None:
+            return NULO
+        indice = self.indices.get(texto)
+        if indice is None:
+            if not isinstance(texto, str) or "\0" in texto:
+                raise ValueError(f"Texto não suportado no snapshot binário: {texto!r}")
+            indice = self.indices[texto] = len(self.valores)
+            self.valores.append(texto)
+        return indice
+
+
+def _inteiro(valor):
+    if valor is None:
+        return INTEIRO_NULO
+    if type(valor) is not int:
+        raise ValueError(f"Inteiro esperado no snapshot binário: {valor!r}")
+    return valor
+
+
+def _coluna(tipo, valores):
+    try:
+        coluna = array(tipo, valores)
+    except (OverflowError, TypeError) as e:
+        raise ValueError(f"Valor fora do formato do snapshot binário: {e}")
+    if _TROCAR_BYTES:
+        coluna.byteswap()
+    return coluna.tobytes()
+
+
+def serializar(animais, adotantes, adocoes, geracao: int) -> bytes:
+    """Monta o snapshot inteiro em memória. Levanta ValueError se algo não couber no formato."""
+    strings = _TabelaStrings()
+    combinacoes = {} # tuple(temperamento) -> índice
+
+    def combinacao(temperamento):
+        chave = tuple(temperamento)
+        if not all(isinstance(t, str) for t in chave):
+            raise ValueError(f"Temperamento não suportado no snapshot binário: {temperamento!r}")
+        indice = combinacoes.get(chave)
+        if indice is None:
+            indice = combinacoes[chave] = len(combinacoes)
+        return indice
+
+    col_animais = (
+        ('q', [_inteiro(a.id) for a in animais]),
+        ('i', [strings.indice(a.especie) for a in animais]),
+        ('i', [strings.indice(a.raca) for a in animais]),
+        ('i', [strings.indice(a.nome) for a in animais]),
+        ('i', [strings.indice(a.sexo) for a in animais]),
+        ('q', [_inteiro(a.idade_meses) for a in animais]),
+        ('i', [strings.indice(a.porte) for a in animais]),
+        ('I', [combinacao(a.temperamento) for a in animais]),
+        ('i', [strings.indice(a.status) for a in animais]),
+        ('i', [a.data_entrada.toordinal() if a.data_entrada else 0 for a in animais]),
+    )
+
+    tamanhos, itens = [], []
+    for temperamento in combinacoes: # dict preserva a ordem de inserção = ordem dos índices
+        tamanhos.append(len(temperamento))
+        itens.extend(strings.indice(t) for t in temperamento)
+
+    flags_adotantes = []
+    for a in adotantes:
+        flags = (OUTROS_ANIMAIS if a.outros_animais else 0) | (EXPERIENCIA_PETS if a.experiencia_pets else 0) \
+                | (POSSUI_CRIANCAS if a.possui_criancas else 0) | (AREA_INTEIRA if type(a.area_util) is int else 0)
+        flags_adotantes.append(flags)
+    col_adotantes = (
+        ('q', [_inteiro(a.id) for a in adotantes]),
+        ('i', [strings.indice(a.nome) for a in adotantes]),
+        ('q', [_inteiro(a.idade) for a in adotantes]),
+        ('i', [strings.indice(a.moradia) for a in adotantes]),
+        ('d', [a.area_util for a in adotantes]),
+        ('B', flags_adotantes),
+    )
+
+    col_adocoes = (
+        ('i', [strings.indice(a.animal.nome) for a in adocoes]),
+        ('q', [_inteiro(a.animal.id) for a in adocoes]),
+        ('i', [strings.indice(a.adotante.nome) for a in adocoes]),
+        ('q', [_inteiro(a.adotante.id) for a in adocoes]),
+        ('i', [strings.indice(a.data_adocao.isoformat()) for a in adocoes]),
+        ('d', [a.taxa for a in adocoes]),
+        ('B', [TAXA_INTEIRA if type(a.taxa) is int else 0 for a in adocoes]),
+    )
+
+    secoes = ["\0".join(strings.valores).encode('utf-8'), _coluna('I', tamanhos), _coluna('i', itens)]
+    for tipo, valores in col_animais + col_adotantes + col_adocoes:
+        secoes.append(_coluna(tipo, valores))
+
+    corpo = b"".join(TAMANHO_SECAO.pack(len(s)) + s for s in secoes)
+    cabecalho = CABECALHO.pack(MAGICO, VERSAO, 0, len(animais), len(adotantes), len(adocoes),
+                               geracao, zlib.crc32(corpo))
+    return cabecalho + corpo
+
+
+def _ler_secoes(corpo):
+    secoes, pos = [], 0
+    while pos < len(corpo):
+        (tamanho,) = TAMANHO_SECAO.unpack_from(corpo, pos)
+        pos += TAMANHO_SECAO.size
+        secoes.append(corpo[pos:pos + tamanho])
+        pos += tamanho
+    return secoes
+
+
+def _lista(tipo, dados):
+    coluna = array(tipo)
+    coluna.frombytes(dados)
+    if _TROCAR_BYTES:
+        coluna.byteswap()
+    return coluna.tolist()
+
+
+def _restaurar_nulos(valores):
+    if INTEIRO_NULO in valores: # Varredura em C; o caso comum não tem nulos
+        return [None if v == INTEIRO_NULO else v for v in valores]
+    return valores
+
+
+def _restaurar_inteiros(valores, flags, bit):
+    return [int(v) if f & bit else v for v, f in zip(valores, flags)]
+
+
+def ler(caminho: str, geracao_esperada: int = None) -> SnapshotBinario:
+    """
+    Lê e valida o snapshot. Levanta ValueError se o arquivo não for desta
+    versão, não bater com o CRC32 ou não for da geração esperada.
+    """
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+    if len(dados) < CABECALHO.size:
+        raise ValueError("Snapshot binário truncado.")
+
+    magico, versao, _, n_animais, n_adotantes, n_adocoes, geracao, crc = CABECALHO.unpack_from(dados)
+    if magico != MAGICO or versao != VERSAO:
+        raise ValueError("Snapshot binário de outro formato ou versão.")
+    if geracao_esperada is not None and geracao != geracao_esperada:
+        raise ValueError("Snapshot binário desatualizado em relação ao JSON.")
+    corpo = memoryview(dados)[CABECALHO.size:]
+    if zlib.crc32(corpo) != crc:
+        raise ValueError("Checksum do snapshot binário não confere.")
+
+    secoes = _ler_secoes(corpo)
+    if len(secoes) != 3 + 10 + 6 + 7:
+        raise ValueError("Snapshot binário com seções faltando.")
+
+    strings = bytes(secoes[0]).decode('utf-8').split("\0")
+    strings.append(None) # NULO (-1)
+    temperamentos, pos = [], 0
+    itens = _lista('i', secoes[2])
+    for tamanho in _lista('I', secoes[1]):
+        temperamento = [strings[i] for i in itens[pos:pos + tamanho]]
+        temperamentos.append((temperamento, mascara_temperamento(temperamento)))
+        pos += tamanho
+
+    def colunas(nomes, tipos, inicio, quantidade):
+        resultado = {}
+        for deslocamento, (nome, tipo) in enumerate(zip(nomes, tipos)):
+            resultado[nome] = _lista(tipo, secoes[inicio + deslocamento])
+            if len(resultado[nome]) != quantidade:
+                raise ValueError(f"Coluna '{nome}' com tamanho inconsistente no snapshot binário.")
+        return resultado
+
+    animais = colunas(("id", "especie", "raca", "nome", "sexo", "idade_meses", "porte", "temperamento", "status",
+                       "data_entrada"), "qiiiiqiIii", 3, n_animais)
+    adotantes = colunas(("id", "nome", "idade", "moradia", "area_util", "flags"), "qiqidB", 13, n_adotantes)
+    adocoes = colunas(("animal", "animal_id", "adotante", "adotante_id", "data", "taxa", "flags"),
+                      "iqiqidB", 19, n_adocoes)
+
+    for coluna in (animais, adotantes, adocoes):
+        for nome in ("id", "idade_meses", "idade", "animal_id", "adotante_id"):
+            if nome in coluna:
+                coluna[nome] = _restaurar_nulos(coluna[nome])
+    flags = adotantes.pop("flags")
+    adotantes["area_util"] = _restaurar_inteiros(adotantes["area_util"], flags, AREA_INTEIRA)
+    adotantes["outros_animais"] = [bool(f & OUTROS_ANIMAIS) for f in flags]
+    adotantes["experiencia_pets"] = [bool(f & EXPERIENCIA_PETS) for f in flags]
+    adotantes["possui_criancas"] = [bool(f & POSSUI_CRIANCAS) for f in flags]
+    adocoes["taxa"] = _restaurar_inteiros(adocoes["taxa"], adocoes.pop("flags"), TAXA_INTEIRA)
+    return SnapshotBinario(geracao, strings, temperamentos, animais, adotantes, adocoes)
@@ -0,0 +1,107 @@
+import os
+import random
+import sys
+
+import pytest
+
+# Os módulos do projeto ficam na raiz do repositório (sem pacote)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logic import SistemaAdocao
+from models import Adotante, Cachorro
+from repository import Repositorio, RepositorioSQLite
+
+TEMPERAMENTOS = ["Dócil", "Calmo", "Agitado", "Bravo", "Brincalhão", "Carinhoso", "Arisco"]
+MORADIAS = ["Casa", "Apartamento", "Sítio"]
+
+# Pesos padrão, os do settings.json e pesos fracionários (a soma em float depende da ordem)
+CONFIGURACOES = [
+    {},
+    {"pesos_compatibilidade": {"moradia_casa": 30, "moradia_apto_pequeno": -20, "experiencia": 15}},
+    {"pesos_compatibilidade": {"moradia_casa": 12.5, "moradia_apto_pequeno": -7.3, "experiencia": 0.1}},
+]
+
+
+def perfis(n_animais, n_adotantes, semente):
+    """Animais e adotantes aleatórios, com os valores de fronteira das regras entre as opções."""
+    aleatorio = random.Random(semente)
+    animais = [Cachorro(i, "SRD", f"C{i}", "M", aleatorio.choice([0, 23, 24, 60, 61, 120]), aleatorio.choice("PMG"),
+                        aleatorio.sample(TEMPERAMENTOS, aleatorio.randint(0, 3)) + aleatorio.choice([[], ["Raivoso"]]),
+                        True)
+               for i in range(n_animais)]
+    adotantes = [Adotante(i, f"A{i}", aleatorio.choice([18, 60, 61, 80]), aleatorio.choice(MORADIAS + ["APARTAMENTO"]),
+                          aleatorio.choice([30.0, 49.5, 50.0, 120.0]), False, aleatorio.random() < 0.5,
+                          aleatorio.random() < 0.5)
+                 for i in range(n_adotantes)]
+    return animais, adotantes
+
+
+@pytest.fixture
+def repo_json(tmp_path):
+    """Fábrica de Repositorio na pasta temporária do teste (mesma pasta a cada chamada)."""
+    def criar(**opcoes):
+        return Repositorio(pasta=str(tmp_path), **opcoes)
+    return criar
+
+
+@pytest.fixture
+def repo_sqlite(tmp_path):
+    def criar(nome="database.sqlite3"):
+        return RepositorioSQLite(str(tmp_path / nome))
+    return criar
+
+
+def popular(sistema, n_animais, n_adotantes, semente=0):
+    """Cadastra animais e adotantes aleatórios (reprodutíveis pela semente)."""
+    aleatorio = random.Random(semente)
+    for i in range(n_animais):
+        sistema.cadastrar_animal(aleatorio.choice(["CACHORRO", "GATO"]), f"Animal {i}", idade=aleatorio.randint(0, 120),
+                                 porte=aleatorio.choice("PMG"),
+                                 temperamento=aleatorio.sample(TEMPERAMENTOS, aleatorio.randint(0, 2)))
+    for i in range(n_adotantes):
+        sistema.cadastrar_adotante(f"Adotante {i}", aleatorio.randint(16, 80), aleatorio.choice(MORADIAS),
+                                   float(aleatorio.choice([30, 45, 60, 80, 120])), aleatorio.random() < 0.3,
+                                   aleatorio.random() < 0.5, aleatorio.random() < 0.4)
+    return sistema
+
+
+@pytest.fixture
+def sistema(repo_json):
+    return SistemaAdocao(repo=repo_json())
+
+
+def movimentar(sistema, n_operacoes, semente=0):
+    """
+    Aplica uma sequência aleatória (reprodutível) de reservas, adoções,
+    devoluções, mudanças de status, vacinas e treinos sobre uma base já populada.
+    """
+    aleatorio = random.Random(semente)
+    for _ in range(n_operacoes):
+        animal = aleatorio.choice(sistema.animais)
+        adotante = aleatorio.choice(sistema.adotantes)
+        operacao = aleatorio.random()
+        if operacao < 0.3:
+            sistema.efetuar_adocao(adotante, animal)
+        elif operacao < 0.45:
+            sistema.efetuar_reserva(adotante, animal)
+        elif operacao < 0.6:
+            sistema.efetuar_devolucao(animal, aleatorio.choice(["SAUDE", "ALERGIA", "MUDANCA"]))
+        elif operacao < 0.75:
+            sistema.mudar_status_em_lote([animal], aleatorio.choice(["DISPONIVEL", "QUARENTENA", "INADOTAVEL"]))
+        elif operacao < 0.9:
+            sistema.vacinar_animal(animal, aleatorio.choice(["V10", "Raiva"]))
+        else:
+            sistema.treinar_animal(animal)
+    return sistema
+
+
+def estado(sistema):
+    """Tudo o que a persistência precisa reproduzir, em estruturas comparáveis com ==."""
+    return {
+        "animais": [animal.to_dict() for animal in sistema.animais],
+        "adotantes": [adotante.to_dict() for adotante in sistema.adotantes],
+        "adocoes": [adocao.to_dict() for adocao in sistema.adocoes],
+        "devolucoes": [devolucao.to_dict() for devolucao in sistema.devolucoes],
+        "agregados": sistema.agregados.to_dict(),
+        "proximos_ids": dict(sistema._proximos_ids),
+    }
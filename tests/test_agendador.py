@@ -0,0 +1,59 @@
+import random
+from datetime import datetime, timedelta
+
+from agendador import AgendadorExpiracoes
+from models import Gato, Reserva
+
+
+def test_vencidas_iguais_a_varredura():
+    aleatorio = random.Random(8)
+    inicio = datetime(2025, 1, 1)
+    animais = [Gato(i, "SRD", f"Gato {i}", "F", 12, "P", [], True) for i in range(60)]
+    agendador = AgendadorExpiracoes()
+    for animal in animais:
+        for _ in range(aleatorio.randint(1, 3)): # Reservas trocadas: só a última vale
+            animal.reserva_ativa = Reserva(animal, None, inicio, inicio + timedelta(hours=aleatorio.randint(1, 96)))
+            agendador.agendar(animal.reserva_ativa)
+        if aleatorio.random() < 0.2:
+            animal.reserva_ativa.status = "CANCELADA"
+        elif aleatorio.random() < 0.1:
+            animal.reserva_ativa = None # Adotado antes de vencer
+
+    pendentes = {id(a.reserva_ativa): a.reserva_ativa for a in animais
+                 if a.reserva_ativa and a.reserva_ativa.status == "ATIVA"}
+    for horas in range(0, 100, 7):
+        agora = inicio + timedelta(hours=horas)
+        # A varredura antiga: toda reserva ativa com prazo vencido
+        esperadas = sorted((r for r in pendentes.values() if r.verificar_expiracao(agora)),
+                           key=lambda r: r.data_expiracao)
+        vencidas = agendador.vencidas(agora)
+        assert [r.data_expiracao for r in vencidas] == [r.data_expiracao for r in esperadas]
+        assert {id(r) for r in vencidas} == {id(r) for r in esperadas}
+        for reserva in vencidas:
+            del pendentes[id(reserva)]
+
+        proxima = agendador.proxima()
+        if pendentes:
+            assert proxima.data_expiracao == min(r.data_expiracao for r in pendentes.values())
+        else:
+            assert proxima is None
+
+
+def test_expiracao_passa_para_o_primeiro_da_fila(sistema):
+    ana = sistema.cadastrar_adotante("Ana", 30, "Casa", 100.0, False, True, False)
+    bia = sistema.cadastrar_adotante("Bia", 30, "Apartamento", 40.0, False, False, True)
+    caio = sistema.cadastrar_adotante("Caio", 30, "Casa", 100.0, False, True, False)
+    mia = sistema.cadastrar_animal("GATO", "Mia")
+    rex = sistema.cadastrar_animal("CACHORRO", "Rex")
+    # Índice 1 é Rex entre os disponíveis e, depois de reservado, na lista geral
+    for indice_adotante in range(3):
+        sistema.reservar_animal(indice_adotante, 1)
+    sistema.reservar_animal(1, 0)
+
+    assert sistema._processar_vencidas(datetime.now()) == []
+    sistema._processar_vencidas(datetime.now() + timedelta(hours=sistema.config.get('reserva_horas', 48) + 1))
+    # Rex vai para o melhor da fila: Caio pontua mais que Bia, embora tenha entrado depois
+    assert (rex.status, rex.reserva_ativa.adotante) == ("RESERVADO", caio)
+    assert [c["adotante"] for c in rex.fila_espera] == [bia]
+    assert (mia.status, mia.reserva_ativa) == ("DISPONIVEL", None)
+    assert sistema.listar_animais_por_status("RESERVADO") == [rex]
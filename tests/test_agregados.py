@@ -0,0 +1,58 @@
+import pytest
+
+from conftest import movimentar, popular
+from logic import SistemaAdocao
+from models import AgregadosRelatorio, Relatorios
+
+
+def relatorios_completos(sistema):
+    """Os três relatórios por varredura completa, como eram antes dos agregados."""
+    return {"tempo_medio": Relatorios.tempo_medio_adocao(sistema.adocoes),
+            "taxa_tipo": Relatorios.taxa_adocoes_por_tipo(sistema.adocoes),
+            "devolucoes": Relatorios.devolucoes_por_motivo(sistema.devolucoes)}
+
+
+def relatorios_agregados(sistema):
+    agregados = sistema.agregados
+    return {"tempo_medio": agregados.tempo_medio_adocao(), "taxa_tipo": agregados.taxa_adocoes_por_tipo(),
+            "devolucoes": agregados.devolucoes_por_motivo()}
+
+
+def test_agregados_incrementais_iguais_a_varredura(sistema):
+    popular(sistema, 40, 12, semente=23)
+    assert sistema.agregados.total_adocoes == 0 # Calculados já: daqui em diante só incrementos
+    movimentar(sistema, 300, semente=23)
+    assert sistema.adocoes and sistema.devolucoes
+    assert sistema.agregados.conferir(sistema.adocoes, sistema.devolucoes) == []
+    assert relatorios_agregados(sistema) == relatorios_completos(sistema)
+    relatorios = sistema.gerar_relatorios(processos=1, verificar=True)
+    assert {chave: relatorios[chave] for chave in ("tempo_medio", "taxa_tipo", "devolucoes")} == \
+        relatorios_completos(sistema)
+
+
+@pytest.mark.parametrize("modo", ["json", "journal"])
+def test_agregados_salvos_e_completados_pelo_journal(repo_json, modo):
+    sistema = popular(SistemaAdocao(repo=repo_json(modo=modo, compactar_apos=10_000)), 40, 12, semente=24)
+    sistema.gerar_relatorios(processos=1) # Os agregados passam a existir (e a ser salvos)
+    movimentar(sistema, 150, semente=24)
+    sistema.salvar_dados() # No modo journal grava só os agregados, com quantos registros já contam
+    movimentar(sistema, 150, semente=25)
+    if modo == "journal":
+        sistema.repo.fechar() # Registros depois dos agregados: a carga os soma por cima
+    else:
+        sistema.salvar_dados()
+
+    recarregado = SistemaAdocao(repo=repo_json(modo=modo, compactar_apos=10_000))
+    assert recarregado._agregados is not None # Vieram do arquivo, sem varredura
+    assert recarregado.agregados.to_dict() == \
+        AgregadosRelatorio.calcular(recarregado.adocoes, recarregado.devolucoes).to_dict()
+    assert relatorios_agregados(recarregado) == relatorios_completos(sistema)
+
+
+def test_agregados_divergentes_sao_recalculados(sistema, capsys):
+    popular(sistema, 20, 8, semente=26)
+    movimentar(sistema, 150, semente=26)
+    sistema.agregados.soma_dias += 5
+    assert sistema.verificar_agregados() == ["tempo_medio"]
+    assert "divergentes" in capsys.readouterr().out
+    assert relatorios_agregados(sistema) == relatorios_completos(sistema)
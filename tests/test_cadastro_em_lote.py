@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from conftest import MORADIAS, TEMPERAMENTOS
+from logic import SistemaAdocao
+from repository import Repositorio, RepositorioSQLite
+
+
+def registros(semente):
+    aleatorio = random.Random(semente)
+    animais = [{"tipo": aleatorio.choice(["CACHORRO", "GATO"]), "nome": f"Animal {i}", "idade": aleatorio.randint(0, 120),
+                "porte": aleatorio.choice("PMG"), "especial": aleatorio.random() < 0.1,
+                "temperamento": aleatorio.sample(TEMPERAMENTOS, 2)} for i in range(60)]
+    adotantes = [{"nome": f"Adotante {i}", "idade": aleatorio.randint(18, 80), "moradia": aleatorio.choice(MORADIAS),
+                  "area_util": float(aleatorio.choice([30, 80])), "outros_animais": False,
+                  "experiencia_pets": aleatorio.random() < 0.5, "possui_criancas": aleatorio.random() < 0.5}
+                 for i in range(25)]
+    return animais, adotantes
+
+
+def resumo(sistema):
+    """Estado comparável entre os dois caminhos (as datas de cadastro diferem)."""
+    animais = [{k: v for k, v in a.to_dict().items() if k != "data_entrada"} for a in sistema.animais]
+    for animal in animais:
+        animal["historico"] = [(e["tipo"], e["descricao"]) for e in animal["historico"]]
+    return (animais, [a.to_dict() for a in sistema.adotantes], dict(sistema._proximos_ids),
+            [a.id for a in sistema.listar_animais_disponiveis()])
+
+
+@pytest.mark.parametrize("backend", ["json", "journal", "sqlite"])
+def test_lote_igual_a_um_por_um(backend, tmp_path):
+    def criar(nome):
+        if backend == "sqlite":
+            return SistemaAdocao(repo=RepositorioSQLite(str(tmp_path / f"{nome}.sqlite3")))
+        (tmp_path / nome).mkdir(exist_ok=True)
+        return SistemaAdocao(repo=Repositorio(modo=backend, pasta=str(tmp_path / nome)))
+
+    animais, adotantes = registros(28)
+    individual, em_lote = criar("individual"), criar("lote")
+    for dados in animais:
+        dados = dict(dados)
+        individual.cadastrar_animal(dados.pop("tipo"), dados.pop("nome"), **dados)
+    for dados in adotantes:
+        individual.cadastrar_adotante(**dados)
+    em_lote.cadastrar_animais_em_lote(animais[:20])
+    em_lote.cadastrar_animais_em_lote(animais[20:])
+    em_lote.cadastrar_adotantes_em_lote(adotantes)
+    assert resumo(em_lote) == resumo(individual)
+
+    for sistema in (individual, em_lote):
+        sistema.salvar_dados()
+    assert resumo(criar("lote")) == resumo(criar("individual")) == resumo(individual)
+
+
+def test_lote_invalido_nao_cadastra_nada(sistema):
+    animais, _ = registros(29)
+    invalidos = animais[:5] + [{"tipo": "GATO", "nome": ""}, {"tipo": "GATO", "nome": "X", "idade": -1}]
+    with pytest.raises(ValueError, match="2 registro"):
+        sistema.cadastrar_animais_em_lote(invalidos)
+    assert sistema.animais == [] and sistema._proximos_ids["animal"] == 1
+    assert sistema.cadastrar_animais_em_lote([]) == []
@@ -0,0 +1,35 @@
+from catalogo import CatalogoAnimais
+from conftest import movimentar, popular
+from logic import SistemaAdocao
+from models import Relatorios
+
+CAMPOS_ANIMAL = ("id", "especie", "raca", "nome", "sexo", "idade_meses", "porte", "status", "mascara_temperamento")
+
+
+def test_catalogo_igual_aos_objetos(repo_json, tmp_path):
+    sistema = popular(SistemaAdocao(repo=repo_json(catalogo_relatorios=True)), 40, 12, semente=20)
+    sistema.cadastrar_animal("GATO", "Pérola", raca="Angorá")
+    movimentar(sistema, 200, semente=20)
+    sistema.salvar_dados()
+    assert sistema.adocoes
+
+    with CatalogoAnimais(str(tmp_path / "database_catalogo.bin")) as catalogo:
+        assert catalogo.geracao == sistema.repo.geracao
+        assert len(catalogo.animais) == len(sistema.animais)
+        for visao, animal in zip(catalogo.animais, sistema.animais):
+            assert [getattr(visao, c) for c in CAMPOS_ANIMAL] == [getattr(animal, c) for c in CAMPOS_ANIMAL]
+            assert visao.data_entrada == animal.data_entrada
+        assert [(v.animal.id, v.adotante_id, v.data_adocao, v.taxa) for v in catalogo.adocoes] == [
+            (a.animal.id, a.adotante.id, a.data_adocao, a.taxa) for a in sistema.adocoes]
+
+        assert Relatorios.tempo_medio_adocao(catalogo.adocoes) == Relatorios.tempo_medio_adocao(sistema.adocoes)
+        assert Relatorios.taxa_adocoes_por_tipo(catalogo.adocoes) == Relatorios.taxa_adocoes_por_tipo(sistema.adocoes)
+
+        # Uma geração nova troca o arquivo sem afetar quem já o mapeou
+        nome = catalogo.animais[0].nome
+        sistema.cadastrar_animal("CACHORRO", "Depois")
+        sistema.salvar_dados()
+        assert (catalogo.animais[0].nome, len(catalogo.animais)) == (nome, len(sistema.animais) - 1)
+
+    with CatalogoAnimais(str(tmp_path / "database_catalogo.bin")) as catalogo:
+        assert catalogo.animais[-1].nome == "Depois"
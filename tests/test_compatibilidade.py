@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+from compatibilidade import CacheCompatibilidade, MotorCompatibilidade, PontuadorCompatibilidade
+from conftest import CONFIGURACOES, MORADIAS, TEMPERAMENTOS, perfis, popular
+from models import Adotante, Gato
+
+
+def pontuacao_original(config, animal, adotante):
+    """`calcular_compatibilidade` como era antes das regras pré-compiladas."""
+    score = 50
+    pesos = config.get('pesos_compatibilidade', {})
+    if adotante.moradia.lower() == 'casa':
+        score += pesos.get('moradia_casa', 10)
+    elif adotante.moradia.lower() == 'apartamento':
+        if adotante.area_util < 50 and animal.porte == 'G':
+            score -= 20
+        elif adotante.area_util < 50:
+            score += pesos.get('moradia_apto_pequeno', -10)
+    if adotante.experiencia_pets:
+        score += pesos.get('experiencia', 10)
+    if adotante.possui_criancas:
+        temperamentos_ruins = ["agitado", "arisco", "bravo", "raivoso", "agressivo", "nervoso", "independente", "assustado"]
+        temperamentos_bons = ["dócil", "calmo", "amoroso", "carinhoso", "fofo", "paciente"]
+        temps_animal = [t.lower() for t in animal.temperamento]
+        if any(t in temperamentos_ruins for t in temps_animal):
+            score -= 30
+        elif any(t in temperamentos_bons for t in temps_animal):
+            score += 15
+    if adotante.idade > 60:
+        if animal.idade_meses < 24:
+            score -= 15
+        elif animal.idade_meses > 60:
+            score += 15
+    return max(0, min(100, score))
+
+
+@pytest.mark.parametrize("config", CONFIGURACOES)
+def test_regras_compiladas_iguais_as_originais(config):
+    animais, adotantes = perfis(80, 40, semente=10)
+    pontuar = PontuadorCompatibilidade(config).pontuar
+    for animal in animais:
+        for adotante in adotantes:
+            assert pontuar(animal, adotante) == pontuacao_original(config, animal, adotante)
+
+
+@pytest.mark.parametrize("config", CONFIGURACOES)
+def test_motor_numpy_igual_ao_escalar(config):
+    pytest.importorskip("numpy")
+    animais, adotantes = perfis(150, 60, semente=9)
+    pontuar = PontuadorCompatibilidade(config).pontuar
+    motor = MotorCompatibilidade(config, max_elementos=1000) # Vários blocos
+    assert motor.matriz(animais, adotantes).tolist() == [[pontuar(an, ad) for ad in adotantes] for an in animais]
+
+    esperadas = [sum(pontuar(an, ad) for ad in adotantes) / len(adotantes) for an in animais]
+    assert list(motor.iterar_medias(animais, adotantes)) == esperadas
+    assert motor.medias(animais, adotantes).tolist() == esperadas
+    assert list(motor.iterar_medias(animais, [])) == [0] * len(animais)
+
+
+def test_cache_igual_ao_pontuador_apos_mudancas_de_perfil(sistema):
+    popular(sistema, 40, 30, semente=4)
+    pontuar = sistema.pontuador.pontuar
+    aleatorio = random.Random(5)
+    for _ in range(6):
+        for animal in sistema.animais:
+            for adotante in sistema.adotantes:
+                assert sistema.calcular_compatibilidade(animal, adotante) == pontuar(animal, adotante)
+        # Um campo de cada vez, para cada um precisar invalidar sozinho
+        adotante = aleatorio.choice(sistema.adotantes)
+        campo = aleatorio.choice(["idade", "moradia", "area_util", "experiencia_pets", "possui_criancas"])
+        valor = {"idade": aleatorio.randint(16, 80), "moradia": aleatorio.choice(MORADIAS),
+                 "area_util": float(aleatorio.choice([30, 45, 80])), "experiencia_pets": aleatorio.random() < 0.5,
+                 "possui_criancas": aleatorio.random() < 0.5}[campo]
+        setattr(adotante, campo, valor)
+        animal = aleatorio.choice(sistema.animais)
+        campo = aleatorio.choice(["porte", "idade_meses", "temperamento"])
+        valor = {"porte": aleatorio.choice("PMG"), "idade_meses": aleatorio.randint(0, 120),
+                 "temperamento": aleatorio.sample(TEMPERAMENTOS, 2)}[campo]
+        setattr(animal, campo, valor)
+    assert sistema.cache_compatibilidade.acertos > 0
+
+
+def test_cada_campo_do_perfil_invalida_o_cache(sistema):
+    rex = sistema.cadastrar_animal("CACHORRO", "Rex", porte="P", idade=12, temperamento=["Dócil"])
+    ana = sistema.cadastrar_adotante("Ana", 65, "Apartamento", 40.0, False, False, True)
+    cache = CacheCompatibilidade(PontuadorCompatibilidade({}).pontuar, capacidade=10)
+    mudancas = [(ana, "idade", 30), (ana, "moradia", "Casa"), (ana, "area_util", 100.0),
+                (ana, "experiencia_pets", True), (ana, "possui_criancas", False),
+                (rex, "porte", "G"), (rex, "idade_meses", 80), (rex, "temperamento", ["Bravo"])]
+    for objeto, campo, valor in mudancas:
+        cache.pontuar(rex, ana)
+        invalidadas = cache.invalidadas
+        setattr(objeto, campo, valor)
+        assert cache.pontuar(rex, ana) == PontuadorCompatibilidade({}).pontuar(rex, ana)
+        assert cache.invalidadas == invalidadas + 1, campo
+
+
+def test_capacidade_limita_entradas():
+    pontuador = PontuadorCompatibilidade({})
+    cache = CacheCompatibilidade(pontuador.pontuar, capacidade=3)
+    gatos = [Gato(i, "SRD", f"G{i}", "F", 10, "P", [], True) for i in range(5)]
+    ana = Adotante(1, "Ana", 30, "Casa", 80.0, False, True, False)
+    for gato in gatos:
+        cache.pontuar(gato, ana)
+    assert len(cache) == 3
+    cache.pontuar(gatos[-1], ana)
+    assert cache.acertos == 1
@@ -0,0 +1,133 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from conftest import movimentar, popular
+from logic import SistemaAdocao
+from models import Devolucao, MotivoDevolucao
+
+
+def base_com_devolucoes(repo):
+    sistema = SistemaAdocao(repo=repo)
+    ana = sistema.cadastrar_adotante("Ana", 30, "Casa", 100.0, False, True, False)
+    for nome, motivo in (("Rex", "SAUDE"), ("Mia", "ALERGIA")):
+        animal = sistema.cadastrar_animal("CACHORRO", nome)
+        assert sistema.efetuar_adocao(ana, animal)[0]
+        assert sistema.efetuar_devolucao(animal, motivo)[0]
+    sistema.salvar_dados()
+    return sistema
+
+
+def test_evento_de_devolucao_depois_da_mudanca_de_status(sistema):
+    ana = sistema.cadastrar_adotante("Ana", 30, "Casa", 100.0, False, True, False)
+    rex = sistema.cadastrar_animal("CACHORRO", "Rex")
+    sistema.efetuar_adocao(ana, rex)
+    sistema.efetuar_devolucao(rex, "COMPORTAMENTO")
+
+    status, devolucao = rex.historico[-2:]
+    assert (status.tipo, devolucao.tipo) == ("Mudança de Status", "Devolução")
+    assert status.data <= devolucao.data == sistema.devolucoes[-1].data_devolucao
+    assert sorted(rex.historico, key=lambda e: e.data) == rex.historico
+
+
+def test_devolucao_exige_codigo_de_motivo(sistema):
+    ana = sistema.cadastrar_adotante("Ana", 30, "Casa", 100.0, False, True, False)
+    rex = sistema.cadastrar_animal("CACHORRO", "Rex")
+    sistema.efetuar_adocao(ana, rex)
+    sucesso, mensagem = sistema.efetuar_devolucao(rex, "Ficou doente")
+    assert not sucesso and "SAUDE" in mensagem
+    assert (rex.status, sistema.devolucoes) == ("ADOTADO", [])
+    assert sistema.efetuar_devolucao(rex, "SAUDE", "Ficou doente")[0]
+    assert (rex.status, sistema.devolucoes[0].descricao) == ("QUARENTENA", "Ficou doente")
+
+
+def test_devolucao_mantem_a_data_informada(sistema):
+    ana = sistema.cadastrar_adotante("Ana", 30, "Casa", 100.0, False, True, False)
+    rex = sistema.cadastrar_animal("CACHORRO", "Rex")
+    sistema.efetuar_adocao(ana, rex)
+    data = datetime(2030, 1, 2, 3, 4, 5)
+    devolucao = Devolucao(rex, ana, MotivoDevolucao.ALERGIA, data_devolucao=data)
+    devolucao.ajustar_status_animal()
+    devolucao.registrar_evento()
+    assert devolucao.data_devolucao == data
+    assert [(e.tipo, e.data) for e in rex.historico[-2:]] == [("Mudança de Status", data), ("Devolução", data)]
+
+
+@pytest.mark.parametrize("modo", ["json", "journal"])
+def test_migracao_do_historico_roda_uma_vez(repo_json, tmp_path, monkeypatch, modo):
+    original = base_com_devolucoes(repo_json(modo=modo))
+    if modo == "journal":
+        original.repo.compactar(original.animais, original.adocoes, original.adotantes, original.devolucoes)
+    os.remove(tmp_path / "database_devolucoes.json") # Base anterior à coleção de devoluções
+
+    migrada = SistemaAdocao(repo=repo_json(modo=modo))
+    assert [(d.animal.id, d.adotante.id, d.motivo) for d in migrada.devolucoes] == [
+        (d.animal.id, d.adotante.id, d.motivo) for d in original.devolucoes]
+    assert (tmp_path / "database_devolucoes.json").exists()
+
+    def nao_migrar(self):
+        raise AssertionError("migração repetida")
+    monkeypatch.setattr(SistemaAdocao, "_migrar_devolucoes_do_historico", nao_migrar)
+    recarregada = SistemaAdocao(repo=repo_json(modo=modo))
+    assert [d.motivo for d in recarregada.devolucoes] == [MotivoDevolucao.SAUDE, MotivoDevolucao.ALERGIA]
+    assert not any(animal.historico_carregado for animal in recarregada.animais)
+
+
+def test_migradas_sem_snapshot_resolvem_animais_do_journal(repo_json, tmp_path):
+    base_com_devolucoes(repo_json(modo="journal")).repo.fechar() # Tudo só no journal
+    os.remove(tmp_path / "database_devolucoes.json")
+    journal = tmp_path / "database_journal.jsonl"
+    linhas = journal.read_text(encoding="utf-8").splitlines(keepends=True)
+    journal.write_text("".join(l for l in linhas if '"op":"devolucao"' not in l), encoding="utf-8")
+
+    migrada = SistemaAdocao(repo=repo_json(modo="journal"))
+    assert len(migrada.devolucoes) == 2 and (tmp_path / "database_devolucoes.json").exists()
+    mia = migrada.buscar_animal_por_id(2)
+    migrada.mudar_status_em_lote([mia], "DISPONIVEL")
+    assert migrada.efetuar_adocao(migrada.adotantes[0], mia)[0]
+    assert migrada.efetuar_devolucao(mia, "MUDANCA")[0]
+    migrada.repo.fechar()
+
+    # Arquivo migrado antes das devoluções do journal, e os animais de ambos só no journal
+    recarregada = SistemaAdocao(repo=repo_json(modo="journal"))
+    assert [(d.animal.id, d.adotante.id, d.motivo, d.data_devolucao) for d in recarregada.devolucoes] == [
+        (d.animal.id, d.adotante.id, d.motivo, d.data_devolucao) for d in migrada.devolucoes]
+    assert recarregada.listar_devolucoes(id_animal=2) == recarregada.devolucoes[1:]
+
+
+def test_base_nova_nao_migra_a_cada_carga(repo_json, monkeypatch):
+    SistemaAdocao(repo=repo_json(modo="journal")).cadastrar_animal("GATO", "Mia")
+    chamadas = []
+    original = SistemaAdocao._migrar_devolucoes_do_historico
+    monkeypatch.setattr(SistemaAdocao, "_migrar_devolucoes_do_historico",
+                        lambda self: chamadas.append(1) or original(self))
+    for _ in range(3):
+        SistemaAdocao(repo=repo_json(modo="journal"))
+    assert chamadas == []
+
+
+def test_interpretar_motivo():
+    casos = [(MotivoDevolucao.ALERGIA, MotivoDevolucao.ALERGIA), ("saude", MotivoDevolucao.SAUDE),
+             (" Mudanca ", MotivoDevolucao.MUDANCA)]
+    for motivo, esperado in casos:
+        assert MotivoDevolucao.interpretar(motivo) is esperado
+        assert MotivoDevolucao.de_texto_antigo(motivo) is esperado
+    for texto, esperado in (("O cachorro ficou doente", MotivoDevolucao.SAUDE), ("Mudou de cidade", MotivoDevolucao.OUTRO)):
+        with pytest.raises(ValueError, match="Motivo de devolução desconhecido"):
+            MotivoDevolucao.interpretar(texto)
+        assert MotivoDevolucao.de_texto_antigo(texto) is esperado
+    assert (MotivoDevolucao.SAUDE.status_destino, MotivoDevolucao.OUTRO.status_destino) == ("QUARENTENA", "DEVOLVIDO")
+
+
+def test_filtros_de_devolucoes_iguais_a_varredura(sistema):
+    popular(sistema, 40, 12, semente=27)
+    movimentar(sistema, 400, semente=27)
+    assert len(sistema.devolucoes) > 3
+    ids = {d.animal.id for d in sistema.devolucoes} | {10_000}
+    for motivo in list(MotivoDevolucao) + [None]:
+        for id_animal in list(ids) + [None]:
+            esperado = [d for d in sistema.devolucoes
+                        if (motivo is None or d.motivo is motivo) and (id_animal is None or d.animal.id == id_animal)]
+            assert sistema.listar_devolucoes(motivo, id_animal) == esperado
+    assert sistema.listar_devolucoes("saude") == sistema.listar_devolucoes(MotivoDevolucao.SAUDE)
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+import elegibilidade
+from conftest import MORADIAS
+from elegibilidade import RegrasElegibilidade
+from models import Adotante, Gato
+
+CONFIGURACOES = [
+    {},
+    {"idade_minima_adotante": 21, "elegibilidade": {"moradia_porte_grande": "Sítio", "area_minima_porte_grande": 100}},
+]
+
+
+def perfis(semente):
+    aleatorio = random.Random(semente)
+    adotantes = [Adotante(i, f"A{i}", aleatorio.choice([16, 18, 20, 21, 40]), aleatorio.choice(MORADIAS + ["CASA"]),
+                          aleatorio.choice([50.0, 79.9, 80.0, 100.0, 150]), False, aleatorio.random() < 0.5,
+                          aleatorio.random() < 0.5)
+                 for i in range(80)]
+    animais = [Gato(i, "SRD", f"G{i}", "F", 12, aleatorio.choice("PMG"), [], True) for i in range(30)]
+    return adotantes, animais
+
+
+def reprovacao_original(adotante, animal):
+    """`verificar_elegibilidade` de antes, devolvendo a mensagem que ele imprimia (None = elegível)."""
+    if adotante.idade < 18:
+        return f"❌ Reprovado: Adotante menor de idade ({adotante.idade} anos)."
+    if adotante.possui_criancas and not adotante.experiencia_pets:
+        return "❌ Reprovado: Possui crianças mas não tem experiência com pets."
+    if animal and animal.porte == "G":
+        if adotante.moradia.lower() != "casa":
+            return "❌ Reprovado: Animais de grande porte exigem moradia em Casa."
+        if adotante.area_util < 80:
+            return "❌ Reprovado: Área útil insuficiente para animal de grande porte."
+    return None
+
+
+def test_regras_padrao_iguais_as_originais(capsys):
+    adotantes, animais = perfis(30)
+    for adotante in adotantes:
+        for animal in [None] + animais[:6]:
+            esperado = reprovacao_original(adotante, animal)
+            assert adotante.verificar_elegibilidade(animal) == (esperado is None)
+            assert capsys.readouterr().out == ("" if esperado is None else esperado + "\n")
+
+
+@pytest.mark.parametrize("usar_numpy", [False, True])
+@pytest.mark.parametrize("config", CONFIGURACOES)
+def test_mascara_igual_aos_motivos_par_a_par(config, usar_numpy, monkeypatch):
+    if usar_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(elegibilidade, "np", None)
+    regras = RegrasElegibilidade(config)
+    adotantes, animais = perfis(31)
+    mascara = regras.mascara(adotantes, animais)
+    assert [list(linha) for linha in mascara] == [[not regras.motivos(ad, an) for an in animais] for ad in adotantes]
+    assert regras.motivos_em_lote(adotantes, animais[0]) == [regras.motivos(ad, animais[0]) for ad in adotantes]
+    assert len(regras.mascara([], animais)) == 0
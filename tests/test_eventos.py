@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import popular
+from eventos import RegistroEventos, de_epoca, para_epoca
+from logic import SistemaAdocao
+
+
+def forca_bruta(sistema, inicio=None, fim=None, tipo=None):
+    return sorted((animal.id, evento.tipo, evento.descricao, evento.data)
+                  for animal in sistema.animais for evento in animal.historico
+                  if (tipo is None or evento.tipo == tipo) and (inicio is None or evento.data >= inicio)
+                  and (fim is None or evento.data < fim))
+
+
+def como_tuplas(eventos):
+    return sorted((e.animal_id, e.tipo, e.descricao, e.data) for e in eventos)
+
+
+def base_com_eventos(repo):
+    sistema = popular(SistemaAdocao(repo=repo), 60, 5, semente=7)
+    for i, animal in enumerate(sistema.animais):
+        sistema.vacinar_animal(animal, "V10")
+        animal.adicionar_evento("Consulta", f"Retorno {i % 3}", datetime(2026, 1, 1) + timedelta(days=i))
+        if i % 4 == 0:
+            animal.mudar_status("INADOTAVEL")
+    sistema.salvar_dados()
+    return sistema
+
+
+@pytest.fixture(params=["json", "journal", "sqlite"])
+def repo(request, repo_json, repo_sqlite):
+    if request.param == "journal":
+        return lambda: repo_json(modo="journal")
+    return repo_json if request.param == "json" else repo_sqlite
+
+
+def test_consultas_iguais_a_varrer_os_historicos(repo):
+    base_com_eventos(repo())
+    sistema = SistemaAdocao(repo=repo())
+    carregados = [animal.historico_carregado for animal in sistema.animais] # No journal, os que a carga reaplicou
+    faixas = [(None, None, None), (datetime(2026, 1, 10), datetime(2026, 2, 1), None),
+              (datetime(2026, 1, 10), datetime(2026, 2, 1), "Consulta"), (None, None, "Mudança de Status"),
+              (None, None, "Inexistente")]
+    resultados = [como_tuplas(sistema.consultar_eventos(*faixa)) for faixa in faixas]
+    # A montagem não carrega os históricos nos animais
+    assert [animal.historico_carregado for animal in sistema.animais] == carregados
+
+    referencia = SistemaAdocao(repo=repo())
+    for faixa, resultado in zip(faixas, resultados):
+        assert resultado == forca_bruta(referencia, *faixa)
+
+
+def test_eventos_novos_entram_no_registro(repo):
+    base_com_eventos(repo())
+    sistema = SistemaAdocao(repo=repo())
+    antes = sistema.registro_eventos.contar(tipo="Vacinação")
+    sistema.vacinar_animal(sistema.animais[0], "Raiva")
+    sistema.mudar_status_em_lote(sistema.listar_animais_por_status("INADOTAVEL"), "DISPONIVEL")
+    assert sistema.registro_eventos.contar(tipo="Vacinação") == antes + 1
+    assert como_tuplas(sistema.consultar_eventos()) == forca_bruta(sistema)
+
+
+def test_ordem_cronologica_com_eventos_fora_de_ordem():
+    registro = RegistroEventos()
+    datas = [datetime(2026, 3, d) for d in (5, 1, 9, 1, 3)]
+    for i, data in enumerate(datas):
+        registro.adicionar_salvo(i, {"tipo": "Vacina", "descricao": "x", "data": data.isoformat()})
+    assert [e.data for e in registro.consultar()] == sorted(datas)
+    assert registro.contar(datetime(2026, 3, 1), datetime(2026, 3, 5)) == 3
+    assert de_epoca(para_epoca(datas[0])) == datas[0]
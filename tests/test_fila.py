@@ -0,0 +1,77 @@
+import random
+from datetime import datetime, timedelta
+
+from models import Adotante, FilaEspera
+
+
+class FilaOrdenada:
+    """A fila antiga: lista ordenada a cada retirada por (-score, data_entrada), sort estável."""
+    def __init__(self):
+        self._candidatos = []
+
+    def adicionar(self, adotante, score, data_entrada):
+        self._candidatos.append({"adotante": adotante, "score": score, "data_entrada": data_entrada})
+
+    def ordenados(self):
+        self._candidatos.sort(key=lambda x: (-x['score'], x['data_entrada']))
+        return self._candidatos
+
+    def obter_proximo(self):
+        return self.ordenados().pop(0) if self._candidatos else None
+
+    def remover(self, adotante):
+        restantes = [c for c in self._candidatos if c["adotante"].id != adotante.id]
+        removeu = len(restantes) != len(self._candidatos)
+        self._candidatos = restantes
+        return removeu
+
+    def posicao(self, adotante):
+        for posicao, candidato in enumerate(self.ordenados(), 1):
+            if candidato["adotante"].id == adotante.id:
+                return posicao
+        return None
+
+
+def chaves(candidatos):
+    return [(c["adotante"].id, c["score"], c["data_entrada"]) for c in candidatos]
+
+
+def test_ordem_igual_a_da_lista_ordenada():
+    aleatorio = random.Random(7)
+    adotantes = [Adotante(i, f"Adotante {i}", 30, "Casa", 100.0, False, False, False) for i in range(40)]
+    inicio = datetime(2025, 1, 1)
+    # Poucos scores e datas distintos: muitos empates, desempatados pela ordem de chegada
+    def sortear():
+        return (aleatorio.choice(adotantes), aleatorio.choice([40, 55, 70, 85]),
+                inicio + timedelta(hours=aleatorio.randint(0, 5)))
+
+    heap, referencia = FilaEspera(), FilaOrdenada()
+    for _ in range(3000):
+        operacao = aleatorio.random()
+        if operacao < 0.45:
+            candidato = sortear()
+            heap.adicionar(*candidato)
+            referencia.adicionar(*candidato)
+        elif operacao < 0.55:
+            lote = [sortear() for _ in range(aleatorio.randint(0, 30))]
+            heap.adicionar_varios(lote)
+            for candidato in lote:
+                referencia.adicionar(*candidato)
+        elif operacao < 0.8:
+            esperado = referencia.obter_proximo()
+            assert heap.espiar() == esperado
+            assert heap.obter_proximo() == esperado
+        elif operacao < 0.9:
+            adotante = aleatorio.choice(adotantes)
+            assert heap.remover(adotante) == referencia.remover(adotante)
+        else:
+            adotante = aleatorio.choice(adotantes)
+            assert heap.posicao(adotante) == referencia.posicao(adotante)
+
+        assert len(heap) == len(referencia._candidatos)
+        assert bool(heap) == bool(referencia._candidatos)
+    assert chaves(heap) == chaves(referencia.ordenados())
+
+    while referencia._candidatos:
+        assert heap.obter_proximo() == referencia.obter_proximo()
+    assert heap.obter_proximo() is None and not heap
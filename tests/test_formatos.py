@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+import repository
+from conftest import estado, movimentar, popular
+from logic import SistemaAdocao
+from repository import escrever_registros_json, iterar_registros_json
+
+
+def base(repo):
+    sistema = movimentar(popular(SistemaAdocao(repo=repo), 20, 8, semente=11), 60, semente=11)
+    sistema.salvar_dados()
+    return sistema
+
+
+@pytest.mark.parametrize("de, para", [("json", "jsonl"), ("jsonl", "json")])
+def test_troca_de_formato_remove_arquivos_antigos(repo_json, tmp_path, de, para):
+    original = base(repo_json(formato=de))
+    convertido = SistemaAdocao(repo=repo_json(formato=para))
+    assert estado(convertido) == estado(original)
+    convertido.salvar_dados()
+
+    for colecao in ("animais", "adocoes", "adotantes", "devolucoes"):
+        assert (tmp_path / f"database_{colecao}.{para}").exists()
+        assert not (tmp_path / f"database_{colecao}.{de}").exists(), colecao
+    assert estado(SistemaAdocao(repo=repo_json(formato=para))) == estado(original)
+
+
+@pytest.mark.parametrize("linhas", [False, True])
+@pytest.mark.parametrize("indent", [None, 4])
+def test_leitura_incremental_igual_ao_json(tmp_path, monkeypatch, linhas, indent):
+    monkeypatch.setattr(repository, "TAMANHO_BLOCO_LEITURA", 16) # Força registros cortados entre blocos
+    registros = [{"id": i, "nome": f"Animal {i} ç", "lista": list(range(i % 5)), "texto": "x" * (i * 7)}
+                 for i in range(50)]
+    caminho = tmp_path / "dados.json"
+    with open(caminho, "w", encoding="utf-8") as f:
+        escrever_registros_json(f, iter(registros), indent=indent, linhas=linhas)
+    assert list(iterar_registros_json(str(caminho))) == registros
+    if not linhas:
+        with open(caminho, encoding="utf-8") as f:
+            assert json.load(f) == registros
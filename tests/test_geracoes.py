@@ -0,0 +1,102 @@
+import pytest
+
+import repository
+from conftest import estado, popular
+from logic import SistemaAdocao
+from models import RepositorioError
+from repository import Repositorio
+
+
+class Queda(BaseException):
+    """Simula o processo morrendo no meio da gravação (não é tratada como erro comum)."""
+
+
+def duas_versoes(repo_json):
+    """Grava a geração 1 e devolve o sistema com mudanças ainda não salvas."""
+    sistema = popular(SistemaAdocao(repo=repo_json()), 20, 6, semente=16)
+    sistema.salvar_dados()
+    antes = estado(sistema)
+    popular(sistema, 5, 2, semente=17)
+    return sistema, antes
+
+
+def temporarios(tmp_path):
+    return sorted(p.name for p in tmp_path.iterdir() if p.name.endswith(Repositorio.SUFIXO_TEMPORARIO))
+
+
+def test_queda_depois_da_confirmacao_conclui_a_geracao(repo_json, tmp_path, monkeypatch):
+    sistema, _ = duas_versoes(repo_json)
+    depois = estado(sistema)
+
+    def cair(self, manifesto):
+        raise Queda()
+    with monkeypatch.context() as m:
+        m.setattr(Repositorio, "_aplicar_manifesto", cair)
+        with pytest.raises(Queda):
+            sistema.salvar_dados()
+    assert temporarios(tmp_path) # Confirmada, mas com as renomeações por fazer
+
+    recarregado = SistemaAdocao(repo=repo_json())
+    assert estado(recarregado) == depois
+    assert recarregado.repo.geracao == 2 and temporarios(tmp_path) == []
+
+
+def test_queda_antes_da_confirmacao_mantem_a_geracao_anterior(repo_json, tmp_path, monkeypatch):
+    sistema, antes = duas_versoes(repo_json)
+
+    def cair(self, pendentes, truncar_journal):
+        raise Queda()
+    with monkeypatch.context() as m:
+        m.setattr(Repositorio, "_confirmar_geracao", cair)
+        with pytest.raises(Queda):
+            sistema.salvar_dados()
+    assert temporarios(tmp_path)
+
+    recarregado = SistemaAdocao(repo=repo_json())
+    assert estado(recarregado) == antes
+    assert recarregado.repo.geracao == 1 and temporarios(tmp_path) == []
+
+
+def test_erro_de_escrita_descarta_os_temporarios(repo_json, tmp_path, monkeypatch):
+    sistema, antes = duas_versoes(repo_json)
+
+    def falhar(*args, **kwargs):
+        raise OSError("disco cheio")
+    monkeypatch.setattr(repository, "escrever_registros_json", falhar)
+    with pytest.raises(RepositorioError, match="disco cheio"):
+        sistema.repo.salvar_dados(sistema.animais, sistema.adocoes, sistema.adotantes)
+    assert temporarios(tmp_path) == []
+    monkeypatch.undo()
+    assert estado(SistemaAdocao(repo=repo_json())) == antes
+
+
+def test_instancia_desatualizada_nao_sobrescreve(repo_json):
+    primeira = popular(SistemaAdocao(repo=repo_json()), 10, 4, semente=18)
+    primeira.salvar_dados()
+    segunda = SistemaAdocao(repo=repo_json())
+    terceira = SistemaAdocao(repo=repo_json())
+
+    segunda.cadastrar_animal("GATO", "Da segunda")
+    segunda.salvar_dados()
+    esperado = estado(SistemaAdocao(repo=repo_json()))
+
+    terceira.cadastrar_animal("GATO", "Da terceira")
+    with pytest.raises(RepositorioError, match="outra instância"):
+        terceira.repo.salvar_dados(terceira.animais, terceira.adocoes, terceira.adotantes)
+    assert estado(SistemaAdocao(repo=repo_json())) == esperado
+
+
+def test_journal_alheio_nao_e_compactado(repo_json):
+    popular(SistemaAdocao(repo=repo_json(modo="journal")), 10, 4, semente=18).repo.fechar()
+    segunda = SistemaAdocao(repo=repo_json(modo="journal"))
+    terceira = SistemaAdocao(repo=repo_json(modo="journal"))
+    segunda.cadastrar_animal("GATO", "Da segunda")
+    segunda.repo.fechar()
+    terceira.cadastrar_animal("GATO", "Da terceira")
+
+    # A compactação da terceira descartaria a linha que ela não leu
+    with pytest.raises(RepositorioError, match="outra instância"):
+        terceira.repo.compactar(terceira.animais, terceira.adocoes, terceira.adotantes)
+    terceira.repo.fechar()
+    nomes = [animal.nome for animal in SistemaAdocao(repo=repo_json(modo="journal")).animais]
+    assert nomes[-2:] == ["Da segunda", "Da terceira"]
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from conftest import movimentar, popular
+from logic import SistemaAdocao
+
+
+def historicos(sistema):
+    return {animal.id: [e.to_dict() for e in animal.historico] for animal in sistema.animais}
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_historico_lido_so_quando_usado(backend, repo_json, repo_sqlite):
+    def criar():
+        return SistemaAdocao(repo=repo_sqlite() if backend == "sqlite" else repo_json())
+
+    original = popular(criar(), 30, 10, semente=14)
+    movimentar(original, 200, semente=14)
+    original.salvar_dados()
+
+    recarregado = criar()
+    assert not any(animal.historico_carregado for animal in recarregado.animais)
+    alvo = recarregado.animais[7]
+    assert [e.to_dict() for e in alvo.historico] == [e.to_dict() for e in original.animais[7].historico]
+    assert [animal.historico_carregado for animal in recarregado.animais].count(True) == 1
+    assert historicos(recarregado) == historicos(original)
+
+
+def test_base_antiga_com_historico_embutido(repo_json, tmp_path):
+    original = popular(SistemaAdocao(repo=repo_json()), 20, 8, semente=15)
+    movimentar(original, 100, semente=15)
+    original.salvar_dados()
+
+    # Formato anterior: o histórico de cada animal dentro de database_animais.json
+    (tmp_path / "database_animais.json").write_text(
+        json.dumps([animal.to_dict() for animal in original.animais]), encoding="utf-8")
+    for nome in ("database_historicos.jsonl", "database_historicos.idx.json"):
+        (tmp_path / nome).unlink()
+
+    antigo = SistemaAdocao(repo=repo_json())
+    assert historicos(antigo) == historicos(original)
+
+    # Ao salvar, os históricos passam para o arquivo separado e voltam a ser lidos sob demanda
+    antigo.salvar_dados()
+    convertido = SistemaAdocao(repo=repo_json())
+    assert not any(animal.historico_carregado for animal in convertido.animais)
+    assert historicos(convertido) == historicos(original)
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from conftest import movimentar, popular
+from logic import SistemaAdocao
+from models import StatusAnimal
+
+
+def test_busca_por_id_igual_a_varredura(repo_json):
+    original = popular(SistemaAdocao(repo=repo_json()), 30, 10, semente=5)
+    original.salvar_dados()
+
+    for sistema in (original, SistemaAdocao(repo=repo_json())):
+        for animal in sistema.animais:
+            assert sistema.buscar_animal_por_id(animal.id) is next(a for a in sistema.animais if a.id == animal.id)
+        for adotante in sistema.adotantes:
+            assert sistema.buscar_adotante_por_id(adotante.id) is next(
+                a for a in sistema.adotantes if a.id == adotante.id)
+        assert sistema.buscar_animal_por_id(10_000) is None
+        assert sistema.buscar_adotante_por_id(10_000) is None
+
+
+def test_adocao_legada_resolvida_pelo_nome(repo_json, tmp_path):
+    sistema = SistemaAdocao(repo=repo_json())
+    ana = sistema.cadastrar_adotante("Ana", 30, "Casa", 100.0, False, True, False)
+    primeiro = sistema.cadastrar_animal("CACHORRO", "Rex")
+    sistema.cadastrar_animal("GATO", "Rex") # Homônimo: a varredura antiga pegava o primeiro
+    assert sistema.efetuar_adocao(ana, primeiro)[0]
+    sistema.salvar_dados()
+
+    # Registros antigos de adoção só guardavam os nomes
+    caminho = tmp_path / "database_adocoes.json"
+    adocoes = json.loads(caminho.read_text(encoding="utf-8"))
+    for adocao in adocoes:
+        del adocao["animal_id"], adocao["adotante_id"]
+    caminho.write_text(json.dumps(adocoes), encoding="utf-8")
+
+    recarregado = SistemaAdocao(repo=repo_json())
+    [adocao] = recarregado.adocoes
+    assert (adocao.animal.id, adocao.adotante.id) == (primeiro.id, ana.id)
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_indice_de_status_igual_a_varredura(backend, repo_json, repo_sqlite):
+    sistema = popular(SistemaAdocao(repo=repo_sqlite() if backend == "sqlite" else repo_json()), 50, 12, semente=6)
+    movimentar(sistema, 400, semente=6)
+    sistema.alterar_status_manual(0, "INADOTAVEL")
+
+    for status in StatusAnimal:
+        varredura = [a for a in sistema.animais if a.status == status.value]
+        assert sistema.listar_animais_por_status(status.value) == varredura
+        for indice, animal in enumerate(varredura):
+            assert sistema.buscar_animal_por_status(status.value, indice) is animal
+        assert sistema.buscar_animal_por_status(status.value, len(varredura)) is None
+    assert sistema.listar_animais_disponiveis() == [a for a in sistema.animais if a.status == "DISPONIVEL"]
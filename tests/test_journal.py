@@ -0,0 +1,58 @@
+import pytest
+
+from conftest import estado, movimentar, popular
+from logic import SistemaAdocao
+
+
+def base_com_journal(repo):
+    sistema = popular(SistemaAdocao(repo=repo), 40, 12, semente=1)
+    movimentar(sistema, 300, semente=1)
+    sistema.repo.fechar()
+    return sistema
+
+
+def test_reaplicar_journal_igual_ao_snapshot(repo_json, tmp_path):
+    original = base_com_journal(repo_json(modo="journal", compactar_apos=10_000))
+    assert original.devolucoes and original.adocoes
+    assert not (tmp_path / "database_animais.json").exists() # Tudo ainda só no journal
+
+    reaplicado = SistemaAdocao(repo=repo_json(modo="journal", compactar_apos=10_000))
+    assert estado(reaplicado) == estado(original)
+
+    # Compactar e recarregar do snapshot dá o mesmo estado, sem nada para reaplicar
+    reaplicado.repo.compactar(reaplicado.animais, reaplicado.adocoes, reaplicado.adotantes, reaplicado.devolucoes,
+                              reaplicado.agregados, reaplicado._proximos_ids)
+    assert (tmp_path / "database_journal.jsonl").stat().st_size == 0
+    do_snapshot = SistemaAdocao(repo=repo_json(modo="journal", compactar_apos=10_000))
+    assert estado(do_snapshot) == estado(original)
+    assert do_snapshot.repo._registros_no_journal == 0
+
+
+def test_compactacao_automatica_preserva_o_estado(repo_json):
+    original = base_com_journal(repo_json(modo="journal", compactar_apos=50))
+    recarregado = SistemaAdocao(repo=repo_json(modo="journal", compactar_apos=50))
+    assert estado(recarregado) == estado(original)
+    assert recarregado.repo._registros_no_journal < 50
+
+
+def test_linha_truncada_no_fim_e_descartada(repo_json, tmp_path):
+    original = base_com_journal(repo_json(modo="journal", compactar_apos=10_000))
+    esperado = estado(original)
+    with open(tmp_path / "database_journal.jsonl", "ab") as f:
+        f.write(b'{"op":"animal","id":999,"nom') # Queda no meio de uma escrita
+
+    recarregado = SistemaAdocao(repo=repo_json(modo="journal", compactar_apos=10_000))
+    assert estado(recarregado) == esperado
+
+    # A próxima escrita corta a linha incompleta antes de anexar
+    recarregado.cadastrar_animal("GATO", "Depois da queda")
+    recarregado.repo.fechar()
+    final = SistemaAdocao(repo=repo_json(modo="journal", compactar_apos=10_000))
+    assert estado(final) == estado(recarregado)
+
+
+@pytest.mark.parametrize("modo", ["json", "journal"])
+def test_salvar_e_recarregar(repo_json, modo):
+    original = base_com_journal(repo_json(modo=modo))
+    original.salvar_dados()
+    assert estado(SistemaAdocao(repo=repo_json(modo=modo))) == estado(original)
@@ -0,0 +1,65 @@
+import json
+
+from logic import SistemaAdocao
+from lote import executar_lote
+
+COMANDOS = [
+    {"comando": "cadastrar_animal", "ref": "rex", "tipo": "cachorro", "nome": "Rex", "idade": 24,
+     "temperamento": ["Dócil", "Calmo"]},
+    {"comando": "cadastrar_animal", "ref": "mia", "tipo": "GATO", "nome": "Mia", "especial": True},
+    {"comando": "cadastrar_adotante", "ref": "ana", "nome": "Ana", "idade": 30, "moradia": "Casa", "area_util": 80,
+     "experiencia_pets": True},
+    {"comando": "adotar", "adotante_ref": "ana", "animal_ref": "rex"},
+    {"comando": "vacinar", "animal_ref": "mia", "vacina": "V4"},
+    {"comando": "treinar", "animal_id": 1},
+    {"comando": "devolver", "animal_ref": "rex", "motivo": "ALERGIA", "descricao": "Rinite"},
+    {"comando": "reservar", "adotante_ref": "ana", "animal_ref": "mia"},
+    {"comando": "adotar", "adotante_ref": "ninguem", "animal_ref": "mia"}, # Ref inexistente
+    {"comando": "voar", "animal_id": 1}, # Comando desconhecido
+]
+
+
+def como_csv(comandos):
+    colunas = sorted({chave for comando in comandos for chave in comando})
+    linhas = [",".join(colunas)]
+    for comando in comandos:
+        valores = []
+        for coluna in colunas:
+            valor = comando.get(coluna, "")
+            if isinstance(valor, list):
+                valor = ";".join(valor)
+            valores.append(str(valor).lower() if isinstance(valor, bool) else str(valor))
+        linhas.append(",".join(valores))
+    return "\n".join(linhas) + "\n"
+
+
+def resumo(sistema):
+    """O estado do lote sem as datas (que mudam entre as duas execuções)."""
+    return ([(a.id, a.nome, a.status, a.temperamento, [e.descricao for e in a.historico]) for a in sistema.animais],
+            [a.to_dict() for a in sistema.adotantes],
+            [(a.animal.id, a.adotante.id, a.taxa) for a in sistema.adocoes],
+            [(d.animal.id, d.adotante.id, d.motivo, d.descricao) for d in sistema.devolucoes])
+
+
+def test_jsonl_e_csv_aplicam_o_mesmo_lote(repo_json, repo_sqlite, tmp_path):
+    jsonl = tmp_path / "comandos.jsonl"
+    jsonl.write_text("\n".join(json.dumps(c, ensure_ascii=False) for c in COMANDOS) + "\n{quebrado\n",
+                     encoding="utf-8")
+    csv = tmp_path / "comandos.csv"
+    csv.write_text(como_csv(COMANDOS), encoding="utf-8")
+
+    por_jsonl = SistemaAdocao(repo=repo_json())
+    resultado = executar_lote(por_jsonl, str(jsonl))
+    assert (resultado.total, resultado.sucessos) == (len(COMANDOS) + 1, len(COMANDOS) - 2)
+    assert [(linha, comando) for linha, comando, _ in resultado.falhas] == [(9, "adotar"), (10, "voar"), (11, "?")]
+    assert "adotante não encontrado" in resultado.resumo()
+
+    por_csv = SistemaAdocao(repo=repo_sqlite())
+    resultado_csv = executar_lote(por_csv, str(csv))
+    assert (resultado_csv.total, resultado_csv.sucessos) == (len(COMANDOS), len(COMANDOS) - 2)
+
+    # Mesmo resultado pelos dois formatos, e já salvo no fim do lote
+    rex, mia = por_jsonl.animais
+    assert (rex.status, mia.status, mia.tratamento_especial, rex.temperamento) == (
+        "DEVOLVIDO", "RESERVADO", True, ["Dócil", "Calmo"])
+    assert resumo(SistemaAdocao(repo=repo_json())) == resumo(por_jsonl) == resumo(SistemaAdocao(repo=repo_sqlite()))
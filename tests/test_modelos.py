@@ -0,0 +1,21 @@
+import pytest
+
+from models import Adotante, Cachorro, Evento, Gato, Reserva
+
+
+def test_modelos_sem_dict_por_instancia():
+    rex = Cachorro(1, "SRD", "Rex", "M", 12, "M", ["Dócil"], True)
+    ana = Adotante(1, "Ana", 30, "Casa", 80.0, False, True, False)
+    objetos = [rex, Gato(2, "SRD", "Mia", "F", 8, "P", [], True), ana, Evento("Entrada", "Cadastro"), Reserva(rex, ana)]
+    for objeto in objetos:
+        assert not hasattr(objeto, "__dict__"), type(objeto).__name__
+        with pytest.raises(AttributeError):
+            objeto.atributo_novo = 1
+
+
+def test_fila_de_espera_alocada_so_quando_usada():
+    rex = Cachorro(1, "SRD", "Rex", "M", 12, "M", [], True)
+    assert not rex.possui_fila_espera
+    assert rex._fila_espera is None # Consultar não aloca
+    rex.fila_espera.adicionar(Adotante(1, "Ana", 30, "Casa", 80.0, False, True, False), 70)
+    assert rex.possui_fila_espera and len(rex.fila_espera) == 1
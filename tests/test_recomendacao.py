@@ -0,0 +1,62 @@
+import random
+
+from conftest import MORADIAS, TEMPERAMENTOS, popular
+
+
+def forca_bruta_animais(sistema, adotante, k):
+    candidatos = [(animal, sistema.pontuador.pontuar(animal, adotante)) for animal in sistema.animais
+                  if animal.status == "DISPONIVEL" and sistema.elegibilidade.elegivel(adotante, animal)]
+    return sorted(candidatos, key=lambda par: -par[1])[:k]
+
+
+def forca_bruta_adotantes(sistema, animal, k):
+    candidatos = [(adotante, sistema.pontuador.pontuar(animal, adotante)) for adotante in sistema.adotantes
+                  if sistema.elegibilidade.elegivel(adotante, animal)]
+    return sorted(candidatos, key=lambda par: -par[1])[:k]
+
+
+def conferir(sistema, k=7):
+    for adotante in sistema.adotantes:
+        assert sistema.recomendar_animais(adotante, k) == forca_bruta_animais(sistema, adotante, k)
+    for animal in sistema.animais:
+        assert sistema.recomendar_adotantes(animal, k) == forca_bruta_adotantes(sistema, animal, k)
+
+
+def test_indice_igual_a_forca_bruta(sistema):
+    popular(sistema, 150, 60, semente=1)
+    conferir(sistema)
+    # Mudanças de status depois de montado o índice
+    for animal in sistema.animais[::4]:
+        animal.mudar_status("RESERVADO")
+    conferir(sistema)
+
+
+def test_indice_acompanha_mudancas_de_perfil(sistema):
+    popular(sistema, 150, 60, semente=2)
+    conferir(sistema)
+    aleatorio = random.Random(3)
+    for _ in range(5):
+        for adotante in aleatorio.sample(sistema.adotantes, 10):
+            adotante.moradia = aleatorio.choice(MORADIAS)
+            adotante.area_util = float(aleatorio.choice([30, 45, 60, 80, 120]))
+            adotante.possui_criancas = aleatorio.random() < 0.5
+            adotante.experiencia_pets = aleatorio.random() < 0.5
+            adotante.idade = aleatorio.randint(16, 80)
+        for animal in aleatorio.sample(sistema.animais, 20):
+            animal.temperamento = aleatorio.sample(TEMPERAMENTOS, aleatorio.randint(0, 2))
+            animal.idade_meses = aleatorio.randint(0, 120)
+            animal.porte = aleatorio.choice("PMG")
+        conferir(sistema)
+
+
+def test_adotante_que_passa_a_ser_elegivel(sistema):
+    rex = sistema.cadastrar_animal("CACHORRO", "Rex", porte="G", idade=30)
+    ana = sistema.cadastrar_adotante("Ana", 30, "Apartamento", 40.0, False, False, False)
+    bia = sistema.cadastrar_adotante("Bia", 30, "Apartamento", 40.0, False, False, False)
+    assert sistema.recomendar_adotantes(rex) == []
+
+    ana.moradia = "Casa"
+    ana.area_util = 100.0
+    assert sistema.recomendar_adotantes(rex) == [(ana, 80)]
+    assert sistema.recomendar_adotantes(rex) == forca_bruta_adotantes(sistema, rex, 5)
+    assert all(adotante is not bia for adotante, _ in sistema.recomendar_adotantes(rex))
@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+import relatorios_paralelos
+from compatibilidade import MotorCompatibilidade, PontuadorCompatibilidade
+from conftest import CONFIGURACOES, movimentar, perfis, popular
+from models import Relatorios
+
+
+def ranking_original(animais, adotantes, pontuar, k=5):
+    """O top-5 de antes: média de todos os animais e ordenação completa."""
+    ranking = []
+    for animal in animais:
+        scores = [pontuar(animal, ad) for ad in adotantes]
+        ranking.append({"nome": animal.nome, "especie": animal.especie,
+                        "score_medio": sum(scores) / len(scores) if scores else 0})
+    return sorted(ranking, key=lambda x: x['score_medio'], reverse=True)[:k]
+
+
+def test_top_k_igual_a_ordenacao_completa():
+    aleatorio = random.Random(11)
+    for _ in range(200):
+        itens = [(i, aleatorio.randint(0, 5)) for i in range(aleatorio.randint(0, 40))] # Muitos empates
+        for k in (0, 1, 5, len(itens), len(itens) + 3):
+            assert Relatorios.top_k(iter(itens), k, chave=lambda par: par[1]) == \
+                sorted(itens, key=lambda par: par[1], reverse=True)[:k]
+
+
+@pytest.mark.parametrize("config", CONFIGURACOES)
+def test_top_k_adotaveis_igual_ao_ranking_original(config):
+    animais, adotantes = perfis(120, 25, semente=12)
+    animais += animais[:40] # Perfis repetidos: médias empatadas, que o ranking desempata pela ordem
+    pontuar = PontuadorCompatibilidade(config).pontuar
+    for k in (1, 5, 50):
+        esperado = ranking_original(animais, adotantes, pontuar, k)
+        assert Relatorios.top_k_adotaveis(iter(animais), adotantes, pontuar, k) == esperado
+        if MotorCompatibilidade.disponivel():
+            assert Relatorios.top_k_adotaveis(animais, adotantes, MotorCompatibilidade(config), k) == esperado
+    assert Relatorios.top_k_adotaveis(animais, [], pontuar) == ranking_original(animais, [], pontuar)
+
+
+def test_gerar_relatorios_usa_so_os_disponiveis(sistema):
+    popular(sistema, 60, 15, semente=13)
+    movimentar(sistema, 200, semente=13)
+    disponiveis = [a for a in sistema.animais if a.status == "DISPONIVEL"]
+    assert len(disponiveis) < len(sistema.animais)
+    esperado = ranking_original(disponiveis, sistema.adotantes, sistema.pontuador.pontuar)
+    assert sistema.gerar_relatorios(processos=1)["top5"] == esperado
+    assert Relatorios.top_5_adotaveis(sistema.animais, sistema.adotantes, sistema.pontuador.pontuar) == esperado
+
+
+@pytest.mark.parametrize("usar_numpy", [False, True])
+def test_top_k_paralelo_igual_ao_serial(usar_numpy):
+    if usar_numpy:
+        pytest.importorskip("numpy")
+    config = CONFIGURACOES[2] # Pesos fracionários: a média depende da ordem da soma
+    animais, adotantes = perfis(90, 20, semente=21)
+    animais += animais[:30]
+    esperado = ranking_original(animais, adotantes, PontuadorCompatibilidade(config).pontuar, k=7)
+    for processos in (2, 3):
+        assert relatorios_paralelos.top_k_adotaveis(animais, adotantes, config, processos, k=7,
+                                                    usar_numpy=usar_numpy) == esperado
+
+
+def test_processos_so_quando_compensam():
+    assert relatorios_paralelos.processos_uteis(8, 100, 100) == 1 # Poucos pares: fica no processo atual
+    pares = relatorios_paralelos.MIN_PARES_POR_PROCESSO
+    assert relatorios_paralelos.processos_uteis(8, 1000, 3 * pares // 1000) == 3
+    assert relatorios_paralelos.processos_uteis(2, 1000, 1000 * pares) == 2
+    assert relatorios_paralelos.processos_uteis(8, 3, 1000 * pares) == 3 # Nunca mais processos que animais
+
+
+def test_gerar_relatorios_em_processos(sistema, monkeypatch):
+    popular(sistema, 40, 15, semente=22)
+    serial = sistema.gerar_relatorios(processos=1)
+    monkeypatch.setattr(relatorios_paralelos, "MIN_PARES_POR_PROCESSO", 1)
+    assert sistema.gerar_relatorios(processos=2) == serial
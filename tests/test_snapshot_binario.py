@@ -0,0 +1,56 @@
+import pytest
+
+from conftest import estado, movimentar, popular
+from logic import SistemaAdocao
+
+
+@pytest.fixture
+def base_salva(repo_json):
+    sistema = popular(SistemaAdocao(repo=repo_json(snapshot_binario=True)), 40, 12, semente=19)
+    # Valores que o formato trata à parte: área inteira, nomes repetidos, texto fora do ASCII
+    sistema.cadastrar_adotante("Zé Ninguém", 70, "Casa", 120, True, False, True)
+    sistema.cadastrar_animal("GATO", "Animal 3", raca="Siamês", especial=True, temperamento=["Dócil", "Arisco"])
+    movimentar(sistema, 200, semente=19)
+    sistema.salvar_dados()
+    return sistema
+
+
+def carregar(repo_json, monkeypatch, binario):
+    """Carrega a base exigindo (ou proibindo) o caminho do snapshot binário."""
+    if binario:
+        def sem_json(self):
+            raise AssertionError("carregou do JSON")
+        monkeypatch.setattr(SistemaAdocao, "_carregar_registros", sem_json)
+    sistema = SistemaAdocao(repo=repo_json(snapshot_binario=binario))
+    monkeypatch.undo()
+    return sistema
+
+
+def test_carga_binaria_igual_a_carga_json(base_salva, repo_json, monkeypatch):
+    do_binario = carregar(repo_json, monkeypatch, binario=True)
+    do_json = carregar(repo_json, monkeypatch, binario=False)
+    assert estado(do_binario) == estado(do_json) == estado(base_salva)
+    for a, b in zip(do_binario.animais, do_json.animais):
+        assert (type(a), a.tratamento_especial, a.mascara_temperamento) == (type(b), b.tratamento_especial,
+                                                                             b.mascara_temperamento)
+    assert [type(a.area_util) for a in do_binario.adotantes] == [type(a.area_util) for a in do_json.adotantes]
+
+
+def test_binario_corrompido_cai_no_json(base_salva, repo_json, tmp_path):
+    caminho = tmp_path / "database_snapshot.bin"
+    conteudo = bytearray(caminho.read_bytes())
+    conteudo[len(conteudo) // 2] ^= 0xFF
+    caminho.write_bytes(bytes(conteudo))
+    assert estado(SistemaAdocao(repo=repo_json(snapshot_binario=True))) == estado(base_salva)
+
+
+def test_binario_de_geracao_antiga_e_ignorado(base_salva, repo_json, capsys):
+    # Salva de novo sem o binário: o arquivo que ficou é da geração anterior
+    sem_binario = SistemaAdocao(repo=repo_json())
+    sem_binario.cadastrar_animal("CACHORRO", "Novo")
+    sem_binario.salvar_dados()
+    capsys.readouterr()
+
+    recarregado = SistemaAdocao(repo=repo_json(snapshot_binario=True))
+    assert "Snapshot binário ignorado" in capsys.readouterr().out
+    assert estado(recarregado) == estado(sem_binario)
@@ -0,0 +1,49 @@
+import itertools
+
+from conftest import estado, movimentar, popular
+from logic import SistemaAdocao
+from repository import Repositorio
+
+
+def test_migracao_json_sqlite_json(repo_json, repo_sqlite, tmp_path):
+    original = popular(SistemaAdocao(repo=repo_json()), 40, 12, semente=2)
+    movimentar(original, 300, semente=2)
+    original.salvar_dados()
+    esperado = estado(original)
+
+    SistemaAdocao(repo=repo_json()).migrar_para(repo_sqlite())
+    no_sqlite = SistemaAdocao(repo=repo_sqlite())
+    assert estado(no_sqlite) == esperado
+
+    volta = tmp_path / "volta"
+    volta.mkdir()
+    no_sqlite.migrar_para(Repositorio(pasta=str(volta)))
+    assert estado(SistemaAdocao(repo=Repositorio(pasta=str(volta)))) == esperado
+
+
+def test_mutacoes_gravadas_no_sqlite(repo_sqlite):
+    original = popular(SistemaAdocao(repo=repo_sqlite()), 40, 12, semente=3)
+    movimentar(original, 300, semente=3)
+    original.repo.fechar()
+    assert estado(SistemaAdocao(repo=repo_sqlite())) == estado(original)
+
+    # Reservas e filas de espera são sincronizadas ao salvar (o JSON não as guarda)
+    original.salvar_dados()
+    recarregado = SistemaAdocao(repo=repo_sqlite())
+    assert any(animal.reserva_ativa for animal in original.animais)
+    for antes, depois in zip(original.animais, recarregado.animais):
+        assert (antes.reserva_ativa is None) == (depois.reserva_ativa is None)
+        if antes.reserva_ativa:
+            assert antes.reserva_ativa.adotante.id == depois.reserva_ativa.adotante.id
+        assert ([(c["adotante"].id, c["score"]) for c in antes.fila_espera] ==
+                [(c["adotante"].id, c["score"]) for c in depois.fila_espera])
+
+
+def test_consultas_indexadas_iguais_ao_filtro_em_memoria(repo_sqlite):
+    sistema = popular(SistemaAdocao(repo=repo_sqlite()), 60, 12, semente=4)
+    movimentar(sistema, 200, semente=4)
+    status = {animal.status for animal in sistema.animais}
+    for situacao, especie, porte in itertools.product(list(status) + [None], ("Cachorro", "Gato", None), "PMG"):
+        esperado = [a.id for a in sistema.animais
+                    if situacao in (None, a.status) and especie in (None, a.especie) and a.porte == porte]
+        assert sistema.repo.consultar_animais(status=situacao, especie=especie, porte=porte) == esperado
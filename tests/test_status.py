@@ -0,0 +1,85 @@
+import pytest
+
+from logic import SistemaAdocao
+from models import TRANSICOES_STATUS, Animal, Cachorro, StatusAnimal, TransicaoDeEstadoInvalidaError
+
+# Tabela que mudar_status montava a cada chamada antes da máquina pré-compilada
+TRANSICOES_ORIGINAIS = {
+    StatusAnimal.DISPONIVEL: [StatusAnimal.RESERVADO, StatusAnimal.INADOTAVEL, StatusAnimal.ADOTADO],
+    StatusAnimal.RESERVADO: [StatusAnimal.ADOTADO, StatusAnimal.DISPONIVEL],
+    StatusAnimal.ADOTADO: [StatusAnimal.DEVOLVIDO, StatusAnimal.QUARENTENA],
+    StatusAnimal.DEVOLVIDO: [StatusAnimal.QUARENTENA, StatusAnimal.DISPONIVEL, StatusAnimal.INADOTAVEL],
+    StatusAnimal.QUARENTENA: [StatusAnimal.DISPONIVEL, StatusAnimal.INADOTAVEL],
+    StatusAnimal.INADOTAVEL: [StatusAnimal.DISPONIVEL],
+}
+
+
+def test_tabela_igual_as_regras_originais():
+    for atual in StatusAnimal:
+        for novo in StatusAnimal:
+            assert TRANSICOES_STATUS.permite(atual, novo) == (novo == atual or novo in TRANSICOES_ORIGINAIS[atual])
+    with pytest.raises(TypeError):
+        TRANSICOES_STATUS._destinos[StatusAnimal.ADOTADO] = frozenset()
+
+
+def test_mensagens_de_erro():
+    rex = Cachorro(1, "SRD", "Rex", "M", 12, "M", [], True)
+    for valor, mensagem in (("xyz", "Status 'xyz' não existe."), (3, "Status inválido."),
+                            ("devolvido", "Transição inválida: De DISPONIVEL para DEVOLVIDO")):
+        with pytest.raises(TransicaoDeEstadoInvalidaError, match=mensagem):
+            rex.mudar_status(valor)
+    rex.mudar_status("reservado")
+    assert rex.status == "RESERVADO"
+
+
+def test_lote_tudo_ou_nada():
+    animais = [Cachorro(i, "SRD", f"C{i}", "M", 12, "M", [], True) for i in range(4)]
+    animais[2].mudar_status("ADOTADO")
+    with pytest.raises(TransicaoDeEstadoInvalidaError, match="1 animal"):
+        Animal.mudar_status_em_lote(animais, "RESERVADO")
+    assert [a.status for a in animais] == ["DISPONIVEL", "DISPONIVEL", "ADOTADO", "DISPONIVEL"]
+
+
+class RepositorioEspiao:
+    """Registra as chamadas de registrar_lote que chegam ao repositório."""
+    def __init__(self, repo):
+        self._repo = repo
+        self.lotes = []
+
+    def registrar_lote(self, operacao, lista):
+        self.lotes.append((operacao, list(lista)))
+        return self._repo.registrar_lote(operacao, lista)
+
+    def __getattr__(self, nome):
+        return getattr(self._repo, nome)
+
+
+def test_lote_vazio_nao_chega_ao_repositorio(repo_json):
+    sistema = SistemaAdocao(repo=RepositorioEspiao(repo_json(modo="journal")))
+    assert sistema.mudar_status_em_lote([], "DISPONIVEL") == (True, "Nenhum animal para alterar.")
+    assert sistema.repo.lotes == []
+
+
+@pytest.mark.parametrize("backend", ["journal", "sqlite"])
+def test_lote_igual_a_mudancas_uma_a_uma(backend, repo_json, repo_sqlite):
+    def criar(nome):
+        return SistemaAdocao(repo=repo_sqlite(nome) if backend == "sqlite" else repo_json(modo="journal"))
+
+    sistema = criar("lote.sqlite3")
+    for i in range(30):
+        sistema.cadastrar_animal("GATO", f"Gato {i}")
+    em_quarentena = sistema.animais[::3]
+    sistema.mudar_status_em_lote(em_quarentena, "INADOTAVEL")
+    sucesso, _ = sistema.mudar_status_em_lote(sistema.listar_animais_por_status("INADOTAVEL"), "DISPONIVEL")
+    assert sucesso
+
+    individual = [Cachorro(i, "SRD", "x", "M", 1, "M", [], True) for i in range(len(em_quarentena))]
+    for animal in individual:
+        animal.mudar_status("INADOTAVEL")
+        animal.mudar_status("DISPONIVEL")
+    esperado = [(e.tipo, e.descricao) for e in individual[0].historico]
+
+    recarregado = criar("lote.sqlite3")
+    assert len(recarregado.listar_animais_por_status("DISPONIVEL")) == 30
+    for animal in recarregado.animais[::3]:
+        assert [(e.tipo, e.descricao) for e in animal.historico if e.tipo != "Entrada"] == esperado